@@ -9,6 +9,7 @@ from routes.course_routes import course_bp
 from routes.learningstrat_routes import learningstrat_bp
 from routes.attachments import attachments_bp
 from routes.study_sessions import study_sessions_bp
+from routes.analytics_routes import analytics_bp
 # from routes.chatbot_routes import chatbot_bp  # Tidak digunakan lagi karena chatbot pindah ke n8n
 import os
 from utils.db import init_db
@@ -25,8 +26,8 @@ CORS(app, resources={
   r"/*": {  # Allow all routes, not just /api/*
       "origins": ["https://self-regulated-learning.vercel.app", "http://localhost:3001", "https://n8n-production-b60a.up.railway.app/webhook/d71e87c6-e1a3-4205-9dcc-81c8ce50f3bb", "http://localhost:3000", "http://localhost:5000", "http://localhost:1213", "https://gamatutor.id", "https://www.gamatutor.id", "https://self-regulated-learning-rose.vercel.app", "https://self-regulated-learning-production.up.railway.app","https://self-regulated-learning-mu.vercel.app","https://s5vl905j-3000.asse.devtunnels.ms"],
       "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization", "Access-Control-Allow-Origin", "Access-Control-Allow-Headers", "Access-Control-Allow-Methods"],
-        "expose_headers": ["Content-Type", "Authorization"],
+        "allow_headers": ["Content-Type", "Authorization", "Access-Control-Allow-Origin", "Access-Control-Allow-Headers", "Access-Control-Allow-Methods", "If-Match", "If-None-Match"],
+        "expose_headers": ["Content-Type", "Authorization", "ETag", "X-Next-Cursor", "X-Total-Count"],
         "supports_credentials": True,
         "max_age": 600  # Cache preflight requests for 10 minutes
     }
@@ -66,6 +67,7 @@ app.register_blueprint(course_bp)
 app.register_blueprint(learningstrat_bp)
 app.register_blueprint(attachments_bp)
 app.register_blueprint(study_sessions_bp)
+app.register_blueprint(analytics_bp)
 # app.register_blueprint(chatbot_bp)  # Tidak digunakan lagi karena chatbot pindah ke n8n
 
 @app.before_request
@@ -102,7 +104,7 @@ def handle_all_before_requests():
         else:
             response.headers.add("Access-Control-Allow-Origin", "null")
 
-        response.headers.add("Access-Control-Allow-Headers", "Content-Type, Authorization")
+        response.headers.add("Access-Control-Allow-Headers", "Content-Type, Authorization, If-Match, If-None-Match")
         response.headers.add("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
         response.headers.add("Access-Control-Allow-Credentials", "true")
         return response
@@ -13,4 +13,18 @@ class Config:
     
     # File upload configuration
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'storage')
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+
+    # Chatbot response templates, compiled at import by utils/response_generator.py
+    RESPONSE_TEMPLATES_FILE = os.getenv(
+        'RESPONSE_TEMPLATES_FILE',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'utils', 'response_templates.json')
+    )
+
+    # Retention of chatbot_logs and logs, see models/log_archive_model.py.
+    # Entries older than the retention are moved into compressed monthly
+    # archives by scripts/compact_logs.py; the TTL index deletes raw entries
+    # the grace period later, in case compaction did not run. 0 keeps everything.
+    CHATBOT_LOG_RETENTION_DAYS = int(os.getenv('CHATBOT_LOG_RETENTION_DAYS', 120))
+    AUTH_LOG_RETENTION_DAYS = int(os.getenv('AUTH_LOG_RETENTION_DAYS', 120))
+    LOG_TTL_GRACE_DAYS = int(os.getenv('LOG_TTL_GRACE_DAYS', 60))
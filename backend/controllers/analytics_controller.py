@@ -0,0 +1,163 @@
+from flask import jsonify, request, Response, stream_with_context
+from datetime import datetime
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.user_model import User
+from models.study_time_model import StudyTime, PERIODS
+from models.grade_sketch_model import GradeSketch
+from models.progress_stats_model import GRADE_TYPES
+from utils.cohort_stats import compute_cohort_stats
+from utils.cohort_export import EXPORT_FORMATS, parse_filters, parquet_available, export_cohort
+from utils.write_behind import write_behind
+from models.log_archive_model import LogArchive
+from bson import json_util
+
+def _require_admin():
+    """Return an error response unless the current user is an admin"""
+    user = User.find_user_by_id(get_jwt_identity())
+    if not user or user.get("role") != "admin":
+        return jsonify({"message": "Admin access required"}), 403
+    return None
+
+@jwt_required()
+def get_cohort_grade_stats():
+    """Pre/post grade statistics of all students per learning strategy and per course"""
+    error = _require_admin()
+    if error:
+        return error
+
+    try:
+        return jsonify(compute_cohort_stats()), 200
+    except Exception as e:
+        return jsonify({"message": "An error occurred", "error": str(e)}), 500
+
+# Quantiles reported for each cohort grade distribution
+PERCENTILES = [10, 25, 50, 75, 90]
+
+@jwt_required()
+def get_grade_percentiles():
+    """
+    Grade percentiles of all students per learning strategy and per course,
+    read from the grade sketches
+
+    Query params: test (pre_test|post_test, both if omitted)
+    """
+    error = _require_admin()
+    if error:
+        return error
+
+    test = request.args.get("test")
+    if test is not None and test not in GRADE_TYPES:
+        return jsonify({"message": f"test must be one of: {', '.join(GRADE_TYPES)}"}), 400
+
+    sketches = GradeSketch.load(tests=[test] if test else GRADE_TYPES)
+    result = {}
+    for group, by_key in sketches.items():
+        result[f"by_{group}"] = {}
+        for (name, grade_type), bins in sorted(by_key.items()):
+            result[f"by_{group}"].setdefault(name, {})[grade_type] = {
+                "count": sum(bins.values()),
+                **{f"p{p}": GradeSketch.quantile(bins, p / 100) for p in PERCENTILES}
+            }
+    return jsonify(result), 200
+
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+@jwt_required()
+def export_cohort_data():
+    """
+    Stream one row per card with grades, study time and movements
+
+    Query params: format (csv|ndjson|parquet), course, strategy,
+    from and to (card creation dates, YYYY-MM-DD)
+    """
+    error = _require_admin()
+    if error:
+        return error
+
+    export_format = request.args.get("format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"message": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    if export_format == "parquet" and not parquet_available():
+        return jsonify({"message": "Parquet export needs the pyarrow package on the server"}), 400
+
+    try:
+        filters = parse_filters(
+            course=request.args.get("course"),
+            strategy=request.args.get("strategy"),
+            date_from=request.args.get("from"),
+            date_to=request.args.get("to")
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    filename = f"cohort-export-{datetime.utcnow().strftime('%Y%m%d')}.{export_format}"
+    return Response(
+        stream_with_context(export_cohort(filters, export_format)),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@jwt_required()
+def get_course_study_time(course):
+    """Daily or weekly study time of all students in a course"""
+    error = _require_admin()
+    if error:
+        return error
+
+    period = request.args.get("period", "day")
+    if period not in PERIODS:
+        return jsonify({"message": f"period must be one of: {', '.join(PERIODS)}"}), 400
+
+    series = StudyTime.find_series(
+        period=period,
+        course=course,
+        date_from=request.args.get("from"),
+        date_to=request.args.get("to")
+    )
+    return jsonify({"course": course, "period": period, "series": series}), 200
+
+@jwt_required()
+def get_write_queue_stats():
+    """Depth and counters of the write-behind queue of this server process"""
+    error = _require_admin()
+    if error:
+        return error
+
+    return jsonify(write_behind.stats()), 200
+
+
+@jwt_required()
+def get_log_archive(source):
+    """
+    Archived chatbot_logs or logs entries of one owner, for audits
+
+    Query params: owner (user ID for chatbot_logs, username for logs),
+    from/to (YYYY-MM, optional). Without from/to only the archived months
+    are listed; with them the entries are streamed as NDJSON.
+    """
+    error = _require_admin()
+    if error:
+        return error
+
+    owner = request.args.get("owner")
+    if not owner:
+        return jsonify({"message": "owner is required"}), 400
+    month_from = request.args.get("from")
+    month_to = request.args.get("to")
+
+    try:
+        if not month_from and not month_to:
+            return jsonify({"source": source, "owner": owner, "months": LogArchive.months(source, owner)}), 200
+        entries = LogArchive.read(source, owner, month_from, month_to)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    def lines():
+        for entry in entries:
+            yield json_util.dumps(entry) + "\n"
+
+    return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
@@ -1,20 +1,171 @@
-from flask import jsonify, request
-from models.board_model import Board
+from flask import jsonify, request, make_response
+from models.board_model import Board, SUMMARY_FIELDS, PROJECTABLE_FIELDS
+from models.card_model import Card
+from models.progress_stats_model import ProgressStats
+from models.grade_sketch_model import GradeSketch
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 
+def _not_modified(user_id):
+    """
+    Answer a conditional GET with 304 if the client's ETag is still current
+
+    Only the board version is read here, so an unchanged board costs one
+    tiny query instead of loading and serializing every card.
+    """
+    if not request.if_none_match:
+        return None
+
+    version = Board.find_board_version(user_id)
+    if version is None or not request.if_none_match.contains(str(version)):
+        return None
+
+    response = make_response("", 304)
+    response.set_etag(str(version))
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+def _card_fields():
+    """
+    Card fields requested through ?view=summary|full or ?fields=a,b,c
+
+    Returns:
+        tuple: (fields or None for everything, error response or None)
+    """
+    fields = request.args.get("fields")
+    view = request.args.get("view", "full")
+
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in PROJECTABLE_FIELDS]
+        if unknown:
+            return None, (jsonify({"message": f"Unknown card fields: {', '.join(unknown)}"}), 400)
+        return requested, None
+
+    if view == "summary":
+        return SUMMARY_FIELDS, None
+    if view != "full":
+        return None, (jsonify({"message": "view must be 'summary' or 'full'"}), 400)
+    return None, None
+
+def _board_response(board):
+    version = board.get("version", 0)
+    response = jsonify({
+        "id": str(board["_id"]),
+        "name": board["name"],
+        "lists": board["lists"],
+        "version": version
+    })
+    response.set_etag(str(version))
+    # Let the browser keep the board but revalidate it with If-None-Match every time
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response, 200
+
+def _expected_version():
+    """
+    The board version named in the If-Match header, or None if the client did not send one
+
+    A tag that is not a version number can never match, so it is reported as -1.
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+
+    for tag in request.if_match.as_set():
+        try:
+            return int(tag)
+        except ValueError:
+            continue
+    return -1
+
+def _claim_version(user_id, board_id=None):
+    """
+    Bump the board version before a write, honouring If-Match
+
+    A write that then fails must give the version back with _failed_write().
+
+    Returns:
+        tuple: (new version, None) on success, or (None, error response)
+    """
+    expected_version = _expected_version()
+    version = Board.claim_version(user_id, board_id, expected_version)
+    if version is not None:
+        return version, None
+
+    current_version = Board.find_board_version(user_id)
+    if current_version is None or expected_version is None:
+        return None, (jsonify({"message": "Board not found"}), 404)
+
+    response = jsonify({"message": "Board was modified by another request", "version": current_version})
+    response.set_etag(str(current_version))
+    return None, (response, 409)
+
+def _failed_write(version, user_id, error):
+    """Give back the version claimed for a write that failed, then return its error response"""
+    Board.release_version(user_id, version)
+    return error
+
+def _write_response(body, version):
+    body["version"] = version
+    response = jsonify(body)
+    response.set_etag(str(version))
+    return response, 200
+
 @jwt_required()
 def get_board():
     verify_jwt_in_request()
     user_id = get_jwt_identity()
-    board = Board.find_board_by_user_id(user_id)
+
+    card_fields, error = _card_fields()
+    if error:
+        return error
+
+    not_modified = _not_modified(user_id)
+    if not_modified:
+        return not_modified
+
+    board = Board.find_board_by_user_id(user_id, card_fields)
 
     if not board:
         return jsonify({"message": "Board not found"}), 404
 
+    return _board_response(board)
+
+@jwt_required()
+def get_card(card_id):
+    user_id = get_jwt_identity()
+    card = Card.find_card(user_id, card_id)
+
+    if not card:
+        return jsonify({"message": "Card not found"}), 404
+
+    return jsonify(Card.to_card(card)), 200
+
+@jwt_required()
+def get_archived_cards():
+    """
+    Archived cards of the current user, one page at a time
+
+    Query parameters:
+    - limit: Number of cards to return (default: 20, max: 100)
+    - offset: Offset for pagination (default: 0)
+    """
+    user_id = get_jwt_identity()
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"message": "limit and offset must be integers"}), 400
+
+    # Fetch one extra card to know whether another page exists without counting
+    cards = Card.find_archived_cards(user_id, offset, limit + 1)
+
     return jsonify({
-        "id": str(board["_id"]),
-        "name": board["name"],
-        "lists": board["lists"]
+        "cards": [
+            {**Card.to_card(card), "list_id": card["list_id"]}
+            for card in cards[:limit]
+        ],
+        "has_more": len(cards) > limit,
+        "offset": offset,
+        "limit": limit
     }), 200
 
 def get_all_boards():
@@ -25,15 +176,19 @@ def get_all_boards():
     ]), 200
 
 def get_board_by_user_id(user_id):
-    board = Board.find_board_by_user_id(user_id)
+    card_fields, error = _card_fields()
+    if error:
+        return error
+
+    not_modified = _not_modified(user_id)
+    if not_modified:
+        return not_modified
+
+    board = Board.find_board_by_user_id(user_id, card_fields)
     if not board:
         return jsonify({"message": "Board not found"}), 404
 
-    return jsonify({
-        "id": str(board["_id"]),
-        "name": board["name"],
-        "lists": board["lists"]
-    }), 200
+    return _board_response(board)
 
 @jwt_required()
 def update_board():
@@ -45,12 +200,49 @@ def update_board():
     if not board_id or not lists:
         return jsonify({"message": "Missing Board ID or lists data"}), 400
 
+    version, error = _claim_version(user_id, board_id)
+    if error:
+        return error
+
     result = Board.update_board(board_id, user_id, lists)
 
-    if result.modified_count == 0:
-        return jsonify({"message": "Board not found or not modified"}), 404
+    if not result or result.matched_count == 0:
+        return _failed_write(version, user_id, (jsonify({"message": "Board not found"}), 404))
+
+    return _write_response({"message": "Board updated successfully"}, version)
 
-    return jsonify({"message": "Board updated successfully"}), 200
+@jwt_required()
+def patch_board():
+    verify_jwt_in_request()
+    user_id = get_jwt_identity()
+    board_id = request.json.get("boardId")
+    operations = request.json.get("operations")
+
+    if not board_id or not operations:
+        return jsonify({"message": "Missing Board ID or operations"}), 400
+
+    # Malformed batches are rejected before the version is claimed
+    try:
+        Board.validate_operations(operations)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    version, error = _claim_version(user_id, board_id)
+    if error:
+        return error
+
+    try:
+        result = Board.apply_operations(board_id, user_id, operations)
+    except ValueError as e:
+        return _failed_write(version, user_id, (jsonify({"message": str(e)}), 400))
+    except LookupError as e:
+        return _failed_write(version, user_id, (jsonify({"message": str(e)}), 404))
+
+    if result is None:
+        return _failed_write(version, user_id, (jsonify({"message": "Board not found"}), 404))
+
+    # card_ids maps the placeholder ids of added cards to the ids the server minted
+    return _write_response({"message": "Board patched successfully", **result}, version)
 
 @jwt_required()
 def search_boards():
@@ -79,166 +271,24 @@ def update_card():
     if not card_id:
         return jsonify({"message": "Missing card ID"}), 400
 
+    version, error = _claim_version(user_id)
+    if error:
+        return error
+
     result, status_code = Board.update_card(user_id, card_id, title, sub_title, description, difficulty)
-    return jsonify(result), status_code
+    if status_code != 200:
+        return _failed_write(version, user_id, (jsonify(result), status_code))
+    return _write_response(result, version)
 
 @jwt_required()
 def get_progress_report():
     user_id = get_jwt_identity()
-    board = Board.find_board_by_user_id(user_id)
+    board = Board.find_board_lists(user_id)
     
     if not board:
         return jsonify({"message": "Board not found"}), 404
 
-    lists = board.get("lists", [])
-    total_cards = 0
-    done_cards = 0
-    report = {}
-    strategy_stats = {}
-    course_stats = {}  # New dictionary for course statistics
-    strategy_usage = {}  # Track learning strategy usage per course
-
-    # Get all active (non-archived, non-deleted) cards
-    active_cards = []
-    for list_data in lists:
-        list_name = list_data.get("title", "Unknown")
-        cards = list_data.get("cards", [])
-        card_count = len([c for c in cards if not c.get("archived") and not c.get("deleted")])
-        report[list_name] = card_count
-        total_cards += card_count
-        
-        if list_name == "Reflection (Done)":
-            done_cards = card_count
-        
-        # Add non-archived, non-deleted cards to active_cards
-        active_cards.extend([c for c in cards if not c.get("archived") and not c.get("deleted")])
-
-    # Collect grade statistics and strategy usage
-    for card in active_cards:
-        strategy = card.get("learning_strategy")
-        title_parts = card.get("title", "").split("[")
-        if len(title_parts) >= 2:
-            course_name = title_parts[0].strip()
-        else:
-            continue  # Skip if card title doesn't follow the expected format
-
-        # Track strategy usage per course
-        if strategy and course_name:
-            if strategy not in strategy_usage:
-                strategy_usage[strategy] = {}
-            if course_name not in strategy_usage[strategy]:
-                strategy_usage[strategy][course_name] = 0
-            strategy_usage[strategy][course_name] += 1
-
-        # Initialize strategy stats if needed
-        if strategy and strategy not in strategy_stats:
-            strategy_stats[strategy] = {
-                "pre_test": {"grades": [], "min": 100, "q1": 0, "median": 0, "q3": 0, "max": 0, "count": 0},
-                "post_test": {"grades": [], "min": 100, "q1": 0, "median": 0, "q3": 0, "max": 0, "count": 0}
-            }
-        
-        # Initialize course stats if needed
-        if course_name and course_name not in course_stats:
-            course_stats[course_name] = {
-                "pre_test": {"grades": [], "avg": 0, "count": 0},
-                "post_test": {"grades": [], "avg": 0, "count": 0}
-            }
-
-        # Add pre-test grade if available
-        pre_test_grade = card.get("pre_test_grade")
-        if pre_test_grade and pre_test_grade.strip():
-            try:
-                grade = float(pre_test_grade)
-                if strategy:
-                    strategy_stats[strategy]["pre_test"]["grades"].append(grade)
-                if course_name:
-                    course_stats[course_name]["pre_test"]["grades"].append(grade)
-            except ValueError:
-                pass
-
-        # Add post-test grade if available
-        post_test_grade = card.get("post_test_grade")
-        if post_test_grade and post_test_grade.strip():
-            try:
-                grade = float(post_test_grade)
-                if strategy:
-                    strategy_stats[strategy]["post_test"]["grades"].append(grade)
-                if course_name:
-                    course_stats[course_name]["post_test"]["grades"].append(grade)
-            except ValueError:
-                pass
-
-    # Calculate statistics for each strategy
-    for strategy in strategy_stats:
-        for grade_type in ["pre_test", "post_test"]:
-            grades = strategy_stats[strategy][grade_type]["grades"]
-            if grades:
-                grades.sort()
-                count = len(grades)
-                strategy_stats[strategy][grade_type].update({
-                    "min": grades[0],
-                    "max": grades[-1],
-                    "count": count
-                })
-                
-                if count >= 4:
-                    q1_index = count // 4
-                    median_index = count // 2
-                    q3_index = (3 * count) // 4
-                    
-                    strategy_stats[strategy][grade_type].update({
-                        "q1": grades[q1_index],
-                        "median": grades[median_index],
-                        "q3": grades[q3_index]
-                    })
-                elif count > 0:
-                    # For small samples, use the same value for all quartiles
-                    strategy_stats[strategy][grade_type].update({
-                        "q1": grades[0],
-                        "median": grades[0],
-                        "q3": grades[0]
-                    })
-
-            # Clean up the grades array as it's no longer needed
-            del strategy_stats[strategy][grade_type]["grades"]
-
-    # Calculate average grades for each course
-    for course_name in course_stats:
-        for grade_type in ["pre_test", "post_test"]:
-            grades = course_stats[course_name][grade_type]["grades"]
-            if grades:
-                avg = sum(grades) / len(grades)
-                course_stats[course_name][grade_type].update({
-                    "avg": round(avg, 2),
-                    "count": len(grades)
-                })
-            # Clean up the grades array as it's no longer needed
-            del course_stats[course_name][grade_type]["grades"]
-
-    # Calculate progress percentage
-    progress_percentage = (done_cards / total_cards * 100) if total_cards > 0 else 0
-
-    # Get top 3 learning strategies with their most used course
-    top_strategies = []
-    for strategy, courses in strategy_usage.items():
-        total_usage = sum(courses.values())
-        most_used_course = max(courses.items(), key=lambda x: x[1])[0]
-        top_strategies.append({
-            "strategy": strategy,
-            "count": total_usage,
-            "most_used_in": most_used_course
-        })
-    
-    # Sort by count and take top 3
-    top_strategies.sort(key=lambda x: x["count"], reverse=True)
-    top_strategies = top_strategies[:3]
-
-    return jsonify({
-        "total_cards": total_cards,
-        "done_cards": done_cards,
-        "progress_percentage": progress_percentage,
-        "list_report": report,
-        "strategy_stats": strategy_stats,
-        "course_stats": course_stats,
-        "top_strategies": top_strategies
-    }), 200
+    # Counters are maintained on every card write, see models/progress_stats_model.py
+    stats = ProgressStats.find_by_board(board["_id"], user_id)
+    report = ProgressStats.build_report(board.get("lists", []), stats)
+    return jsonify(GradeSketch.add_percentiles(report)), 200
@@ -1,9 +1,17 @@
 from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from utils.trigger_detector import detect_card_movement, log_card_movement
+from utils.trigger_detector import (
+    detect_card_movement, log_card_movement, card_movement_log_request,
+    MovementContextLoader, MovementBatchLoader
+)
 from utils.context_analyzer import analyze_movement_context
 from utils.response_generator import generate_chatbot_response
 from utils.db import mongo
+from models.chatbot_log_model import ChatbotLog
+from models.card_movement_model import CardMovement
+from utils.pagination import page_size
+from utils.write_behind import write_behind
+from pymongo import InsertOne
 from utils.chatbot_generator import generate_chatbot_message
 from bson import ObjectId
 import datetime
@@ -56,8 +64,10 @@ def handle_card_movement():
                 "response": None
             }), 200
         
-        # Detect card movement and get context
-        movement_info = detect_card_movement(user_id, board_id, card_id, from_column, to_column)
+        # Detect card movement and get context; the loader keeps what was
+        # fetched so logging below does not query the card and user again
+        loader = MovementContextLoader(user_id, board_id, card_id)
+        movement_info = detect_card_movement(user_id, board_id, card_id, from_column, to_column, loader)
         
         if not movement_info:
             return jsonify({
@@ -72,7 +82,7 @@ def handle_card_movement():
         chatbot_response = generate_chatbot_response(context_analysis, movement_info)
         
         # Log card movement
-        log_card_movement(user_id, board_id, card_id, from_column, to_column)
+        log_card_movement(user_id, board_id, card_id, from_column, to_column, loader)
         
         # Log chatbot interaction
         log_chatbot_interaction(user_id, card_id, from_column, to_column, chatbot_response)
@@ -90,45 +100,147 @@ def handle_card_movement():
             "message": f"An error occurred: {str(e)}"
         }), 500
 
+# Upper bound on the movements accepted by one batch request
+MAX_BATCH_MOVEMENTS = 200
+
 @jwt_required()
-def get_chatbot_history():
+def handle_card_movements_batch():
     """
-    Get chatbot interaction history for current user
+    Handle many card movements at once, e.g. replayed after working offline
     
-    Query parameters:
-    - limit: Number of records to return (default: 10)
-    - offset: Offset for pagination (default: 0)
+    Expected JSON payload:
+    {
+        "movements": [
+            {"board_id", "card_id", "from_column", "to_column", "timestamp" (optional, ISO)},
+            ...
+        ]
+    }
+    
+    The user, cards, movement histories, study time and strategies of the
+    whole batch are loaded with one query each; every movement is then
+    analyzed and answered like handle_card_movement does, and all logs are
+    written with one bulk write per collection. Movements are handled in
+    request order, each one seeing the earlier movements of its card, and
+    every movement is recorded (at its client timestamp, if given). Returns
+    one result per movement, in request order.
     """
     try:
-        # Get query parameters
-        limit = int(request.args.get("limit", 10))
-        offset = int(request.args.get("offset", 0))
+        data = request.get_json()
+        movements = data.get("movements") if data else None
+        
+        if not isinstance(movements, list) or not movements:
+            return jsonify({
+                "status": "error",
+                "message": "movements must be a non-empty list"
+            }), 400
+        if len(movements) > MAX_BATCH_MOVEMENTS:
+            return jsonify({
+                "status": "error",
+                "message": f"At most {MAX_BATCH_MOVEMENTS} movements per request"
+            }), 400
         
-        # Get current user ID from JWT
         user_id = get_jwt_identity()
+        required_fields = ["board_id", "card_id", "from_column", "to_column"]
         
-        # Get chatbot logs
-        logs_collection = mongo.db.chatbot_logs
-        logs = list(logs_collection.find({"user_id": user_id})
-                    .sort("created_at", -1)
-                    .skip(offset)
-                    .limit(limit))
+        results = [None] * len(movements)
+        pending = []
+        for index, movement in enumerate(movements):
+            missing = [field for field in required_fields if not isinstance(movement, dict) or field not in movement]
+            if missing:
+                results[index] = {"status": "error", "message": f"Missing required field: {missing[0]}"}
+            elif not ObjectId.is_valid(movement["board_id"]):
+                # Only valid board ids reach the prefetch, so one bad entry cannot fail the batch
+                results[index] = {"status": "error", "message": "Invalid board_id"}
+            elif movement.get("timestamp") is not None and CardMovement.parse_timestamp(movement["timestamp"]) is None:
+                results[index] = {"status": "error", "message": "Invalid timestamp"}
+            elif movement["from_column"] == movement["to_column"]:
+                results[index] = {"status": "success", "message": "No movement detected", "response": None}
+            else:
+                pending.append(index)
+        
+        batch = MovementBatchLoader(
+            user_id, [(movements[i]["board_id"], movements[i]["card_id"]) for i in pending]
+        ).prefetch()
+        
+        movement_logs = []
+        chatbot_logs = []
+        for index in pending:
+            movement = movements[index]
+            board_id = movement["board_id"]
+            card_id = movement["card_id"]
+            from_column = movement["from_column"]
+            to_column = movement["to_column"]
+            timestamp = CardMovement.parse_timestamp(movement.get("timestamp")) or datetime.datetime.utcnow()
+            
+            loader = batch.loader_for(board_id, card_id)
+            movement_info = detect_card_movement(user_id, board_id, card_id, from_column, to_column, loader)
+            if not movement_info:
+                results[index] = {"status": "error", "message": "Failed to detect card movement"}
+                continue
+            
+            context_analysis = analyze_movement_context(movement_info)
+            chatbot_response = generate_chatbot_response(context_analysis, movement_info)
+            
+            movement_logs.append(card_movement_log_request(user_id, board_id, card_id, from_column, to_column, loader, timestamp))
+            batch.add_movement(board_id, card_id, from_column, to_column, timestamp)
+            chatbot_logs.append(chatbot_log_entry(user_id, card_id, from_column, to_column, chatbot_response))
+            results[index] = {"status": "success", "response": chatbot_response}
         
-        # Convert ObjectId to string for JSON serialization
-        for log in logs:
-            log["_id"] = str(log["_id"])
+        if movement_logs:
+            mongo.db.card_movements.bulk_write(movement_logs, ordered=False)
+        if chatbot_logs:
+            mongo.db.chatbot_logs.insert_many(chatbot_logs, ordered=False)
         
-        # Get total count for pagination
-        total_count = logs_collection.count_documents({"user_id": user_id})
+        for index, result in enumerate(results):
+            result["index"] = index
+        
+        return jsonify({
+            "status": "success",
+            "message": "Card movements processed",
+            "processed": len(chatbot_logs),
+            "results": results
+        }), 200
+    
+    except Exception as e:
+        print(f"Error in handle_card_movements_batch: {e}")
+        return jsonify({
+            "status": "error",
+            "message": f"An error occurred: {str(e)}"
+        }), 500
+
+@jwt_required()
+def get_chatbot_history():
+    """
+    Get chatbot interaction history for current user, newest first
+    
+    Query parameters:
+    - limit: Number of records to return (default: 10, at most 100)
+    - before: Cursor of the next page, as returned in pagination.next_cursor
+    - total: "true" to include an approximate total count
+    """
+    try:
+        try:
+            limit = page_size(request.args.get("limit"))
+            user_id = get_jwt_identity()
+            logs, next_cursor = ChatbotLog.history(user_id, limit, request.args.get("before"))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        
+        pagination = {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }
+        if request.args.get("total") == "true":
+            pagination["total"], pagination["total_exact"] = ChatbotLog.approximate_total(user_id)
         
         return jsonify({
             "status": "success",
             "data": logs,
-            "pagination": {
-                "total": total_count,
-                "limit": limit,
-                "offset": offset
-            }
+            "pagination": pagination
         }), 200
     
     except Exception as e:
@@ -142,52 +254,29 @@ def get_chatbot_history():
 def get_chatbot_stats():
     """
     Get chatbot interaction statistics for current user
+    
+    Query parameters:
+    - from: First day to include, YYYY-MM-DD (optional)
+    - to: Last day to include, YYYY-MM-DD (optional)
     """
     try:
+        try:
+            start, end = ChatbotLog.parse_date_range(request.args.get("from"), request.args.get("to"))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        
         # Get current user ID from JWT
         user_id = get_jwt_identity()
         
-        # Get chatbot logs
-        logs_collection = mongo.db.chatbot_logs
-        logs = list(logs_collection.find({"user_id": user_id}))
-        
-        # Calculate statistics
-        total_interactions = len(logs)
-        
-        # Count by response type
-        response_types = {}
-        movement_types = {
-            "forward": 0,
-            "backward": 0,
-            "same": 0
-        }
-        
-        for log in logs:
-            response_type = log.get("response_type", "unknown")
-            response_types[response_type] = response_types.get(response_type, 0) + 1
-            
-            movement_type = log.get("movement_type", "unknown")
-            if movement_type in movement_types:
-                movement_types[movement_type] += 1
-        
-        # Get most active cards
-        card_activity = {}
-        for log in logs:
-            card_id = log.get("card_id", "")
-            if card_id:
-                card_activity[card_id] = card_activity.get(card_id, 0) + 1
-        
-        # Sort cards by activity
-        most_active_cards = sorted(card_activity.items(), key=lambda x: x[1], reverse=True)[:5]
+        # Counted by one aggregation; the logs themselves are never loaded
+        stats = ChatbotLog.stats(user_id, start, end)
         
         return jsonify({
             "status": "success",
-            "stats": {
-                "total_interactions": total_interactions,
-                "response_types": response_types,
-                "movement_types": movement_types,
-                "most_active_cards": most_active_cards
-            }
+            "stats": stats
         }), 200
     
     except Exception as e:
@@ -197,6 +286,39 @@ def get_chatbot_stats():
             "message": f"An error occurred: {str(e)}"
         }), 500
 
+def chatbot_log_entry(user_id, card_id, from_column, to_column, chatbot_response):
+    """
+    Build the chatbot_logs document of one card-movement response
+    
+    Args:
+        user_id (str): ID user
+        card_id (str): ID card
+        from_column (str): ID kolom asal
+        to_column (str): ID kolom tujuan
+        chatbot_response (dict): Respons chatbot
+        
+    Returns:
+        dict: Log document
+    """
+    context_summary = chatbot_response.get("context_summary", {})
+    return {
+        "user_id": user_id,
+        "card_id": card_id,
+        "from_column": from_column,
+        "to_column": to_column,
+        "response_type": chatbot_response.get("response_type", ""),
+        "message": chatbot_response.get("message", ""),
+        "suggestions": chatbot_response.get("suggestions", []),
+        "reflection_questions": chatbot_response.get("reflection_questions", []),
+        "context_summary": context_summary,
+        "created_at": chatbot_response.get("timestamp", ""),
+        # BSON date for the retention TTL index; created_at is an ISO string
+        "logged_at": datetime.datetime.utcnow(),
+        "movement_type": context_summary.get("movement_type", ""),
+        "phase": context_summary.get("phase", ""),
+        "is_milestone": context_summary.get("is_milestone", False)
+    }
+
 def log_chatbot_interaction(user_id, card_id, from_column, to_column, chatbot_response):
     """
     Log chatbot interaction to database
@@ -212,25 +334,10 @@ def log_chatbot_interaction(user_id, card_id, from_column, to_column, chatbot_re
         bool: True if successful, False otherwise
     """
     try:
-        logs_collection = mongo.db.chatbot_logs
+        log_entry = chatbot_log_entry(user_id, card_id, from_column, to_column, chatbot_response)
         
-        log_entry = {
-            "user_id": user_id,
-            "card_id": card_id,
-            "from_column": from_column,
-            "to_column": to_column,
-            "response_type": chatbot_response.get("response_type", ""),
-            "message": chatbot_response.get("message", ""),
-            "suggestions": chatbot_response.get("suggestions", []),
-            "reflection_questions": chatbot_response.get("reflection_questions", []),
-            "context_summary": chatbot_response.get("context_summary", {}),
-            "created_at": chatbot_response.get("timestamp", ""),
-            "movement_type": chatbot_response.get("context_summary", {}).get("movement_type", ""),
-            "phase": chatbot_response.get("context_summary", {}).get("phase", ""),
-            "is_milestone": chatbot_response.get("context_summary", {}).get("is_milestone", False)
-        }
-        
-        logs_collection.insert_one(log_entry)
+        # Written by the write-behind flusher; the response does not wait for it
+        write_behind.enqueue("chatbot_logs", InsertOne(log_entry))
         return True
     except Exception as e:
         print(f"Error in log_chatbot_interaction: {e}")
@@ -312,6 +419,7 @@ def log_general_chat_interaction(user_id, message, response):
             "type": "general_chat",
             "created_at": datetime.datetime.utcnow()
         }
+        log_entry["logged_at"] = log_entry["created_at"]
         
         logs_collection.insert_one(log_entry)
         return True
@@ -1,4 +1,5 @@
 from models.learningstrat_model import LearningStrat
+from utils.strategy_cache import strategy_cache
 from flask import jsonify, request
 
 def add_learning_strat():
@@ -10,6 +11,8 @@ def add_learning_strat():
         return jsonify({"message": "All fields (learning_strat_name) are required"}), 400
 
     learning_strat_id = LearningStrat.add_learning_strat(learning_strat_name, description)
+    # Other workers see the bumped catalog version; this one drops its cache now
+    strategy_cache.invalidate()
     return jsonify({"message": "Learning strategy added successfully", "learning_strat_id": str(learning_strat_id)}), 201
 
 def get_learning_strat(learning_strat_id):
@@ -52,6 +55,7 @@ def update_learning_strat(learning_strat_id):
     if result.modified_count == 0:
         return jsonify({"message": "No changes were made (same value as before)"}), 200
 
+    strategy_cache.invalidate()
     return jsonify({"message": "Learning strategy updated successfully"}), 200
 
 def delete_learning_strat(learning_strat_id):
@@ -62,4 +66,5 @@ def delete_learning_strat(learning_strat_id):
     if result.deleted_count == 0:
        return jsonify({"message": "Learning strategy not found"}), 404
     
+    strategy_cache.invalidate()
     return jsonify({"message": "Learning strategy deleted successfully"}), 200
\ No newline at end of file
@@ -1,12 +1,30 @@
-from flask import jsonify
+from flask import jsonify, request
 from models.log_model import Log
+from utils.pagination import page_size
 from flask_jwt_extended import jwt_required
 
 @jwt_required()
 def get_all_logs():
-    """Get all logs for admin view"""
+    """
+    Get logs for admin view, newest first
+    
+    Query parameters:
+    - limit: Number of logs to return (default: 100, at most 100)
+    - before: Cursor of the next page, from the X-Next-Cursor header of the previous one
+    
+    The body stays a plain list; the next cursor and an approximate total
+    are sent in the X-Next-Cursor and X-Total-Count headers.
+    """
     try:
-        logs = Log.get_all_logs()
-        return jsonify(logs), 200
+        try:
+            limit = page_size(request.args.get("limit"), default=100)
+            logs, next_cursor = Log.get_all_logs(limit, request.args.get("before"))
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+        
+        headers = {"X-Total-Count": str(Log.estimated_count())}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return jsonify(logs), 200, headers
     except Exception as e:
         return jsonify({"message": "An error occurred", "error": str(e)}), 500
\ No newline at end of file
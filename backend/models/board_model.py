@@ -1,6 +1,26 @@
 from bson import ObjectId
 from flask_pymongo import PyMongo
+from pymongo import ReturnDocument
 from utils.db import mongo
+from models.card_model import Card
+
+# Card fields the client is allowed to change through patch operations
+CARD_FIELDS = [
+    "title", "sub_title", "description", "difficulty", "priority",
+    "learning_strategy", "archived", "deleted", "checklists", "links",
+    "rating", "notes", "pre_test_grade", "post_test_grade"
+]
+
+BOARD_OPERATIONS = ["move_card", "set_card_field", "add_card", "remove_card", "reorder", "rename_list"]
+
+# Card fields the Kanban view renders; everything else is loaded per card on demand
+SUMMARY_FIELDS = [
+    "id", "title", "sub_title", "difficulty", "priority",
+    "learning_strategy", "archived", "deleted", "created_at"
+]
+
+# Card fields that can be requested through a projection
+PROJECTABLE_FIELDS = ["id", "created_at", "column_movements"] + CARD_FIELDS
 
 class Board:
     @staticmethod
@@ -9,71 +29,334 @@ class Board:
             "user_id": ObjectId(user_id),
             "name": f"{username}'s Board",  # Set the board name to <username>'s Board
             "lists": [
-                {"id": "list1", "title": "Planning (To Do)", "cards": []},
-                {"id": "list2", "title": "Monitoring (In Progress)", "cards": []},
-                {"id": "list3", "title": "Controlling (Review)", "cards": []},
-                {"id": "list4", "title": "Reflection (Done)", "cards": []}
-            ]
+                {"id": "list1", "title": "Planning (To Do)"},
+                {"id": "list2", "title": "Monitoring (In Progress)"},
+                {"id": "list3", "title": "Controlling (Review)"},
+                {"id": "list4", "title": "Reflection (Done)"}
+            ],
+            # Cards live in the cards collection, not inside lists
+            "cards_migrated": True,
+            # Bumped on every write, served as the board's ETag
+            "version": 1
         }
         result = mongo.db.boards.insert_one(initial_board)
         return str(result.inserted_id)
 
+    @staticmethod
+    def assemble(board, cards):
+        """
+        Build the board view the client expects, with every list carrying its cards
+
+        Args:
+            board (dict): Board document (list metadata only)
+            cards (list): Card documents of this board, sorted by list and position
+        """
+        by_list = {}
+        for card in cards:
+            by_list.setdefault(card["list_id"], []).append(Card.to_card(card))
+
+        board["lists"] = [
+            {**list_, "cards": by_list.get(list_["id"], [])}
+            for list_ in board.get("lists", [])
+        ]
+        return board
+
+    @staticmethod
+    def migrate_board(board):
+        """
+        Move the embedded cards of one board into the cards collection
+
+        Safe to re-run: cards are upserted, and the board is only marked as
+        migrated (and its embedded cards dropped) once the copy has succeeded.
+        """
+        if board.get("cards_migrated"):
+            return board
+
+        Card.migrate_embedded_cards(board)
+        lists = [
+            {k: v for k, v in list_.items() if k != "cards"}
+            for list_ in board.get("lists", [])
+        ]
+        mongo.db.boards.update_one(
+            {"_id": board["_id"], "cards_migrated": {"$ne": True}},
+            {"$set": {"lists": lists, "cards_migrated": True}}
+        )
+        board["lists"] = lists
+        board["cards_migrated"] = True
+        return board
+
     @staticmethod
     def get_all_boards():
-        return list(mongo.db.boards.find({}))
+        boards = [Board.migrate_board(board) for board in mongo.db.boards.find({})]
+
+        cards_by_board = {}
+        for card in Card.find_cards_by_boards([board["_id"] for board in boards]):
+            cards_by_board.setdefault(card["board_id"], []).append(card)
+
+        return [Board.assemble(board, cards_by_board.get(board["_id"], [])) for board in boards]
+
+    @staticmethod
+    def card_projection(card_fields):
+        """Mongo projection for the given card fields, keeping what assemble() needs"""
+        if card_fields is None:
+            return None
+        projection = {field: 1 for field in card_fields}
+        projection.update({"id": 1, "list_id": 1, "_id": 0})
+        return projection
 
     @staticmethod
-    def find_board_by_user_id(user_id):
+    def find_board_by_user_id(user_id, card_fields=None):
+        """
+        Load a user's board with its cards
+
+        Args:
+            user_id (str): Owner of the board
+            card_fields (list): Only load these card fields (all fields if None)
+        """
         try:
-            return mongo.db.boards.find_one({"user_id": ObjectId(user_id)})
+            board = mongo.db.boards.find_one({"user_id": ObjectId(user_id)})
+            if not board:
+                return None
+
+            board = Board.migrate_board(board)
+            cards = Card.find_cards_by_board(board["_id"], Board.card_projection(card_fields))
+            return Board.assemble(board, cards)
         except Exception as e:
             print(f"Error finding board by user ID: {str(e)}")
             return None
 
+    @staticmethod
+    def find_board_lists(user_id):
+        """Load a user's board with its list metadata only, without the cards"""
+        try:
+            board = mongo.db.boards.find_one(
+                {"user_id": ObjectId(user_id)},
+                {"user_id": 1, "lists": 1, "cards_migrated": 1}
+            )
+            return Board.migrate_board(board) if board else None
+        except Exception as e:
+            print(f"Error finding board lists: {str(e)}")
+            return None
+
+    @staticmethod
+    def find_board_version(user_id):
+        """
+        Read only the version of a user's board
+
+        Returns:
+            int: The board version (0 for boards written before versioning), or None if there is no board
+        """
+        try:
+            board = mongo.db.boards.find_one({"user_id": ObjectId(user_id)}, {"version": 1})
+            return board.get("version", 0) if board else None
+        except Exception as e:
+            print(f"Error finding board version: {str(e)}")
+            return None
+
+    @staticmethod
+    def claim_version(user_id, board_id=None, expected_version=None):
+        """
+        Increment the board version before a write
+
+        When expected_version is given the increment only happens if the board is
+        still at that version, which makes concurrent writers fail instead of
+        overwriting each other.
+
+        Returns:
+            int: The new version, or None if no board matched (missing or stale)
+        """
+        query = {"user_id": ObjectId(user_id)}
+        if board_id is not None:
+            query["_id"] = ObjectId(board_id)
+        if expected_version is not None:
+            query["version"] = expected_version if expected_version else {"$in": [0, None]}
+
+        board = mongo.db.boards.find_one_and_update(
+            query,
+            {"$inc": {"version": 1}},
+            projection={"version": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return board["version"] if board else None
+
+    @staticmethod
+    def release_version(user_id, version):
+        """
+        Undo a claim_version() whose write failed without changing the board
+
+        The version is only taken back while it is still the claimed one, so a
+        write that claimed the next version in the meantime is never undone.
+        """
+        try:
+            mongo.db.boards.update_one(
+                {"user_id": ObjectId(user_id), "version": version},
+                {"$inc": {"version": -1}}
+            )
+        except Exception as e:
+            print(f"Error releasing board version: {str(e)}")
+
     @staticmethod
     def update_board(board_id, user_id, lists):
         try:
             result = mongo.db.boards.update_one(
                 {"_id": ObjectId(board_id), "user_id": ObjectId(user_id)},
-                {"$set": {"lists": lists}}
+                {"$set": {"lists": [
+                    {k: v for k, v in list_.items() if k != "cards"}
+                    for list_ in lists
+                ]}}
             )
+            if result.matched_count:
+                Card.replace_board_cards(board_id, user_id, lists)
             return result
         except Exception as e:
             print(f"Error updating board: {str(e)}")
             return None
 
     @staticmethod
-    def update_card(user_id, card_id, title=None, sub_title=None, description=None, difficulty=None):
-        board = mongo.db.boards.find_one({"user_id": ObjectId(user_id)})
-        updated = False
-
-        # Iterate through lists and cards to find the card by ID
-        for list_ in board["lists"]:
-            for card in list_["cards"]:
-                if card["id"] == card_id:
-                    # Update the fields if provided
-                    if title is not None:
-                        card["title"] = title
-                    if sub_title is not None:
-                        card["sub_title"] = sub_title
-                    if description is not None:
-                        card["description"] = description
-                    if difficulty is not None:
-                        if difficulty not in ["easy", "medium", "hard"]:
-                            return {"message": "Invalid difficulty"}, 400
-                        card["difficulty"] = difficulty
-                    updated = True
-                    break
-            if updated:
-                break
-
-        if not updated:
-            return {"message": "Card not found"}, 404
+    def validate_operations(operations):
+        """
+        Validate the shape of patch operations before anything is written
 
-        # Update the board in the database
-        mongo.db.boards.update_one(
-            {"user_id": ObjectId(user_id)},
-            {"$set": {"lists": board["lists"]}}
+        Raises:
+            ValueError: If an operation is unknown or misses required keys
+        """
+        if not isinstance(operations, list) or not operations:
+            raise ValueError("Operations must be a non-empty list")
+
+        required = {
+            "move_card": ["card_id", "from_list", "to_list"],
+            "set_card_field": ["card_id", "field"],
+            "add_card": ["list_id", "card"],
+            "remove_card": ["card_id"],
+            "reorder": ["list_id", "card_ids"],
+            "rename_list": ["list_id", "title"]
+        }
+
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict):
+                raise ValueError(f"Operation {index} must be an object")
+            op = operation.get("op")
+            if op not in BOARD_OPERATIONS:
+                raise ValueError(f"Operation {index} has unknown op: {op}")
+            for key in required[op]:
+                if key not in operation:
+                    raise ValueError(f"Operation {index} ({op}) is missing '{key}'")
+            if op == "set_card_field" and operation["field"] not in CARD_FIELDS:
+                raise ValueError(f"Operation {index} cannot set field '{operation['field']}'")
+            if op == "add_card" and not isinstance(operation["card"], dict):
+                raise ValueError(f"Operation {index} (add_card) needs a card object")
+            if op == "reorder" and not isinstance(operation["card_ids"], list):
+                raise ValueError(f"Operation {index} (reorder) needs a list of card_ids")
+
+    @staticmethod
+    def assign_card_ids(operations):
+        """
+        Give every card added by a batch a server-minted id
+
+        The id a client sends with add_card is only a placeholder; later
+        operations of the same batch that reference it are rewritten to the
+        new id.
+
+        Returns:
+            dict: {placeholder id: minted id}
+        """
+        added = [operation for operation in operations if operation["op"] == "add_card"]
+        minted = Card.mint_ids(len(added))
+        card_ids = {}
+        for operation, card_id in zip(added, minted):
+            placeholder = operation["card"].get("id")
+            if placeholder:
+                card_ids[placeholder] = card_id
+            operation["card"] = {**operation["card"], "id": card_id}
+
+        for operation in operations:
+            if operation.get("card_id") in card_ids:
+                operation["card_id"] = card_ids[operation["card_id"]]
+            if operation["op"] == "reorder":
+                operation["card_ids"] = [card_ids.get(card_id, card_id) for card_id in operation["card_ids"]]
+        return card_ids
+
+    @staticmethod
+    def apply_operations(board_id, user_id, operations):
+        """
+        Apply an ordered batch of typed patch operations
+
+        Card operations are replayed against the board layout and written with
+        a single bulk_write (see Card.apply_batch); list renames are folded into
+        one update of the board document.
+
+        Supported operations:
+            {"op": "set_card_field", "card_id", "field", "value"}
+            {"op": "move_card", "card_id", "from_list", "to_list", "index"}
+            {"op": "add_card", "list_id", "card", "index"}
+            {"op": "remove_card", "card_id"}
+            {"op": "reorder", "list_id", "card_ids"}
+            {"op": "rename_list", "list_id", "title"}
+
+        Cards added by the batch get server-minted ids, see assign_card_ids().
+
+        Returns:
+            dict: {"applied": number of operations, "card_ids": {placeholder id: minted id}},
+                  or None if the board is missing
+
+        Raises:
+            ValueError: If the operations are malformed
+            LookupError: If a referenced card or list does not exist
+        """
+        Board.validate_operations(operations)
+
+        board = mongo.db.boards.find_one(
+            {"_id": ObjectId(board_id), "user_id": ObjectId(user_id)},
+            {"lists.id": 1}
         )
+        if not board:
+            return None
+
+        list_ids = [list_["id"] for list_ in board.get("lists", [])]
+        titles = {}
+        for operation in operations:
+            # A card placed in a list the board does not have would be orphaned
+            target = operation["to_list"] if operation["op"] == "move_card" else operation.get("list_id")
+            if target is not None and target not in list_ids:
+                raise LookupError(f"List {target} not found")
+            if operation["op"] == "rename_list":
+                titles[operation["list_id"]] = operation["title"]
+
+        card_ids = Board.assign_card_ids(operations)
+        card_operations = [op for op in operations if op["op"] != "rename_list"]
+        if card_operations:
+            Card.apply_batch(board_id, user_id, card_operations)
+
+        if titles:
+            mongo.db.boards.update_one(
+                {"_id": ObjectId(board_id)},
+                {"$set": {f"lists.{list_ids.index(list_id)}.title": title for list_id, title in titles.items()}}
+            )
+
+        return {"applied": len(operations), "card_ids": card_ids}
+
+    @staticmethod
+    def update_card(user_id, card_id, title=None, sub_title=None, description=None, difficulty=None):
+        updates = {}
+        if title is not None:
+            updates["title"] = title
+        if sub_title is not None:
+            updates["sub_title"] = sub_title
+        if description is not None:
+            updates["description"] = description
+        if difficulty is not None:
+            if difficulty not in ["easy", "medium", "hard"]:
+                return {"message": "Invalid difficulty"}, 400
+            updates["difficulty"] = difficulty
+
+        # One write that only touches the changed fields and tells us whether
+        # the card exists, so there is no read beforehand
+        if updates:
+            found = Card.update_fields(user_id, card_id, updates) is not None
+        else:
+            found = Card.find_card(user_id, card_id, {"_id": 1}) is not None
+
+        if not found:
+            return {"message": "Card not found"}, 404
 
         return {"message": "Card updated successfully"}, 200
@@ -0,0 +1,667 @@
+import re
+from bson import ObjectId
+from datetime import datetime
+from pymongo import ReplaceOne, DeleteMany, DeleteOne, InsertOne, UpdateOne, UpdateMany, ReturnDocument
+from utils.db import mongo
+from models.card_movement_model import CardMovement
+from models.progress_stats_model import ProgressStats, PROGRESS_FIELDS
+
+# Keys that only exist on the stored card document, not on the card the client sees
+INTERNAL_FIELDS = ["_id", "user_id", "board_id", "list_id", "position"]
+
+# Only the most recent movements are kept on the card for display;
+# the full history lives in the card_movements collection
+MOVEMENT_DISPLAY_LIMIT = 10
+
+# Flags that move a card out of the active board into archived_cards
+ARCHIVE_FLAGS = ["archived", "deleted"]
+
+# Card ids minted by the server: this prefix and a base-36 sequence number.
+# Legacy ids built by the client ("<code>-<course>-<material>") never match.
+CARD_ID_PREFIX = "c"
+CARD_ID_PATTERN = r"^c[0-9a-z]+$"
+
+def _base36(number):
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    encoded = ""
+    while True:
+        number, remainder = divmod(number, 36)
+        encoded = digits[remainder] + encoded
+        if not number:
+            return encoded
+
+class Card:
+    @staticmethod
+    def is_archived(card):
+        return any(card.get(flag) for flag in ARCHIVE_FLAGS)
+
+    @staticmethod
+    def mint_ids(count=1):
+        """
+        Reserve count new card ids with a single increment of the card id counter
+
+        Returns:
+            list: Short ids unique across all boards, e.g. ["c1x", "c1y"]
+        """
+        if count <= 0:
+            return []
+        counter = mongo.db.counters.find_one_and_update(
+            {"_id": "card_id"},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        last = counter["seq"]
+        return [CARD_ID_PREFIX + _base36(seq) for seq in range(last - count + 1, last + 1)]
+
+    @staticmethod
+    def to_document(card, board_id, user_id, list_id, position):
+        """Build the stored card document from a card as the client sends it"""
+        document = {k: v for k, v in card.items() if k not in INTERNAL_FIELDS}
+        if document.get("column_movements"):
+            document["column_movements"] = document["column_movements"][-MOVEMENT_DISPLAY_LIMIT:]
+        document.update({
+            "board_id": ObjectId(board_id),
+            "user_id": ObjectId(user_id),
+            "list_id": list_id,
+            "position": position
+        })
+        return document
+
+    @staticmethod
+    def to_card(document):
+        """Strip storage-only keys so the card looks like it used to inside the board"""
+        return {k: v for k, v in document.items() if k not in INTERNAL_FIELDS}
+
+    @staticmethod
+    def find_cards_by_board(board_id, projection=None):
+        return list(
+            mongo.db.cards.find({"board_id": ObjectId(board_id)}, projection)
+            .sort([("list_id", 1), ("position", 1)])
+        )
+
+    @staticmethod
+    def find_cards_by_boards(board_ids, projection=None):
+        return list(
+            mongo.db.cards.find({"board_id": {"$in": [ObjectId(b) for b in board_ids]}}, projection)
+            .sort([("board_id", 1), ("list_id", 1), ("position", 1)])
+        )
+
+    @staticmethod
+    def find_card(user_id, card_id, projection=None):
+        try:
+            return mongo.db.cards.find_one({"user_id": ObjectId(user_id), "id": card_id}, projection)
+        except Exception as e:
+            print(f"Error finding card: {str(e)}")
+            return None
+
+    @staticmethod
+    def find_card_in_board(board_id, card_id, projection=None):
+        try:
+            return mongo.db.cards.find_one({"board_id": ObjectId(board_id), "id": card_id}, projection)
+        except Exception as e:
+            print(f"Error finding card in board: {str(e)}")
+            return None
+
+    @staticmethod
+    def find_cards_by_keys(user_id, card_keys, projection=None):
+        """
+        Cards of a user looked up by (board_id, card_id) pairs with one query
+
+        Returns:
+            dict: {(board_id as str, card_id): card} for the cards that exist
+        """
+        card_keys = {(str(board_id), card_id) for board_id, card_id in card_keys}
+        if not card_keys:
+            return {}
+        if projection and all(projection.values()):
+            # The key fields are needed to match the cards back to the pairs
+            projection = {**projection, "board_id": 1, "id": 1}
+        cards = mongo.db.cards.find({
+            "user_id": ObjectId(user_id),
+            "board_id": {"$in": list({ObjectId(board_id) for board_id, _ in card_keys})},
+            "id": {"$in": list({card_id for _, card_id in card_keys})}
+        }, projection)
+        found = {}
+        for card in cards:
+            key = (str(card["board_id"]), card["id"])
+            if key in card_keys:
+                found[key] = card
+        return found
+
+    @staticmethod
+    def _close_gap(board_id, list_id, position):
+        mongo.db.cards.update_many(
+            {"board_id": ObjectId(board_id), "list_id": list_id, "position": {"$gt": position}},
+            {"$inc": {"position": -1}}
+        )
+
+    @staticmethod
+    def update_fields(user_id, card_id, fields):
+        """
+        Set fields on a card looked up by its owner, without knowing the board
+
+        Returns:
+            dict: The card before the update, or None if it does not exist
+        """
+        projection = {field: 1 for field in PROGRESS_FIELDS}
+        projection["board_id"] = 1
+        card = mongo.db.cards.find_one_and_update(
+            {"user_id": ObjectId(user_id), "id": card_id},
+            {"$set": fields},
+            projection=projection
+        )
+        if card:
+            ProgressStats.apply_changes(card["board_id"], user_id, [card], [{**card, **fields}])
+        return card
+
+    @staticmethod
+    def archive_card(board_id, user_id, card_id, flags):
+        """
+        Move an active card to the archived_cards collection
+
+        The archive copy is written before the active card is removed, so an
+        interrupted call never loses the card. If the card is already archived
+        the flags are just applied to the archived copy.
+
+        Args:
+            flags (dict): Archive flags to set, e.g. {"archived": True} or {"deleted": True}
+
+        Returns:
+            bool: False if the card exists in neither collection
+        """
+        query = {"board_id": ObjectId(board_id), "user_id": ObjectId(user_id), "id": card_id}
+        card = mongo.db.cards.find_one(query)
+        if not card:
+            result = mongo.db.archived_cards.update_one(query, {"$set": flags})
+            return result.matched_count > 0
+
+        before = dict(card)
+        card.update(flags)
+        card["archived_at"] = datetime.utcnow()
+        mongo.db.archived_cards.replace_one({"_id": card["_id"]}, card, upsert=True)
+        mongo.db.cards.delete_one({"_id": card["_id"]})
+        Card._close_gap(board_id, card["list_id"], card["position"])
+        ProgressStats.apply_changes(board_id, user_id, [before], [])
+        return True
+
+    @staticmethod
+    def find_archived_cards(user_id, offset=0, limit=20):
+        """Archived (not deleted) cards of a user, most recently archived first"""
+        return list(
+            mongo.db.archived_cards.find({"user_id": ObjectId(user_id), "deleted": {"$ne": True}})
+            .sort([("archived_at", -1), ("_id", -1)])
+            .skip(offset)
+            .limit(limit)
+        )
+
+    @staticmethod
+    def apply_batch(board_id, user_id, operations):
+        """
+        Apply validated board operations with a single bulk_write on the cards collection
+
+        The layout of the board (list and position of every active card) is read
+        once and the operations are replayed against it in memory, in order.
+        Only the resulting field updates, inserts, deletes and changed positions
+        are written. Archiving and restoring also touch archived_cards, which
+        happens after the cards write so an interrupted batch never loses a card.
+
+        Returns:
+            int: Number of cards written
+
+        Raises:
+            ValueError: If a card is added with an id that already exists
+            LookupError: If an operation references a card that does not exist
+        """
+        board_oid = ObjectId(board_id)
+        user_oid = ObjectId(user_id)
+
+        layout = {}     # list_id -> card ids in order
+        stored = {}     # card id -> {"_id", "list_id", "position"} as stored
+        layout_fields = {field: 1 for field in PROGRESS_FIELDS}
+        layout_fields["position"] = 1
+        for card in mongo.db.cards.find(
+            {"board_id": board_oid}, layout_fields
+        ).sort([("list_id", 1), ("position", 1)]):
+            if card.get("id") in stored:
+                continue
+            stored[card["id"]] = card
+            layout.setdefault(card["list_id"], []).append(card["id"])
+
+        # Cards referenced by the batch that are not on the board may be archived
+        referenced = {op["card_id"] for op in operations if "card_id" in op} - set(stored)
+        archived = {}
+        if referenced:
+            archived = {
+                card["id"]: card
+                for card in mongo.db.archived_cards.find({"board_id": board_oid, "id": {"$in": list(referenced)}})
+            }
+
+        requests = []           # writes in operation order
+        created = {}            # card id -> document inserted by this batch
+        changes = {}            # card id -> fields set on a stored card
+        to_archive = {}         # card id -> archive flags
+        archive_requests = []
+        restored = []
+        movements = []
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+        def place(card_id, list_id, index):
+            cards = layout.setdefault(list_id, [])
+            if index is None:
+                cards.append(card_id)
+            else:
+                cards.insert(max(int(index), 0), card_id)
+
+        def unplace(card_id):
+            for cards in layout.values():
+                if card_id in cards:
+                    cards.remove(card_id)
+                    return
+
+        def set_fields(card_id, fields):
+            if card_id in created:
+                created[card_id].update(fields)
+            elif card_id in stored:
+                requests.append(UpdateOne({"_id": stored[card_id]["_id"]}, {"$set": fields}))
+                changes.setdefault(card_id, {}).update(fields)
+            elif card_id in archived:
+                archive_requests.append(UpdateOne({"_id": archived[card_id]["_id"]}, {"$set": fields}))
+            else:
+                raise LookupError(f"Card {card_id} not found")
+
+        def list_of(card_id):
+            for list_id, cards in layout.items():
+                if card_id in cards:
+                    return list_id
+            return None
+
+        for operation in operations:
+            op = operation["op"]
+
+            if op == "set_card_field":
+                card_id = operation["card_id"]
+                field = operation["field"]
+                value = operation.get("value")
+                active = list_of(card_id) is not None
+                if field in ARCHIVE_FLAGS and value and active:
+                    set_fields(card_id, {field: value})
+                    unplace(card_id)
+                    to_archive[card_id] = {field: value}
+                    if card_id in restored:
+                        restored.remove(card_id)
+                elif field == "archived" and not value and card_id in to_archive \
+                        and not to_archive[card_id].get("deleted"):
+                    # Archived earlier in this batch: keep it on the board instead
+                    del to_archive[card_id]
+                    set_fields(card_id, {"archived": False})
+                    place(card_id, list_of(card_id) or (created.get(card_id) or stored[card_id])["list_id"], None)
+                elif field == "archived" and not value and not active and card_id in archived \
+                        and not archived[card_id].get("deleted"):
+                    document = archived.pop(card_id)
+                    document.pop("archived_at", None)
+                    document["archived"] = False
+                    created[card_id] = document
+                    restored.append(card_id)
+                    place(card_id, document["list_id"], None)
+                else:
+                    set_fields(card_id, {field: value})
+
+            elif op == "add_card":
+                card = operation["card"]
+                if card["id"] in stored or card["id"] in created:
+                    raise ValueError(f"Card {card['id']} already exists")
+                created[card["id"]] = Card.to_document(card, board_id, user_id, operation["list_id"], None)
+                # New cards arrive with their initial placement as the first movement
+                movements.extend(Card._movement_records(user_id, board_id, card))
+                place(card["id"], operation["list_id"], operation.get("index"))
+
+            elif op == "remove_card":
+                card_id = operation["card_id"]
+                if list_of(card_id) is None:
+                    continue
+                unplace(card_id)
+                if card_id in created:
+                    del created[card_id]
+                else:
+                    requests.append(DeleteOne({"_id": stored[card_id]["_id"]}))
+
+            elif op == "move_card":
+                card_id = operation["card_id"]
+                from_list = list_of(card_id)
+                if from_list is None or from_list != operation["from_list"]:
+                    raise LookupError(f"Card {card_id} not found in {operation['from_list']}")
+                unplace(card_id)
+                place(card_id, operation["to_list"], operation.get("index"))
+                if from_list != operation["to_list"]:
+                    movement = {
+                        "user_id": str(user_id),
+                        "board_id": str(board_id),
+                        "card_id": card_id,
+                        "from_column": from_list,
+                        "to_column": operation["to_list"],
+                        "timestamp": now
+                    }
+                    movements.append(movement)
+                    entry = CardMovement.to_column_movement(movement)
+                    if card_id in created:
+                        history = created[card_id].setdefault("column_movements", [])
+                        history.append(entry)
+                        created[card_id]["column_movements"] = history[-MOVEMENT_DISPLAY_LIMIT:]
+                    else:
+                        requests.append(UpdateOne(
+                            {"_id": stored[card_id]["_id"]},
+                            {"$push": {"column_movements": {"$each": [entry], "$slice": -MOVEMENT_DISPLAY_LIMIT}}}
+                        ))
+
+            elif op == "reorder":
+                order = {card_id: i for i, card_id in enumerate(operation["card_ids"])}
+                cards = layout.get(operation["list_id"], [])
+                layout[operation["list_id"]] = sorted(cards, key=lambda c: order.get(c, len(order)))
+
+        # Final placement: new cards are written whole, existing ones only if they moved
+        after = []
+        for list_id, cards in layout.items():
+            for position, card_id in enumerate(cards):
+                if card_id in created:
+                    after.append(created[card_id])
+                else:
+                    after.append({**stored[card_id], **changes.get(card_id, {}), "list_id": list_id})
+                if card_id in created:
+                    document = created[card_id]
+                    document["list_id"] = list_id
+                    document["position"] = position
+                    if "_id" in document:
+                        requests.append(ReplaceOne({"_id": document["_id"]}, document, upsert=True))
+                    else:
+                        requests.append(InsertOne(document))
+                elif (stored[card_id]["list_id"], stored[card_id]["position"]) != (list_id, position):
+                    requests.append(UpdateOne(
+                        {"_id": stored[card_id]["_id"]},
+                        {"$set": {"list_id": list_id, "position": position}}
+                    ))
+
+        if requests:
+            mongo.db.cards.bulk_write(requests, ordered=True)
+        if movements:
+            mongo.db.card_movements.insert_many(movements, ordered=False)
+
+        if to_archive:
+            ids = list(to_archive)
+            existing = [card_id for card_id in ids if card_id in stored]
+            for document in [created[card_id] for card_id in ids if card_id in created]:
+                # Added (or restored) and archived again in the same batch: never written to cards
+                document.update({"board_id": board_oid, "user_id": user_oid, "archived_at": now})
+                document.pop("position", None)
+                if "_id" in document:
+                    archive_requests.append(ReplaceOne({"_id": document["_id"]}, document, upsert=True))
+                else:
+                    archive_requests.append(InsertOne(document))
+            if existing:
+                for document in mongo.db.cards.find({"board_id": board_oid, "id": {"$in": existing}}):
+                    document["archived_at"] = now
+                    archive_requests.append(ReplaceOne({"_id": document["_id"]}, document, upsert=True))
+        if archive_requests:
+            mongo.db.archived_cards.bulk_write(archive_requests, ordered=True)
+        if to_archive:
+            mongo.db.cards.delete_many({"board_id": board_oid, "id": {"$in": list(to_archive)}})
+        if restored:
+            mongo.db.archived_cards.delete_many({"board_id": board_oid, "id": {"$in": restored}})
+
+        ProgressStats.apply_changes(board_id, user_id, list(stored.values()), after)
+        return len(requests)
+
+    @staticmethod
+    def _movement_records(user_id, board_id, card):
+        """card_movements records for the column_movements a client card arrives with"""
+        records = []
+        for entry in card.get("column_movements") or []:
+            timestamp = CardMovement.parse_timestamp(entry.get("timestamp"))
+            if timestamp is None:
+                continue
+            records.append({
+                "user_id": str(user_id),
+                "board_id": str(board_id),
+                "card_id": card["id"],
+                "from_column": entry.get("fromColumn"),
+                "to_column": entry.get("toColumn"),
+                "timestamp": timestamp
+            })
+        return records
+
+    @staticmethod
+    def assign_minted_ids(collection, cards):
+        """
+        Replace legacy client-built ids of the given cards with minted ids
+
+        The old id is kept in legacy_id so that references to it can be
+        rewritten afterwards (see repoint_references()).
+
+        Args:
+            collection (str): "cards" or "archived_cards"
+            cards (list): Documents with at least _id and id
+        """
+        minted = Card.mint_ids(len(cards))
+        requests = [
+            UpdateOne({"_id": card["_id"], "id": card["id"]}, {"$set": {"id": card_id, "legacy_id": card["id"]}})
+            for card, card_id in zip(cards, minted)
+        ]
+        if requests:
+            mongo.db[collection].bulk_write(requests, ordered=False)
+        return len(requests)
+
+    @staticmethod
+    def mint_legacy_ids(board_id, user_id, lists):
+        """
+        Give client cards that still carry a legacy client-built id a minted one
+
+        Legacy ids are only unique per user, so they must never reach the
+        unique id index of the cards collection. A legacy id this board
+        already has a minted id for (from an earlier save or migration run)
+        keeps it; the others are minted with a single counter increment and
+        their references are rewritten (see repoint_references()).
+
+        Args:
+            board_id (str): Board the cards belong to
+            user_id (str): Owner of the board
+            lists (list): Lists with their cards as the client sends them
+
+        Returns:
+            list: The lists, legacy cards as copies with the minted id and their old id in legacy_id
+        """
+        cards = [card for list_ in lists for card in list_.get("cards", [])]
+        legacy_ids = {card.get("id") for card in cards if not re.match(CARD_ID_PATTERN, str(card.get("id") or ""))}
+        if not legacy_ids:
+            return lists
+
+        board_oid = ObjectId(board_id)
+        known = {}
+        for collection in ["cards", "archived_cards"]:
+            for document in mongo.db[collection].find(
+                {"board_id": board_oid, "legacy_id": {"$in": [card_id for card_id in legacy_ids if card_id]}},
+                {"_id": 0, "id": 1, "legacy_id": 1}
+            ):
+                known.setdefault(document["legacy_id"], []).append(document["id"])
+
+        pending = []
+
+        def minted(card):
+            card_id = card.get("id")
+            if card_id not in legacy_ids:
+                return card
+            card = {**card, "legacy_id": card_id} if card_id else dict(card)
+            if known.get(card_id):
+                # Two cards sharing a legacy id each keep one of its minted ids
+                card["id"] = known[card_id].pop(0)
+            else:
+                pending.append(card)
+            return card
+
+        lists = [
+            {**list_, "cards": [minted(card) for card in list_["cards"]]} if list_.get("cards") else list_
+            for list_ in lists
+        ]
+        for card, card_id in zip(pending, Card.mint_ids(len(pending))):
+            card["id"] = card_id
+        Card.repoint_references([
+            {"user_id": user_id, "board_id": board_oid, "id": card["id"], "legacy_id": card["legacy_id"]}
+            for card in pending if card.get("legacy_id")
+        ])
+        return lists
+
+    @staticmethod
+    def repoint_references(cards):
+        """
+        Rewrite legacy card ids in every collection that references cards
+
+        Legacy ids were only unique per user, so references are matched on
+        (user_id, board_id, legacy_id). When one user has several cards with
+        the same legacy id, its references cannot be told apart: they are
+        logged and left untouched. Safe to re-run.
+
+        Args:
+            cards (list): Documents with user_id, board_id, id and legacy_id
+
+        Returns:
+            int: Number of references rewritten
+        """
+        groups = {}
+        for card in cards:
+            key = (str(card["user_id"]), str(card["board_id"]), card["legacy_id"])
+            groups.setdefault(key, set()).add(card["id"])
+        if not groups:
+            return 0
+
+        # Cards of other batches or boards can share the legacy id too
+        minted_by_user = {}
+        query = {
+            "user_id": {"$in": list({ObjectId(user_id) for user_id, _, _ in groups})},
+            "legacy_id": {"$in": list({legacy_id for _, _, legacy_id in groups})}
+        }
+        for collection in ["cards", "archived_cards"]:
+            for document in mongo.db[collection].find(query, {"_id": 0, "user_id": 1, "legacy_id": 1, "id": 1}):
+                minted_by_user.setdefault((str(document["user_id"]), document["legacy_id"]), set()).add(document["id"])
+        for (user_id, _, legacy_id), new_ids in groups.items():
+            minted_by_user.setdefault((user_id, legacy_id), set()).update(new_ids)
+
+        user_requests = []
+        board_requests = []
+        for (user_id, board_id, legacy_id), new_ids in groups.items():
+            minted = minted_by_user[(user_id, legacy_id)]
+            if len(minted) > 1:
+                print(f"Ambiguous legacy card id {legacy_id} of user {user_id} "
+                      f"(now {', '.join(sorted(minted))}), references left untouched")
+                continue
+            new_id = next(iter(new_ids))
+            user_requests.append(UpdateMany(
+                {"user_id": {"$in": [user_id, ObjectId(user_id)]}, "card_id": legacy_id},
+                {"$set": {"card_id": new_id}}
+            ))
+            board_requests.append(UpdateMany(
+                {"board_id": board_id, "card_id": legacy_id},
+                {"$set": {"card_id": new_id}}
+            ))
+
+        updated = 0
+        if user_requests:
+            for collection in ["study_sessions", "study_time_rollups", "attachments", "chatbot_logs"]:
+                updated += mongo.db[collection].bulk_write(user_requests, ordered=False).modified_count
+        if board_requests:
+            updated += mongo.db.card_movements.bulk_write(board_requests, ordered=False).modified_count
+        return updated
+
+    @staticmethod
+    def replace_board_cards(board_id, user_id, lists):
+        """
+        Sync the cards collection with a full lists payload from the client
+
+        Cards flagged archived/deleted in the payload are kept in archived_cards
+        instead, and cards that come back unflagged are removed from the archive.
+        """
+        lists = Card.mint_legacy_ids(board_id, user_id, lists)
+        requests = []
+        archive_requests = []
+        card_ids = []
+        active_cards = []
+        for list_ in lists:
+            position = 0
+            for card in list_.get("cards", []):
+                if Card.is_archived(card):
+                    document = Card.to_document(card, board_id, user_id, list_["id"], None)
+                    document.pop("position")
+                    archive_requests.append(UpdateOne(
+                        {"board_id": ObjectId(board_id), "id": card["id"]},
+                        {"$set": document, "$setOnInsert": {"archived_at": datetime.utcnow()}},
+                        upsert=True
+                    ))
+                    continue
+
+                document = Card.to_document(card, board_id, user_id, list_["id"], position)
+                # Movements the client appended itself still end up in card_movements
+                active_cards.append(document)
+                requests.append(ReplaceOne(
+                    {"board_id": ObjectId(board_id), "id": card["id"]},
+                    document,
+                    upsert=True
+                ))
+                card_ids.append(card["id"])
+                position += 1
+
+        if archive_requests:
+            mongo.db.archived_cards.bulk_write(archive_requests, ordered=False)
+        if card_ids:
+            mongo.db.archived_cards.delete_many({"board_id": ObjectId(board_id), "id": {"$in": card_ids}})
+
+        CardMovement.record_column_movements(user_id, board_id, active_cards)
+
+        requests.append(DeleteMany({"board_id": ObjectId(board_id), "id": {"$nin": card_ids}}))
+        result = mongo.db.cards.bulk_write(requests, ordered=True)
+        # A full save rewrites every card, so the counters are rebuilt from the payload
+        ProgressStats.rebuild(board_id, user_id, active_cards)
+        return result
+
+    @staticmethod
+    def migrate_embedded_cards(board):
+        """
+        Copy the cards embedded in board["lists"] into the cards collection
+
+        Cards are upserted on (board_id, list_id, position), so running this twice
+        for the same board (or from two workers at once) does not duplicate cards.
+        Legacy client-built ids are replaced by minted ones on the way (see
+        mint_legacy_ids()), as they would collide with other users' cards.
+
+        Returns:
+            int: Number of embedded cards found
+        """
+        requests = []
+        archive_requests = []
+        for list_ in Card.mint_legacy_ids(board["_id"], board["user_id"], board.get("lists", [])):
+            position = 0
+            # Keep the full history before to_document() trims the arrays
+            CardMovement.record_column_movements(board["user_id"], board["_id"], list_.get("cards", []))
+            for card in list_.get("cards", []):
+                if Card.is_archived(card):
+                    # Archived and deleted cards go straight to the archive tier
+                    document = Card.to_document(card, board["_id"], board["user_id"], list_["id"], None)
+                    document.pop("position")
+                    document["archived_at"] = datetime.utcnow()
+                    archive_requests.append(UpdateOne(
+                        {"board_id": document["board_id"], "id": document["id"]},
+                        {"$setOnInsert": document},
+                        upsert=True
+                    ))
+                    continue
+
+                document = Card.to_document(card, board["_id"], board["user_id"], list_["id"], position)
+                requests.append(UpdateOne(
+                    {"board_id": document["board_id"], "list_id": document["list_id"], "position": position},
+                    {"$setOnInsert": document},
+                    upsert=True
+                ))
+                position += 1
+        if requests:
+            mongo.db.cards.bulk_write(requests, ordered=False)
+        if archive_requests:
+            mongo.db.archived_cards.bulk_write(archive_requests, ordered=False)
+        return len(requests) + len(archive_requests)
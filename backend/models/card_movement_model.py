@@ -0,0 +1,201 @@
+from datetime import datetime, timedelta, timezone
+from pymongo import InsertOne, UpdateOne
+from utils.db import mongo
+
+class CardMovement:
+    @staticmethod
+    def record(user_id, board_id, card_id, from_column, to_column, timestamp=None, username=None, card_title=None):
+        """
+        Append one movement to the card_movements collection
+
+        Args:
+            user_id (str): ID of the user who moved the card
+            board_id (str): ID of the board the card belongs to
+            card_id (str): ID of the card
+            from_column (str): ID of the source list
+            to_column (str): ID of the destination list
+            timestamp (datetime): When the movement happened (default: now)
+
+        Returns:
+            str: The ID of the movement record
+        """
+        movement = CardMovement.document(user_id, board_id, card_id, from_column, to_column, timestamp, username, card_title)
+        result = mongo.db.card_movements.insert_one(movement)
+        return str(result.inserted_id)
+
+    @staticmethod
+    def record_request(user_id, board_id, card_id, from_column, to_column, timestamp=None, username=None, card_title=None):
+        """Bulk-write variant of record(): an insert of one movement, never merged with another"""
+        return InsertOne(CardMovement.document(user_id, board_id, card_id, from_column, to_column, timestamp, username, card_title))
+
+    @staticmethod
+    def document(user_id, board_id, card_id, from_column, to_column, timestamp=None, username=None, card_title=None):
+        """The card_movements document of one movement, see record() for the arguments"""
+        movement = {
+            "user_id": str(user_id),
+            "board_id": str(board_id),
+            "card_id": card_id,
+            "from_column": from_column,
+            "to_column": to_column,
+            "timestamp": timestamp or datetime.utcnow()
+        }
+        if username is not None:
+            movement["username"] = username
+        if card_title is not None:
+            movement["card_title"] = card_title
+        return movement
+
+    @staticmethod
+    def record_column_movements(user_id, board_id, cards):
+        """
+        Store the column_movements entries of one or more cards of a board
+
+        Entries are upserted on (card, to_column, timestamp), so replaying the
+        same arrays (e.g. on a full board save or from the backfill script)
+        does not duplicate them.
+
+        Args:
+            cards (list): Cards with "id" and "column_movements"
+
+        Returns:
+            int: Number of entries processed
+        """
+        requests = []
+        for card in cards:
+            for entry in card.get("column_movements") or []:
+                timestamp = CardMovement.parse_timestamp(entry.get("timestamp"))
+                if timestamp is None:
+                    continue
+                key = {
+                    "board_id": str(board_id),
+                    "card_id": card["id"],
+                    "to_column": entry.get("toColumn"),
+                    "timestamp": timestamp
+                }
+                requests.append(UpdateOne(
+                    key,
+                    {"$setOnInsert": {**key, "user_id": str(user_id), "from_column": entry.get("fromColumn")}},
+                    upsert=True
+                ))
+        if requests:
+            mongo.db.card_movements.bulk_write(requests, ordered=False)
+        return len(requests)
+
+    @staticmethod
+    def record_once_request(user_id, board_id, card_id, from_column, to_column, username=None, card_title=None, window_seconds=60):
+        """
+        Upsert that records a movement unless the same movement was recorded in the last window_seconds
+
+        Used by callers that report a movement after the board write already
+        stored it, so the event is kept once; any extra details are added to
+        the existing record instead. The window is measured from the time the
+        request is built, so it can be queued and written later.
+        """
+        now = datetime.utcnow()
+        details = {}
+        if username is not None:
+            details["username"] = username
+        if card_title is not None:
+            details["card_title"] = card_title
+
+        update = {"$setOnInsert": {"user_id": str(user_id), "timestamp": now}}
+        if details:
+            update["$set"] = details
+
+        return UpdateOne(
+            {
+                "board_id": str(board_id),
+                "card_id": card_id,
+                "from_column": from_column,
+                "to_column": to_column,
+                "timestamp": {"$gte": now - timedelta(seconds=window_seconds)}
+            },
+            update,
+            upsert=True
+        )
+
+    @staticmethod
+    def find_by_card(board_id, card_id, limit=None):
+        """
+        Movements of a card in chronological order
+
+        Args:
+            limit (int): Only return the most recent movements (all if None)
+        """
+        cursor = mongo.db.card_movements.find(
+            {"card_id": card_id, "board_id": str(board_id)},
+            {"_id": 0, "from_column": 1, "to_column": 1, "timestamp": 1}
+        ).sort("timestamp", -1)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        movements = list(cursor)
+        movements.reverse()
+        return movements
+
+    @staticmethod
+    def find_by_cards(card_keys, limit=None):
+        """
+        Recent movements and movement counts of many cards with one aggregation
+
+        Args:
+            card_keys (iterable): (board_id, card_id) pairs
+            limit (int): Only return the most recent movements per card (all if None)
+
+        Returns:
+            dict: {(board_id, card_id): (movements in chronological order, total count)}
+        """
+        card_keys = {(str(board_id), card_id) for board_id, card_id in card_keys}
+        if not card_keys:
+            return {}
+
+        recent = "$movements" if not limit else {"$slice": ["$movements", limit]}
+        rows = mongo.db.card_movements.aggregate([
+            {"$match": {
+                "board_id": {"$in": list({board_id for board_id, _ in card_keys})},
+                "card_id": {"$in": list({card_id for _, card_id in card_keys})}
+            }},
+            {"$sort": {"timestamp": -1}},
+            {"$group": {
+                "_id": {"board_id": "$board_id", "card_id": "$card_id"},
+                "movements": {"$push": {"from_column": "$from_column", "to_column": "$to_column", "timestamp": "$timestamp"}},
+                "count": {"$sum": 1}
+            }},
+            {"$project": {"movements": recent, "count": 1}}
+        ])
+
+        found = {key: ([], 0) for key in card_keys}
+        for row in rows:
+            key = (row["_id"]["board_id"], row["_id"]["card_id"])
+            if key in found:
+                found[key] = (list(reversed(row["movements"])), row["count"])
+        return found
+
+    @staticmethod
+    def count_by_card(board_id, card_id):
+        return mongo.db.card_movements.count_documents({"card_id": card_id, "board_id": str(board_id)})
+
+    @staticmethod
+    def parse_timestamp(value):
+        """Parse an ISO timestamp from the client into a naive UTC datetime"""
+        if isinstance(value, datetime):
+            return value
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except (AttributeError, ValueError):
+            return None
+        if parsed.tzinfo:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+    @staticmethod
+    def to_column_movement(movement):
+        """Shape a movement record like an entry of card["column_movements"]"""
+        timestamp = movement["timestamp"]
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat(timespec="milliseconds") + "Z"
+        return {
+            "fromColumn": movement["from_column"],
+            "toColumn": movement["to_column"],
+            "timestamp": timestamp
+        }
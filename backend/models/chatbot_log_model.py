@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta
+from utils.db import mongo
+from utils.pagination import fetch_page
+
+# Movement types counted by the chatbot stats
+MOVEMENT_TYPES = ["forward", "backward", "same"]
+# Number of cards listed as most active
+MOST_ACTIVE_CARDS = 5
+# History totals are counted up to this many logs and reported as a lower bound beyond
+HISTORY_TOTAL_CAP = 10000
+
+class ChatbotLog:
+    @staticmethod
+    def parse_date_range(date_from=None, date_to=None):
+        """
+        Validate an optional date range
+
+        Args:
+            date_from (str): First day to include, YYYY-MM-DD
+            date_to (str): Last day to include, YYYY-MM-DD
+
+        Returns:
+            tuple: (start, end) datetimes, end being the day after date_to; None when not given
+
+        Raises:
+            ValueError: If a date is not in YYYY-MM-DD format
+        """
+        bounds = []
+        for label, value, offset in [("from", date_from, 0), ("to", date_to, 1)]:
+            if not value:
+                bounds.append(None)
+                continue
+            try:
+                bounds.append(datetime.strptime(value, "%Y-%m-%d") + timedelta(days=offset))
+            except ValueError:
+                raise ValueError(f"'{label}' must be a date in YYYY-MM-DD format")
+        return tuple(bounds)
+
+    @staticmethod
+    def created_at_match(start=None, end=None):
+        """
+        Query on created_at for a date range
+
+        Card-movement logs store created_at as an ISO string and general chat
+        logs as a datetime, so the range is matched against both; each branch
+        uses the (user_id, created_at) index.
+        """
+        if not start and not end:
+            return {}
+        as_string, as_date = {}, {}
+        if start:
+            as_string["$gte"] = start.strftime("%Y-%m-%d")
+            as_date["$gte"] = start
+        if end:
+            as_string["$lt"] = end.strftime("%Y-%m-%d")
+            as_date["$lt"] = end
+        return {"$or": [{"created_at": as_string}, {"created_at": as_date}]}
+
+    @staticmethod
+    def history(user_id, limit, before=None):
+        """
+        One page of a user's chatbot logs, newest first
+
+        Args:
+            user_id (str): ID of the user
+            limit (int): Number of logs on the page
+            before (str): Cursor returned with the previous page
+
+        Returns:
+            tuple: (logs, cursor of the next page or None)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        logs, next_cursor = fetch_page(mongo.db.chatbot_logs, {"user_id": user_id}, limit, before)
+        for log in logs:
+            log["_id"] = str(log["_id"])
+        return logs, next_cursor
+
+    @staticmethod
+    def approximate_total(user_id):
+        """
+        Number of logs of a user, counted on the (user_id, created_at, _id)
+        index and capped at HISTORY_TOTAL_CAP
+
+        Returns:
+            tuple: (count, whether it is exact)
+        """
+        count = mongo.db.chatbot_logs.count_documents({"user_id": user_id}, limit=HISTORY_TOTAL_CAP)
+        return count, count < HISTORY_TOTAL_CAP
+
+    @staticmethod
+    def stats(user_id, start=None, end=None):
+        """
+        Interaction counts of one user in a single aggregation
+
+        Args:
+            user_id (str): ID of the user
+            start (datetime): First moment to include
+            end (datetime): Moment after the last one to include
+
+        Returns:
+            dict: total_interactions, response_types, movement_types and most_active_cards
+        """
+        match = {"user_id": user_id}
+        match.update(ChatbotLog.created_at_match(start, end))
+        pipeline = [
+            {"$match": match},
+            {"$project": {"_id": 0, "response_type": 1, "movement_type": 1, "card_id": 1}},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "response_types": [
+                    {"$group": {"_id": "$response_type", "count": {"$sum": 1}}}
+                ],
+                "movement_types": [
+                    {"$match": {"movement_type": {"$in": MOVEMENT_TYPES}}},
+                    {"$group": {"_id": "$movement_type", "count": {"$sum": 1}}}
+                ],
+                "most_active_cards": [
+                    {"$match": {"card_id": {"$nin": [None, ""]}}},
+                    {"$group": {"_id": "$card_id", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                    {"$limit": MOST_ACTIVE_CARDS}
+                ]
+            }}
+        ]
+        result = next(mongo.db.chatbot_logs.aggregate(pipeline), {})
+
+        total = result.get("total") or [{"count": 0}]
+        movement_types = dict.fromkeys(MOVEMENT_TYPES, 0)
+        for group in result.get("movement_types", []):
+            movement_types[group["_id"]] = group["count"]
+        return {
+            "total_interactions": total[0]["count"],
+            # Logs without a response type (general chat) count as "unknown"
+            "response_types": {
+                (group["_id"] if group["_id"] is not None else "unknown"): group["count"]
+                for group in result.get("response_types", [])
+            },
+            "movement_types": movement_types,
+            "most_active_cards": [[group["_id"], group["count"]] for group in result.get("most_active_cards", [])]
+        }
@@ -0,0 +1,174 @@
+import zlib
+from collections import Counter
+from pymongo import UpdateOne
+from utils.db import mongo
+
+# Grades are bucketed into bins of this width between 0 and MAX_GRADE;
+# anything outside is clamped into the first or last bin
+BIN_WIDTH = 0.5
+MAX_GRADE = 100
+
+# Each sketch is split over this many documents by user, so concurrent
+# updates from different students rarely touch the same document
+SKETCH_SHARDS = 8
+
+class GradeSketch:
+    """
+    Cohort grade distributions in the grade_sketches collection
+
+    One document per (strategy, course, test, shard):
+        {"strategy", "course", "test", "shard", "count", "bins": {"<bin>": count}}
+
+    A sketch is a fixed-width histogram: merging two sketches is adding their
+    bins, and a grade that is edited or removed is subtracted again, which
+    t-digest or KLL sketches cannot do. Quantiles and percentile ranks are
+    exact up to BIN_WIDTH.
+    """
+
+    @staticmethod
+    def bin_of(value):
+        last = int(MAX_GRADE / BIN_WIDTH)
+        return min(max(int(round(value / BIN_WIDTH)), 0), last)
+
+    @staticmethod
+    def bin_value(index):
+        return index * BIN_WIDTH
+
+    @staticmethod
+    def shard_of(user_id):
+        return zlib.crc32(str(user_id).encode()) % SKETCH_SHARDS
+
+    @staticmethod
+    def apply(user_id, deltas):
+        """
+        Add grade count changes of one user to the sketches
+
+        Args:
+            deltas (dict): {(strategy, course, test, value): change in count}
+        """
+        shard = GradeSketch.shard_of(user_id)
+        updates = {}
+        for (strategy, course, test, value), amount in deltas.items():
+            if not amount:
+                continue
+            update = updates.setdefault((strategy, course, test), Counter())
+            update[f"bins.{GradeSketch.bin_of(value)}"] += amount
+            update["count"] += amount
+
+        requests = [
+            UpdateOne(
+                {"strategy": strategy, "course": course, "test": test, "shard": shard},
+                {"$inc": dict(increments)},
+                upsert=True
+            )
+            for (strategy, course, test), increments in updates.items()
+        ]
+        if requests:
+            mongo.db.grade_sketches.bulk_write(requests, ordered=False)
+        return len(requests)
+
+    @staticmethod
+    def load(tests=None, strategies=None, courses=None):
+        """
+        Merged sketches for the given tests, per strategy and per course
+
+        Returns:
+            dict: {"strategy": {(strategy, test): bins}, "course": {(course, test): bins}}
+                  where bins is a Counter of bin index -> count
+        """
+        query = {}
+        if tests is not None:
+            query["test"] = {"$in": list(tests)}
+        groups = []
+        if strategies is not None:
+            groups.append({"strategy": {"$in": list(strategies)}})
+        if courses is not None:
+            groups.append({"course": {"$in": list(courses)}})
+        if groups:
+            query["$or"] = groups
+
+        merged = {"strategy": {}, "course": {}}
+        for sketch in mongo.db.grade_sketches.find(query, {"_id": 0, "shard": 0}):
+            bins = Counter({int(index): count for index, count in (sketch.get("bins") or {}).items() if count})
+            if sketch.get("strategy") and (strategies is None or sketch["strategy"] in strategies):
+                merged["strategy"].setdefault((sketch["strategy"], sketch["test"]), Counter()).update(bins)
+            if sketch.get("course") and (courses is None or sketch["course"] in courses):
+                merged["course"].setdefault((sketch["course"], sketch["test"]), Counter()).update(bins)
+        return merged
+
+    @staticmethod
+    def percentile_rank(bins, value):
+        """Percentage of grades in the sketch strictly below value"""
+        total = sum(bins.values())
+        if not total:
+            return None
+        below = sum(count for index, count in bins.items() if index < GradeSketch.bin_of(value))
+        return round(below / total * 100, 1)
+
+    @staticmethod
+    def quantile(bins, q):
+        """Smallest grade (bin value) with at least a fraction q of the sketch at or below it"""
+        total = sum(bins.values())
+        if not total:
+            return None
+        seen = 0
+        for index in sorted(bins):
+            seen += bins[index]
+            if seen >= q * total:
+                return GradeSketch.bin_value(index)
+        return GradeSketch.bin_value(max(bins))
+
+    @staticmethod
+    def add_percentiles(report):
+        """
+        Add the cohort percentile of the student's grades to a progress report
+
+        Each strategy_stats entry gets the percentile rank of its median and
+        each course_stats entry that of its average, among all students'
+        grades with the same strategy or course and test.
+        """
+        strategy_stats = report.get("strategy_stats", {})
+        course_stats = report.get("course_stats", {})
+        if not strategy_stats and not course_stats:
+            return report
+
+        sketches = GradeSketch.load(strategies=list(strategy_stats), courses=list(course_stats))
+        for group, stats_by_name, value_key in [
+            ("strategy", strategy_stats, "median"),
+            ("course", course_stats, "avg")
+        ]:
+            for name, by_type in stats_by_name.items():
+                for test, stats in by_type.items():
+                    bins = sketches[group].get((name, test))
+                    stats["cohort_percentile"] = (
+                        GradeSketch.percentile_rank(bins, stats[value_key])
+                        if bins and stats.get("count") else None
+                    )
+        return report
+
+    @staticmethod
+    def rebuild_all():
+        """
+        Recompute every sketch from the grade counters of all boards
+
+        Returns:
+            int: Number of sketch documents written
+        """
+        sketches = {}
+        for counter in mongo.db.progress_stats.find({"kind": "grade", "count": {"$gt": 0}}):
+            key = (
+                counter.get("strategy"), counter.get("course"), counter.get("test"),
+                GradeSketch.shard_of(counter.get("user_id"))
+            )
+            sketch = sketches.setdefault(key, Counter())
+            sketch[str(GradeSketch.bin_of(counter["value"]))] += counter["count"]
+
+        mongo.db.grade_sketches.delete_many({})
+        documents = [
+            {"strategy": strategy, "course": course, "test": test, "shard": shard,
+             "count": sum(bins.values()), "bins": dict(bins)}
+            for (strategy, course, test, shard), bins in sketches.items()
+        ]
+        if documents:
+            mongo.db.grade_sketches.insert_many(documents)
+        return len(documents)
@@ -1,8 +1,47 @@
 from utils.db import mongo
 from bson.objectid import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument
+
+# Counter document bumped on every catalog change, so each server process
+# can tell its cached strategies are stale (see utils/strategy_cache.py)
+CATALOG_VERSION_ID = "learning_strats"
 
 class LearningStrat:
+    @staticmethod
+    def catalog_version():
+        counter = mongo.db.counters.find_one({"_id": CATALOG_VERSION_ID})
+        return counter["seq"] if counter else 0
+
+    @staticmethod
+    def bump_catalog_version():
+        counter = mongo.db.counters.find_one_and_update(
+            {"_id": CATALOG_VERSION_ID},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter["seq"]
+
+    @staticmethod
+    def find_by_keys(keys):
+        """
+        Strategies looked up by ID or by name (cards store either)
+
+        Returns:
+            list: Matching strategy documents
+        """
+        ids = [ObjectId(key) for key in keys if ObjectId.is_valid(key)]
+        names = [key for key in keys if not ObjectId.is_valid(key)]
+        query = []
+        if ids:
+            query.append({"_id": {"$in": ids}})
+        if names:
+            query.append({"learning_strat_name": {"$in": names}})
+        if not query:
+            return []
+        return list(mongo.db.learning_strats.find({"$or": query}))
+
     @staticmethod
     def add_learning_strat(learning_strat_name, description):
         learning_strat_data = {
@@ -11,6 +50,7 @@ class LearningStrat:
             "created_at": datetime.utcnow()
         }
         learning_strat_id = mongo.db.learning_strats.insert_one(learning_strat_data).inserted_id
+        LearningStrat.bump_catalog_version()
         return learning_strat_id
     
     @staticmethod
@@ -33,6 +73,8 @@ class LearningStrat:
             return None
         
         result = mongo.db.learning_strats.update_one({"_id": object_id}, {"$set": updates})
+        if result.modified_count:
+            LearningStrat.bump_catalog_version()
         return result
     
     @staticmethod
@@ -43,6 +85,8 @@ class LearningStrat:
             return None
         
         result = mongo.db.learning_strats.delete_one({"_id": object_id})
+        if result.deleted_count:
+            LearningStrat.bump_catalog_version()
         return result
 
     @staticmethod
@@ -53,4 +97,6 @@ class LearningStrat:
             {"created_at": {"$exists": False}},
             {"$set": {"created_at": current_time}}
         )
+        if result.modified_count:
+            LearningStrat.bump_catalog_version()
         return result.modified_count
\ No newline at end of file
@@ -0,0 +1,277 @@
+import zlib
+from datetime import datetime, timedelta
+from bson import Binary, json_util
+from bson.json_util import JSONOptions, JSONMode
+from pymongo import ReplaceOne
+from utils.db import mongo
+from config import Config
+from models.chatbot_log_model import ChatbotLog
+
+# Collections under the retention policy:
+#   archive        cold collection holding the compressed monthly archives
+#   owner          field the archives are split by
+#   time_field     BSON date field the TTL index expires raw entries on
+#   retention_days entries older than this are archived (0 keeps everything)
+ARCHIVE_SOURCES = {
+    "chatbot_logs": {
+        "archive": "chatbot_log_archives",
+        "owner": "user_id",
+        "time_field": "logged_at",
+        "retention_days": Config.CHATBOT_LOG_RETENTION_DAYS
+    },
+    "logs": {
+        "archive": "log_archives",
+        "owner": "username",
+        "time_field": "created_at",
+        "retention_days": Config.AUTH_LOG_RETENTION_DAYS
+    }
+}
+
+# Entries are serialized as extended JSON, so dates and ObjectIds round-trip
+ARCHIVE_JSON_OPTIONS = JSONOptions(json_mode=JSONMode.CANONICAL, tz_aware=False)
+# Archives are compressed with zstd when the zstandard package is installed, zlib otherwise
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+# Restored entries are written this many at a time
+RESTORE_BATCH_SIZE = 1000
+
+def zstd_available():
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def compress(data):
+    """
+    Returns:
+        tuple: (codec name, compressed bytes)
+    """
+    if zstd_available():
+        import zstandard
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+def decompress(codec, data):
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd":
+        if not zstd_available():
+            raise RuntimeError("This archive is zstd-compressed; install the zstandard package to read it")
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+class LogArchive:
+    """
+    Retention and tiering of chatbot_logs and logs
+
+    Raw entries stay in their collection for the retention period. compact()
+    then moves every whole month past the retention into the archive
+    collection, one document per owner, month and part:
+        {"owner", "month": "YYYY-MM", "part", "codec", "count",
+         "first_at", "last_at", "archived_at", "data": <compressed NDJSON>}
+    and deletes the archived raw entries, so the raw collections and their
+    indexes only ever hold the retention window. read() decompresses
+    archives again for audits.
+    """
+
+    @staticmethod
+    def source(name):
+        if name not in ARCHIVE_SOURCES:
+            raise ValueError(f"source must be one of: {', '.join(ARCHIVE_SOURCES)}")
+        return ARCHIVE_SOURCES[name]
+
+    @staticmethod
+    def entry_time(name, entry):
+        """When a raw entry was written, whatever form its timestamp has"""
+        source = ARCHIVE_SOURCES[name]
+        value = entry.get(source["time_field"]) or entry.get("created_at")
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None)
+        if isinstance(value, str) and value:
+            try:
+                parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+                return parsed.replace(tzinfo=None)
+            except ValueError:
+                pass
+        return entry["_id"].generation_time.replace(tzinfo=None)
+
+    @staticmethod
+    def cutoff(name, now=None):
+        """
+        Start of the oldest month still kept raw: entries before it are archived
+
+        Returns:
+            datetime: The cutoff, or None if the source keeps everything
+        """
+        retention_days = ARCHIVE_SOURCES[name]["retention_days"]
+        if retention_days <= 0:
+            return None
+        limit = (now or datetime.utcnow()) - timedelta(days=retention_days)
+        return datetime(limit.year, limit.month, 1)
+
+    @staticmethod
+    def ttl_seconds(name):
+        """Age at which the TTL index deletes raw entries, or None for no TTL index"""
+        retention_days = ARCHIVE_SOURCES[name]["retention_days"]
+        if retention_days <= 0:
+            return None
+        # A month past the retention may wait for compaction until it is whole
+        return (retention_days + 31 + Config.LOG_TTL_GRACE_DAYS) * 24 * 3600
+
+    @staticmethod
+    def _older_than(name, cutoff):
+        source = ARCHIVE_SOURCES[name]
+        if name == "chatbot_logs":
+            # Entries written before logged_at existed only have created_at
+            return {"$or": [
+                {"logged_at": {"$lt": cutoff}},
+                {"$and": [{"logged_at": {"$exists": False}}, ChatbotLog.created_at_match(None, cutoff)]}
+            ]}
+        return {source["time_field"]: {"$lt": cutoff}}
+
+    @staticmethod
+    def _write_archives(name, owner, entries):
+        source = ARCHIVE_SOURCES[name]
+        archives = mongo.db[source["archive"]]
+        by_month = {}
+        for entry in entries:
+            at = LogArchive.entry_time(name, entry)
+            by_month.setdefault(at.strftime("%Y-%m"), []).append((at, entry))
+
+        documents = []
+        for month, dated in sorted(by_month.items()):
+            dated.sort(key=lambda item: (item[0], item[1]["_id"]))
+            lines = "\n".join(json_util.dumps(entry, json_options=ARCHIVE_JSON_OPTIONS) for _, entry in dated)
+            raw_data = lines.encode("utf-8")
+            codec, data = compress(raw_data)
+            # A month archived before (e.g. late writes) gets another part
+            part = archives.count_documents({"owner": owner, "month": month})
+            documents.append({
+                "owner": owner,
+                "month": month,
+                "part": part,
+                "codec": codec,
+                "count": len(dated),
+                "first_at": dated[0][0],
+                "last_at": dated[-1][0],
+                "archived_at": datetime.utcnow(),
+                "raw_bytes": len(raw_data),
+                "data": Binary(data)
+            })
+        if documents:
+            archives.insert_many(documents)
+        return documents
+
+    @staticmethod
+    def compact(name, now=None, dry_run=False):
+        """
+        Archive the entries of a source past its retention
+
+        Entries are read owner by owner; an owner's raw entries are deleted
+        only after their archives were written, so an interrupted run at
+        worst archives some entries twice and never loses any.
+
+        Returns:
+            dict: owners, entries, archives and bytes before and after compression
+        """
+        source = LogArchive.source(name)
+        cutoff = LogArchive.cutoff(name, now)
+        stats = {"source": name, "cutoff": cutoff, "owners": 0, "entries": 0,
+                 "archives": 0, "raw_bytes": 0, "compressed_bytes": 0}
+        if cutoff is None:
+            return stats
+
+        raw = mongo.db[name]
+        query = LogArchive._older_than(name, cutoff)
+        owners = raw.distinct(source["owner"], query)
+        for owner in owners:
+            owner_query = {"$and": [{source["owner"]: owner}, query]}
+            entries = list(raw.find(owner_query))
+            if not entries:
+                continue
+            stats["owners"] += 1
+            stats["entries"] += len(entries)
+            if dry_run:
+                continue
+            documents = LogArchive._write_archives(name, owner, entries)
+            raw.delete_many({"_id": {"$in": [entry["_id"] for entry in entries]}})
+            stats["archives"] += len(documents)
+            stats["raw_bytes"] += sum(document["raw_bytes"] for document in documents)
+            stats["compressed_bytes"] += sum(len(document["data"]) for document in documents)
+        return stats
+
+    @staticmethod
+    def months(name, owner):
+        """Archived months of an owner, without their data"""
+        source = LogArchive.source(name)
+        summaries = {}
+        for archive in mongo.db[source["archive"]].find({"owner": owner}, {"data": 0}).sort("month", 1):
+            summary = summaries.setdefault(archive["month"], {"month": archive["month"], "count": 0, "parts": 0})
+            summary["count"] += archive["count"]
+            summary["parts"] += 1
+        return list(summaries.values())
+
+    @staticmethod
+    def read(name, owner, month_from=None, month_to=None):
+        """
+        Archived entries of an owner, oldest first
+
+        Args:
+            month_from (str): First month to include, YYYY-MM
+            month_to (str): Last month to include, YYYY-MM
+
+        Returns:
+            iterator: The raw entries as they were archived, decompressed one archive at a time
+
+        Raises:
+            ValueError: If the source or a month is invalid
+        """
+        source = LogArchive.source(name)
+        for label, value in [("from", month_from), ("to", month_to)]:
+            if value:
+                try:
+                    datetime.strptime(value, "%Y-%m")
+                except ValueError:
+                    raise ValueError(f"'{label}' must be a month in YYYY-MM format")
+        query = {"owner": owner}
+        month = {}
+        if month_from:
+            month["$gte"] = month_from
+        if month_to:
+            month["$lte"] = month_to
+        if month:
+            query["month"] = month
+
+        archives = mongo.db[source["archive"]].find(query).sort([("month", 1), ("part", 1)])
+        return LogArchive._entries(archives)
+
+    @staticmethod
+    def _entries(archives):
+        for archive in archives:
+            lines = decompress(archive["codec"], archive["data"]).decode("utf-8")
+            for line in lines.split("\n"):
+                if line:
+                    yield json_util.loads(line, json_options=ARCHIVE_JSON_OPTIONS)
+
+    @staticmethod
+    def restore(name, owner, month_from=None, month_to=None):
+        """
+        Copy archived entries back into <source>_restored for an audit
+
+        The copy has no TTL index and is not compacted again, so it stays
+        until it is dropped. Entries keep their _id, so restoring twice
+        does not duplicate them.
+
+        Returns:
+            int: Number of entries restored
+        """
+        restored = mongo.db[f"{name}_restored"]
+        requests = [
+            ReplaceOne({"_id": entry["_id"]}, entry, upsert=True)
+            for entry in LogArchive.read(name, owner, month_from, month_to)
+        ]
+        for start in range(0, len(requests), RESTORE_BATCH_SIZE):
+            restored.bulk_write(requests[start:start + RESTORE_BATCH_SIZE], ordered=False)
+        return len(requests)
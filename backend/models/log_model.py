@@ -1,6 +1,7 @@
 from utils.db import mongo
 from bson.objectid import ObjectId
 from datetime import datetime
+from utils.pagination import fetch_page
 import pytz
 
 class Log:
@@ -28,17 +29,21 @@ class Log:
         return str(result.inserted_id)
 
     @staticmethod
-    def get_all_logs(limit=100):
+    def get_all_logs(limit=100, before=None):
         """
-        Get all logs, sorted by creation date (newest first)
+        Get one page of logs, sorted by creation date (newest first)
         
         Args:
             limit (int): Maximum number of logs to return
+            before (str): Cursor returned with the previous page
             
         Returns:
-            list: List of log objects
+            tuple: (list of log objects, cursor of the next page or None)
+            
+        Raises:
+            ValueError: If the cursor is invalid
         """
-        logs = list(mongo.db.logs.find().sort("created_at", -1).limit(limit))
+        logs, next_cursor = fetch_page(mongo.db.logs, {}, limit, before)
         
         # Convert ObjectId to string and format dates
         for log in logs:
@@ -48,7 +53,12 @@ class Log:
             if isinstance(log.get("created_at"), datetime):
                 log["created_at"] = Log.convert_to_local_timezone(log["created_at"], "Asia/Kolkata")
                 
-        return logs
+        return logs, next_cursor
+
+    @staticmethod
+    def estimated_count():
+        """Number of logs from the collection metadata, without scanning it"""
+        return mongo.db.logs.estimated_document_count()
 
     @staticmethod
     def convert_to_local_timezone(utc_datetime, time_zone_str):
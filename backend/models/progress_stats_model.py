@@ -0,0 +1,428 @@
+from bson import ObjectId
+from collections import Counter
+from datetime import datetime
+from pymongo import DeleteMany, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from utils.db import mongo
+from models.grade_sketch_model import GradeSketch
+
+# List whose cards count as done in the progress report
+DONE_LIST_TITLE = "Reflection (Done)"
+
+GRADE_TYPES = ["pre_test", "post_test"]
+
+# Attempts of a rebuild that collides with a concurrent rebuild of the same board
+REBUILD_ATTEMPTS = 3
+
+# Card fields that feed the progress report
+PROGRESS_FIELDS = [
+    "id", "list_id", "title", "learning_strategy",
+    "pre_test_grade", "post_test_grade", "archived", "deleted"
+]
+
+class ProgressStats:
+    """
+    Read model behind GET /progress-report
+
+    Each board has a handful of counter documents in progress_stats:
+        {"kind": "list", "list_id", "count"}                            active cards per list
+        {"kind": "card", "strategy", "course", "count"}                 cards per strategy and course
+        {"kind": "grade", "strategy", "course", "test", "value", "count"}  grade histogram
+        {"kind": "meta", "built_at"}                                    marks the counters as complete
+
+    Card writes apply the difference between the cards before and after the
+    write with $inc, so the report is computed from these counters instead of
+    walking every card. Grade changes are mirrored into the cohort-wide
+    GradeSketch, which therefore always equals the grade counters of all boards.
+    """
+
+    @staticmethod
+    def parse_course(title):
+        """Course name of a "<course> [<material>]" card title, or None if the title has no material"""
+        parts = (title or "").split("[")
+        if len(parts) < 2:
+            return None
+        return parts[0].strip()
+
+    @staticmethod
+    def parse_grade(value):
+        if value is None:
+            return None
+        value = str(value).strip()
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def counters(card):
+        """Counter keys one card contributes; archived, deleted and missing cards contribute nothing"""
+        keys = Counter()
+        if not card or card.get("archived") or card.get("deleted"):
+            return keys
+
+        keys[("list", card.get("list_id"))] += 1
+
+        course = ProgressStats.parse_course(card.get("title"))
+        if course is None:
+            return keys
+
+        strategy = card.get("learning_strategy") or None
+        keys[("card", strategy, course)] += 1
+        for grade_type in GRADE_TYPES:
+            grade = ProgressStats.parse_grade(card.get(f"{grade_type}_grade"))
+            if grade is not None:
+                keys[("grade", strategy, course, grade_type, grade)] += 1
+        return keys
+
+    @staticmethod
+    def _key_document(board_id, key):
+        document = {"board_id": ObjectId(board_id), "kind": key[0]}
+        if key[0] == "list":
+            document["list_id"] = key[1]
+        elif key[0] == "card":
+            document.update({"strategy": key[1], "course": key[2]})
+        elif key[0] == "grade":
+            document.update({"strategy": key[1], "course": key[2], "test": key[3], "value": key[4]})
+        return document
+
+    @staticmethod
+    def _key(document):
+        kind = document["kind"]
+        if kind == "list":
+            return (kind, document.get("list_id"))
+        if kind == "card":
+            return (kind, document.get("strategy"), document.get("course"))
+        return (kind, document.get("strategy"), document.get("course"), document.get("test"), document.get("value"))
+
+    @staticmethod
+    def apply_changes(board_id, user_id, before, after):
+        """
+        Apply the difference between two sets of card states to the counters
+
+        Args:
+            before (list): Cards as they were before the write (None for new cards)
+            after (list): The same cards after the write (None for removed cards)
+
+        Returns:
+            int: Number of counters changed
+        """
+        delta = Counter()
+        for card in before:
+            delta.subtract(ProgressStats.counters(card))
+        for card in after:
+            delta.update(ProgressStats.counters(card))
+
+        requests = [
+            UpdateOne(
+                ProgressStats._key_document(board_id, key),
+                {"$inc": {"count": amount}, "$setOnInsert": {"user_id": ObjectId(user_id)}},
+                upsert=True
+            )
+            for key, amount in delta.items()
+            if amount
+        ]
+        if not requests:
+            return 0
+
+        requests.append(DeleteMany({"board_id": ObjectId(board_id), "count": {"$lte": 0}}))
+        try:
+            mongo.db.progress_stats.bulk_write(requests, ordered=True)
+        except Exception as e:
+            # A failed update leaves the counters stale; drop the meta marker so
+            # the next report rebuilds them
+            print(f"Error updating progress stats: {str(e)}")
+            mongo.db.progress_stats.delete_one({"board_id": ObjectId(board_id), "kind": "meta"})
+            return len(requests) - 1
+
+        ProgressStats._update_sketches(user_id, delta)
+        return len(requests) - 1
+
+    @staticmethod
+    def _update_sketches(user_id, delta):
+        grades = {key[1:]: amount for key, amount in delta.items() if key[0] == "grade" and amount}
+        if not grades:
+            return
+        try:
+            GradeSketch.apply(user_id, grades)
+        except Exception as e:
+            print(f"Error updating grade sketches: {str(e)}")
+
+    @staticmethod
+    def _grade_expression(field):
+        """Aggregation equivalent of parse_grade()"""
+        return {"$convert": {
+            "input": {"$trim": {"input": {"$toString": field}}},
+            "to": "double",
+            "onError": None,
+            "onNull": None
+        }}
+
+    @staticmethod
+    def parse_stages(keep=()):
+        """
+        Aggregation stages that parse a card like counters() does
+
+        Each card comes out as {"list_id", "strategy", "course", "pre_test",
+        "post_test"}: strategy is None when empty, course is None when the title
+        has no material, and the grades are doubles or None.
+
+        Args:
+            keep (iterable): Other card fields to pass through unchanged
+        """
+        kept = {field: 1 for field in keep}
+        return [
+            {"$project": {
+                **kept,
+                "list_id": 1,
+                # Missing fields are not equal to null inside expressions, hence the $ifNull
+                "strategy": {"$cond": [
+                    {"$in": [{"$ifNull": ["$learning_strategy", None]}, ["", None]]},
+                    None,
+                    "$learning_strategy"
+                ]},
+                "title_parts": {"$split": [{"$ifNull": ["$title", ""]}, "["]},
+                "pre_test": ProgressStats._grade_expression("$pre_test_grade"),
+                "post_test": ProgressStats._grade_expression("$post_test_grade")
+            }},
+            {"$project": {
+                **kept,
+                "list_id": 1,
+                "strategy": 1,
+                "pre_test": 1,
+                "post_test": 1,
+                "course": {"$cond": [
+                    {"$gte": [{"$size": "$title_parts"}, 2]},
+                    {"$trim": {"input": {"$arrayElemAt": ["$title_parts", 0]}}},
+                    None
+                ]}
+            }}
+        ]
+
+    @staticmethod
+    def active_match(board_id=None):
+        """$match stage for cards that count towards progress (not archived or deleted)"""
+        match = {"archived": {"$ne": True}, "deleted": {"$ne": True}}
+        if board_id is not None:
+            match["board_id"] = ObjectId(board_id)
+        return {"$match": match}
+
+    @staticmethod
+    def counters_pipeline(board_id):
+        """
+        Aggregation equivalent of counters() summed over a board's cards
+
+        Title and grade parsing happen on the server, which only returns one
+        document per counter: {"_id": <counter key document>, "count"}.
+        """
+        def grade_key(grade_type):
+            return {"$cond": [
+                {"$eq": [{"$ifNull": [f"${grade_type}", None]}, None]},
+                [],
+                [{"kind": "grade", "strategy": "$strategy", "course": "$course",
+                  "test": grade_type, "value": f"${grade_type}"}]
+            ]}
+
+        return [ProgressStats.active_match(board_id)] + ProgressStats.parse_stages() + [
+            {"$project": {"keys": {"$concatArrays": [
+                [{"kind": "list", "list_id": "$list_id"}],
+                {"$cond": [
+                    {"$eq": [{"$ifNull": ["$course", None]}, None]},
+                    [],
+                    {"$concatArrays": [
+                        [{"kind": "card", "strategy": "$strategy", "course": "$course"}],
+                        grade_key("pre_test"),
+                        grade_key("post_test")
+                    ]}
+                ]}
+            ]}}},
+            {"$unwind": "$keys"},
+            {"$group": {"_id": "$keys", "count": {"$sum": 1}}}
+        ]
+
+    @staticmethod
+    def compute(board_id, cards=None):
+        """Counters recomputed from the given cards, or from the cards collection"""
+        totals = Counter()
+        if cards is not None:
+            for card in cards:
+                totals.update(ProgressStats.counters(card))
+            return totals
+
+        for row in mongo.db.cards.aggregate(ProgressStats.counters_pipeline(board_id)):
+            totals[ProgressStats._key(row["_id"])] += row["count"]
+        return totals
+
+    @staticmethod
+    def rebuild(board_id, user_id, cards=None):
+        """
+        Replace the counters of a board with a full recompute
+
+        Args:
+            cards (list): The board's active cards, if the caller already has them
+        """
+        totals = ProgressStats.compute(board_id, cards)
+        requests = [DeleteMany({"board_id": ObjectId(board_id)})]
+        for key, count in totals.items():
+            document = ProgressStats._key_document(board_id, key)
+            document.update({"user_id": ObjectId(user_id), "count": count})
+            requests.append(InsertOne(document))
+        requests.append(InsertOne({
+            "board_id": ObjectId(board_id),
+            "user_id": ObjectId(user_id),
+            "kind": "meta",
+            "built_at": datetime.utcnow()
+        }))
+
+        for _ in range(REBUILD_ATTEMPTS):
+            stored = Counter()
+            for document in mongo.db.progress_stats.find({"board_id": ObjectId(board_id), "kind": "grade"}):
+                stored[ProgressStats._key(document)] += document["count"]
+            try:
+                mongo.db.progress_stats.bulk_write(requests, ordered=True)
+                break
+            except BulkWriteError as e:
+                # Another rebuild of the board (e.g. the lazy one of a report)
+                # inserted its counters in between: start over from the delete
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+        else:
+            # Leave the counters to the other rebuild; without the meta
+            # marker the next report checks them by rebuilding again
+            print(f"Progress stats of board {board_id} are being rebuilt concurrently, skipped")
+            mongo.db.progress_stats.delete_one({"board_id": ObjectId(board_id), "kind": "meta"})
+            return len(totals)
+
+        delta = Counter({key: count for key, count in totals.items() if key[0] == "grade"})
+        delta.subtract(stored)
+        ProgressStats._update_sketches(user_id, delta)
+        return len(totals)
+
+    @staticmethod
+    def verify(board_id):
+        """
+        Compare the stored counters with a full recompute
+
+        Returns:
+            dict: {key: (stored, expected)} for every counter that differs
+        """
+        stored = Counter()
+        for document in mongo.db.progress_stats.find({"board_id": ObjectId(board_id), "kind": {"$ne": "meta"}}):
+            stored[ProgressStats._key(document)] += document["count"]
+        expected = ProgressStats.compute(board_id)
+        return {
+            key: (stored.get(key, 0), expected.get(key, 0))
+            for key in set(stored) | set(expected)
+            if stored.get(key, 0) != expected.get(key, 0)
+        }
+
+    @staticmethod
+    def find_by_board(board_id, user_id):
+        """Counter documents of a board, rebuilt first if they were never built"""
+        documents = list(mongo.db.progress_stats.find({"board_id": ObjectId(board_id)}, {"_id": 0, "user_id": 0}))
+        if not any(document["kind"] == "meta" for document in documents):
+            ProgressStats.rebuild(board_id, user_id)
+            documents = list(mongo.db.progress_stats.find({"board_id": ObjectId(board_id)}, {"_id": 0, "user_id": 0}))
+        return documents
+
+    @staticmethod
+    def build_report(lists, documents):
+        """
+        Build the progress report from the counters of a board
+
+        Args:
+            lists (list): The board's lists ({"id", "title"}), in board order
+            documents (list): Counter documents from find_by_board()
+        """
+        list_counts = {}
+        strategy_grades = {}
+        course_grades = {}
+        strategy_usage = {}
+
+        documents = sorted(
+            (d for d in documents if d["kind"] != "meta"),
+            key=lambda d: (d["kind"], d.get("strategy") or "", d.get("course") or "")
+        )
+        for document in documents:
+            kind = document["kind"]
+            strategy = document.get("strategy")
+            course = document.get("course")
+            if kind == "list":
+                list_counts[document.get("list_id")] = document["count"]
+                continue
+
+            if strategy:
+                strategy_grades.setdefault(strategy, {grade_type: [] for grade_type in GRADE_TYPES})
+            if course:
+                course_grades.setdefault(course, {grade_type: [] for grade_type in GRADE_TYPES})
+
+            if kind == "card" and strategy and course:
+                strategy_usage.setdefault(strategy, {})
+                strategy_usage[strategy][course] = strategy_usage[strategy].get(course, 0) + document["count"]
+            elif kind == "grade":
+                grades = [document["value"]] * document["count"]
+                if strategy:
+                    strategy_grades[strategy][document["test"]].extend(grades)
+                if course:
+                    course_grades[course][document["test"]].extend(grades)
+
+        report = {}
+        total_cards = 0
+        done_cards = 0
+        for list_ in lists:
+            list_name = list_.get("title", "Unknown")
+            card_count = list_counts.get(list_.get("id"), 0)
+            report[list_name] = card_count
+            total_cards += card_count
+            if list_name == DONE_LIST_TITLE:
+                done_cards = card_count
+
+        strategy_stats = {}
+        for strategy, by_type in strategy_grades.items():
+            strategy_stats[strategy] = {}
+            for grade_type, grades in by_type.items():
+                stats = {"min": 100, "q1": 0, "median": 0, "q3": 0, "max": 0, "count": 0}
+                if grades:
+                    grades.sort()
+                    count = len(grades)
+                    stats.update({"min": grades[0], "max": grades[-1], "count": count})
+                    if count >= 4:
+                        stats.update({
+                            "q1": grades[count // 4],
+                            "median": grades[count // 2],
+                            "q3": grades[(3 * count) // 4]
+                        })
+                    else:
+                        # For small samples, use the same value for all quartiles
+                        stats.update({"q1": grades[0], "median": grades[0], "q3": grades[0]})
+                strategy_stats[strategy][grade_type] = stats
+
+        course_stats = {}
+        for course, by_type in course_grades.items():
+            course_stats[course] = {}
+            for grade_type, grades in by_type.items():
+                stats = {"avg": 0, "count": 0}
+                if grades:
+                    stats.update({"avg": round(sum(grades) / len(grades), 2), "count": len(grades)})
+                course_stats[course][grade_type] = stats
+
+        top_strategies = []
+        for strategy, courses in strategy_usage.items():
+            top_strategies.append({
+                "strategy": strategy,
+                "count": sum(courses.values()),
+                "most_used_in": max(courses.items(), key=lambda x: x[1])[0]
+            })
+        top_strategies.sort(key=lambda x: x["count"], reverse=True)
+
+        return {
+            "total_cards": total_cards,
+            "done_cards": done_cards,
+            "progress_percentage": (done_cards / total_cards * 100) if total_cards > 0 else 0,
+            "list_report": report,
+            "strategy_stats": strategy_stats,
+            "course_stats": course_stats,
+            "top_strategies": top_strategies[:3]
+        }
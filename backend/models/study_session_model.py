@@ -1,6 +1,8 @@
 from datetime import datetime
 from utils.db import mongo
 from bson import ObjectId
+from pymongo import ReturnDocument
+from models.study_time_model import StudyTime
 
 class StudySession:
     def __init__(self, _id, user_id, card_id, start_time, end_time=None):
@@ -26,11 +28,38 @@ class StudySession:
     @staticmethod
     def end_session(session_id):
         db = mongo.db
-        result = db.study_sessions.update_one(
-            {"_id": ObjectId(session_id)},
-            {"$set": {"end_time": datetime.utcnow()}}
+        # Only an open session is ended, so a repeated call is not counted twice
+        session = db.study_sessions.find_one_and_update(
+            {"_id": ObjectId(session_id), "end_time": None},
+            {"$set": {"end_time": datetime.utcnow(), "rolled_up": True}},
+            return_document=ReturnDocument.AFTER
         )
-        return result.modified_count > 0
+        if not session:
+            # Already ended: a repeated call retries a rollup that failed before
+            session = db.study_sessions.find_one_and_update(
+                {"_id": ObjectId(session_id), "rolled_up": False},
+                {"$set": {"rolled_up": True}},
+                return_document=ReturnDocument.AFTER
+            )
+            if not session:
+                return db.study_sessions.count_documents({"_id": ObjectId(session_id)}, limit=1) > 0
+
+        StudySession.roll_up(session)
+        return True
+
+    @staticmethod
+    def roll_up(session):
+        """
+        Add an ended session to the study time rollups, best-effort
+
+        The session stays ended when this fails; it is flagged rolled_up False
+        so that ending it again retries the rollup.
+        """
+        try:
+            StudyTime.record_session(session)
+        except Exception as e:
+            print(f"Error rolling up study session: {str(e)}")
+            mongo.db.study_sessions.update_one({"_id": session["_id"]}, {"$set": {"rolled_up": False}})
 
     @staticmethod
     def get_sessions_by_card(card_id):
@@ -42,20 +71,5 @@ class StudySession:
 
     @staticmethod
     def get_total_study_time(card_id):
-        db = mongo.db
-        pipeline = [
-            {"$match": {"card_id": card_id}},
-            {"$group": {
-                "_id": None,
-                "total_minutes": {
-                    "$sum": {
-                        "$divide": [
-                            {"$subtract": ["$end_time", "$start_time"]},
-                            60000  # Convert milliseconds to minutes
-                        ]
-                    }
-                }
-            }}
-        ]
-        result = list(db.study_sessions.aggregate(pipeline))
-        return result[0]["total_minutes"] if result else 0 
\ No newline at end of file
+        # Read from the pre-aggregated rollups instead of every raw session
+        return StudyTime.total_minutes(card_id)
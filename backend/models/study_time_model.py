@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from utils.db import mongo
+from models.card_model import Card
+from models.progress_stats_model import ProgressStats
+
+# Days and weeks are cut in WIB (UTC+7), the same local time the chatbot
+# uses for productive hours
+LOCAL_UTC_OFFSET = timedelta(hours=7)
+
+PERIODS = ["day", "week"]
+
+class StudyTime:
+    """
+    Pre-aggregated study time in the study_time_rollups collection
+
+    One document per (user, card, period, start), where period is "day" or
+    "week" and start is the local date the bucket begins on (weeks start on
+    Monday):
+        {"user_id", "card_id", "course", "period", "start",
+         "minutes", "sessions", "longest", "shortest", "hours": {"<local hour>": count}}
+
+    minutes are split over the days a session spans; sessions, longest,
+    shortest and hours are counted on the bucket the session started in.
+    """
+
+    @staticmethod
+    def _local(moment):
+        return moment + LOCAL_UTC_OFFSET
+
+    @staticmethod
+    def _bucket_start(local_moment, period):
+        day = local_moment.date()
+        if period == "week":
+            day -= timedelta(days=day.weekday())
+        return day.isoformat()
+
+    @staticmethod
+    def rollup_requests(session, course):
+        """Upserts that add one ended session to its day and week buckets"""
+        start, end = session.get("start_time"), session.get("end_time")
+        if not isinstance(start, datetime) or not isinstance(end, datetime) or end <= start:
+            return []
+
+        key = {"user_id": str(session["user_id"]), "card_id": session["card_id"]}
+        duration = (end - start).total_seconds() / 60
+        local_start = StudyTime._local(start)
+        local_end = StudyTime._local(end)
+
+        # Minutes per bucket, splitting the session at local midnight
+        minutes = {period: {} for period in PERIODS}
+        cursor = local_start
+        while cursor < local_end:
+            midnight = datetime.combine(cursor.date() + timedelta(days=1), datetime.min.time())
+            piece_end = min(midnight, local_end)
+            piece = (piece_end - cursor).total_seconds() / 60
+            for period in PERIODS:
+                bucket = StudyTime._bucket_start(cursor, period)
+                minutes[period][bucket] = minutes[period].get(bucket, 0) + piece
+            cursor = piece_end
+
+        requests = []
+        for period in PERIODS:
+            first_bucket = StudyTime._bucket_start(local_start, period)
+            for bucket, amount in minutes[period].items():
+                update = {
+                    "$inc": {"minutes": amount},
+                    "$set": {"course": course}
+                }
+                if bucket == first_bucket:
+                    update["$inc"].update({"sessions": 1, f"hours.{local_start.hour}": 1})
+                    update["$max"] = {"longest": duration}
+                    update["$min"] = {"shortest": duration}
+                requests.append(UpdateOne({**key, "period": period, "start": bucket}, update, upsert=True))
+        return requests
+
+    @staticmethod
+    def course_of_card(user_id, card_id):
+        card = Card.find_card(user_id, card_id, {"title": 1})
+        return ProgressStats.parse_course(card.get("title")) if card else None
+
+    @staticmethod
+    def record_session(session):
+        """
+        Add an ended study session to the rollups
+
+        Returns:
+            int: Number of buckets updated
+        """
+        requests = StudyTime.rollup_requests(
+            session, StudyTime.course_of_card(session.get("user_id"), session.get("card_id"))
+        )
+        if requests:
+            mongo.db.study_time_rollups.bulk_write(requests, ordered=False)
+        return len(requests)
+
+    @staticmethod
+    def total_minutes(card_id):
+        result = list(mongo.db.study_time_rollups.aggregate([
+            {"$match": {"card_id": card_id, "period": "week"}},
+            {"$group": {"_id": None, "minutes": {"$sum": "$minutes"}}}
+        ]))
+        return result[0]["minutes"] if result else 0
+
+    @staticmethod
+    def summary_for_card(card_id):
+        """
+        All-time study totals of a card, merged from its weekly buckets
+
+        Returns:
+            dict: {"sessions", "minutes", "longest", "shortest", "hours": [24 counts]}
+        """
+        return StudyTime.summaries_for_cards([card_id])[card_id]
+
+    @staticmethod
+    def summaries_for_cards(card_ids):
+        """summary_for_card() for many cards with one query: {card_id: summary}"""
+        summaries = {
+            card_id: {"sessions": 0, "minutes": 0, "longest": 0, "shortest": None, "hours": [0] * 24}
+            for card_id in card_ids
+        }
+        buckets = mongo.db.study_time_rollups.find(
+            {"card_id": {"$in": list(summaries)}, "period": "week"}, {"_id": 0}
+        )
+        for bucket in buckets:
+            summary = summaries[bucket["card_id"]]
+            summary["sessions"] += bucket.get("sessions", 0)
+            summary["minutes"] += bucket.get("minutes", 0)
+            summary["longest"] = max(summary["longest"], bucket.get("longest", 0))
+            if bucket.get("shortest") is not None:
+                shortest = summary["shortest"]
+                summary["shortest"] = bucket["shortest"] if shortest is None else min(shortest, bucket["shortest"])
+            for hour, count in (bucket.get("hours") or {}).items():
+                summary["hours"][int(hour)] += count
+        for summary in summaries.values():
+            summary["shortest"] = summary["shortest"] or 0
+        return summaries
+
+    @staticmethod
+    def find_series(period="day", user_id=None, course=None, date_from=None, date_to=None):
+        """
+        Study time per bucket, summed over cards (and users, when not filtered)
+
+        Args:
+            date_from (str): First bucket start to include, YYYY-MM-DD
+            date_to (str): Last bucket start to include, YYYY-MM-DD
+
+        Returns:
+            list: [{"start", "minutes", "sessions"}] in chronological order
+        """
+        match = {"period": period}
+        if user_id is not None:
+            match["user_id"] = str(user_id)
+        if course is not None:
+            match["course"] = course
+        if date_from or date_to:
+            match["start"] = {}
+            if date_from:
+                match["start"]["$gte"] = date_from
+            if date_to:
+                match["start"]["$lte"] = date_to
+
+        return [
+            {"start": row["_id"], "minutes": round(row["minutes"], 2), "sessions": row["sessions"]}
+            for row in mongo.db.study_time_rollups.aggregate([
+                {"$match": match},
+                {"$group": {"_id": "$start", "minutes": {"$sum": "$minutes"}, "sessions": {"$sum": "$sessions"}}},
+                {"$sort": {"_id": 1}}
+            ])
+        ]
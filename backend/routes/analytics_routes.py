@@ -0,0 +1,11 @@
+from flask import Blueprint
+from controllers import analytics_controller
+
+analytics_bp = Blueprint("analytics_bp", __name__)
+
+analytics_bp.route("/analytics/cohort-grades", methods=["GET"])(analytics_controller.get_cohort_grade_stats)
+analytics_bp.route("/analytics/grade-percentiles", methods=["GET"])(analytics_controller.get_grade_percentiles)
+analytics_bp.route("/analytics/cohort-export", methods=["GET"])(analytics_controller.export_cohort_data)
+analytics_bp.route("/analytics/study-time/course/<course>", methods=["GET"])(analytics_controller.get_course_study_time)
+analytics_bp.route("/analytics/write-queue", methods=["GET"])(analytics_controller.get_write_queue_stats)
+analytics_bp.route("/analytics/log-archive/<source>", methods=["GET"])(analytics_controller.get_log_archive)
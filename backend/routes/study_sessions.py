@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from models.study_session_model import StudySession
+from models.study_time_model import StudyTime, PERIODS
 from utils.auth import get_user_id_from_token
 
 study_sessions_bp = Blueprint('study_sessions', __name__)
@@ -80,4 +81,34 @@ def get_card_sessions(card_id):
         }), 200
     except Exception as e:
         print(f"Error fetching study sessions: {str(e)}")
-        return jsonify({"error": str(e)}), 500 
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500 
+
+@study_sessions_bp.route('/api/study-sessions/time-series', methods=['GET'])
+def get_study_time_series():
+    try:
+        # Get token from header
+        auth_header = request.headers.get('Authorization')
+        if not auth_header:
+            return jsonify({"error": "No authorization header"}), 401
+
+        # Get user_id from token
+        user_id = get_user_id_from_token(auth_header)
+        if not user_id:
+            return jsonify({"error": "Invalid token"}), 401
+
+        period = request.args.get('period', 'day')
+        if period not in PERIODS:
+            return jsonify({"error": f"period must be one of: {', '.join(PERIODS)}"}), 400
+
+        # Read from the daily/weekly rollups, not from the raw sessions
+        series = StudyTime.find_series(
+            period=period,
+            user_id=user_id,
+            course=request.args.get('course'),
+            date_from=request.args.get('from'),
+            date_to=request.args.get('to')
+        )
+        return jsonify({"period": period, "series": series}), 200
+    except Exception as e:
+        print(f"Error fetching study time series: {str(e)}")
+        return jsonify({"error": str(e)}), 500
@@ -1,31 +1,131 @@
+import re
+
+# Intent table of the local fallback responder, in order of precedence when
+# two intents score the same. A keyword matches whole words only, so "hi"
+# does not match inside "ini"; a trailing "*" also matches longer words
+# ("belajar*" matches "belajarnya"), and a keyword may span several words.
+INTENTS = (
+    {
+        "name": "greeting",
+        "keywords": ["halo", "hai", "hello", "hi", "hey"],
+        "response": "Halo {user_name}! Saya adalah asisten pembelajaran Anda. Ada yang bisa saya bantu hari ini?"
+    },
+    {
+        "name": "help",
+        "keywords": ["bantuan", "help", "tolong*", "bagaimana*"],
+        "response": "Saya bisa membantu Anda dengan:\n- Memberikan tips belajar\n- Menjawab pertanyaan tentang pembelajaran\n- Menganalisis progres Anda\n- Memberikan sumber belajar rekomendasi\n\nApa yang ingin Anda ketahui lebih lanjut?"
+    },
+    {
+        "name": "learning_strategy",
+        "keywords": ["strategi*", "metode*", "cara*", "belajar*", "pembelajaran", "mempelajari"],
+        "response": "Beberapa strategi belajar efektif yang bisa Anda coba:\n\n1. **Pomodoro Technique** - Belajar 25 menit, istirahat 5 menit\n2. **Active Recall** - Mencoba mengingat informasi tanpa melihat catatan\n3. **Spaced Repetition** - Mengulangi materi secara berkala\n4. **Mind Mapping** - Membuat diagram visual untuk menghubungkan konsep\n\nMau tahu lebih detail tentang strategi mana?"
+    },
+    {
+        "name": "motivation",
+        "keywords": ["motivasi*", "semangat*", "malas*", "lesu"],
+        "response": "Tetap semangat! Ingat bahwa setiap langkah kecil membawa Anda lebih dekat ke tujuan. Beberapa tips untuk meningkatkan motivasi:\n\n- Tetapkan tujuan yang realistis dan spesifik\n- Bagi tugas besar menjadi bagian-bagian kecil\n- Rayakan setiap pencapaian, meskipun kecil\n- Ingat tujuan akhir Anda\n\nAnda pasti bisa!"
+    }
+)
+
+DEFAULT_RESPONSE = "Terima kasih atas pesan Anda. Saya masih dalam pengembangan dan mungkin belum bisa menjawab semua pertanyaan. Silakan coba tanyakan tentang strategi belajar, motivasi, atau minta bantuan."
+
+def _trie_pattern(keywords):
+    """
+    Regex matching any of the keywords, factored as a character trie
+
+    Keywords sharing a start are tried once for that start instead of once
+    each, so matching stays fast however many keywords there are. Longer
+    keywords are tried before the shorter ones they start with.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def pattern(node):
+        alternatives = [
+            (r"\s+" if char == " " else re.escape(char)) + pattern(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and "" not in node:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        return group + "?" if "" in node else group
+
+    return pattern(trie)
+
+class IntentMatcher:
+    """
+    An intent table compiled into a single regex for one-pass matching
+
+    All whole-word keywords form one trie-shaped alternation and all "*"
+    prefixes another, so a single findall over the message finds every keyword
+    occurrence; only the hits are looked up (in a dict from keyword to
+    intent) in Python. The cost grows with the length of the message rather
+    than with the number of intents and keywords.
+    """
+
+    def __init__(self, intents):
+        self.intents = tuple(intents)
+        self.words = {}
+        self.prefixes = {}
+        for position, intent in enumerate(self.intents):
+            for keyword in intent["keywords"]:
+                table = self.prefixes if keyword.endswith("*") else self.words
+                # The first intent listing a keyword keeps it
+                table.setdefault(" ".join(keyword.rstrip("*").lower().split()), position)
+        # Group 1 is a whole-word keyword, group 2 the prefix of a longer word;
+        # an empty table becomes a group that never matches
+        words = _trie_pattern(self.words) or "(?!)"
+        prefixes = _trie_pattern(self.prefixes) or "(?!)"
+        self.pattern = re.compile(rf"\b(?:({words})\b|({prefixes})\w*)")
+
+    def classify(self, message):
+        """
+        Find the intent of a chat message
+
+        Every keyword occurrence counts one point for its intent; the intent
+        with the most points wins, ties going to the earlier intent.
+
+        Returns:
+            dict: The matching intent, or None
+        """
+        scores = {}
+        for word, prefix in self.pattern.findall(message.lower()):
+            # Multi-word keywords may match across any whitespace
+            position = self.words[" ".join(word.split())] if word else self.prefixes[" ".join(prefix.split())]
+            scores[position] = scores.get(position, 0) + 1
+        if not scores:
+            return None
+        return self.intents[min(scores, key=lambda position: (-scores[position], position))]
+
+INTENT_MATCHER = IntentMatcher(INTENTS)
+
+def classify_intent(message):
+    """
+    Find the intent of a chat message in one pass over its text
+
+    Returns:
+        dict: The matching intent from INTENTS, or None
+    """
+    return INTENT_MATCHER.classify(message)
+
 def generate_chatbot_message(message, user_name="User"):
     """
     Generate a response to a general chat message
-    
+
     Args:
         message (str): User message
         user_name (str): User's name
-        
+
     Returns:
         str: Chatbot response
     """
-    message = message.lower().strip()
-    
-    # Greeting responses
-    if any(greeting in message for greeting in ["halo", "hai", "hello", "hi", "hey"]):
-        return f"Halo {user_name}! Saya adalah asisten pembelajaran Anda. Ada yang bisa saya bantu hari ini?"
-    
-    # Help responses
-    if any(help_word in message for help_word in ["bantuan", "help", "tolong", "bagaimana"]):
-        return "Saya bisa membantu Anda dengan:\n- Memberikan tips belajar\n- Menjawab pertanyaan tentang pembelajaran\n- Menganalisis progres Anda\n- Memberikan sumber belajar rekomendasi\n\nApa yang ingin Anda ketahui lebih lanjut?"
-    
-    # Learning strategy responses
-    if any(strategy in message for strategy in ["strategi", "metode", "cara", "belajar"]):
-        return "Beberapa strategi belajar efektif yang bisa Anda coba:\n\n1. **Pomodoro Technique** - Belajar 25 menit, istirahat 5 menit\n2. **Active Recall** - Mencoba mengingat informasi tanpa melihat catatan\n3. **Spaced Repetition** - Mengulangi materi secara berkala\n4. **Mind Mapping** - Membuat diagram visual untuk menghubungkan konsep\n\nMau tahu lebih detail tentang strategi mana?"
-    
-    # Motivation responses
-    if any(motivation in message for motivation in ["motivasi", "semangat", "malas", "lesu"]):
-        return "Tetap semangat! Ingat bahwa setiap langkah kecil membawa Anda lebih dekat ke tujuan. Beberapa tips untuk meningkatkan motivasi:\n\n- Tetapkan tujuan yang realistis dan spesifik\n- Bagi tugas besar menjadi bagian-bagian kecil\n- Rayakan setiap pencapaian, meskipun kecil\n- Ingat tujuan akhir Anda\n\nAnda pasti bisa!"
-    
-    # Default response
-    return "Terima kasih atas pesan Anda. Saya masih dalam pengembangan dan mungkin belum bisa menjawab semua pertanyaan. Silakan coba tanyakan tentang strategi belajar, motivasi, atau minta bantuan."
\ No newline at end of file
+    intent = classify_intent(message.strip())
+    if not intent:
+        return DEFAULT_RESPONSE
+    return intent["response"].format(user_name=user_name)
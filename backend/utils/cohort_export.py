@@ -0,0 +1,251 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from utils.db import mongo
+from models.progress_stats_model import ProgressStats
+
+# Columns of the export, in order. Students are identified by user_id only.
+EXPORT_FIELDS = [
+    "user_id", "board_id", "card_id", "course", "learning_strategy", "list_id",
+    "difficulty", "priority", "created_at", "pre_test_grade", "post_test_grade",
+    "study_sessions", "study_minutes", "first_study_at", "last_study_at",
+    "movements", "last_moved_at"
+]
+
+EXPORT_FORMATS = ["csv", "ndjson", "parquet"]
+
+# Rows are buffered this many at a time before a chunk is sent
+CHUNK_ROWS = 500
+
+def parse_filters(course=None, strategy=None, date_from=None, date_to=None):
+    """
+    Validate export filters
+
+    Args:
+        date_from (str): First card creation date to include, YYYY-MM-DD
+        date_to (str): Last card creation date to include, YYYY-MM-DD
+
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format
+    """
+    filters = {"course": course or None, "strategy": strategy or None}
+    for key, label, value, offset in [("date_from", "from", date_from, 0), ("date_to", "to", date_to, 1)]:
+        if not value:
+            filters[key] = None
+            continue
+        try:
+            day = datetime.strptime(value, "%Y-%m-%d") + timedelta(days=offset)
+        except ValueError:
+            raise ValueError(f"'{label}' must be a date in YYYY-MM-DD format")
+        # created_at is stored as an ISO string, which sorts like the date it holds
+        filters[key] = day.strftime("%Y-%m-%d")
+    return filters
+
+def export_pipeline(filters):
+    """
+    One aggregation over the cards collection that joins each card with its
+    study sessions and movement history, already reduced to a few numbers
+    """
+    match = ProgressStats.active_match()["$match"]
+    if filters.get("strategy"):
+        match["learning_strategy"] = filters["strategy"]
+    created = {}
+    if filters.get("date_from"):
+        created["$gte"] = filters["date_from"]
+    if filters.get("date_to"):
+        # date_to is already the day after the last included date
+        created["$lt"] = filters["date_to"]
+    if created:
+        match["created_at"] = created
+
+    pipeline = [{"$match": match}]
+    pipeline += ProgressStats.parse_stages(keep=["id", "user_id", "board_id", "difficulty", "priority", "created_at"])
+    if filters.get("course"):
+        pipeline.append({"$match": {"course": filters["course"]}})
+
+    pipeline += [
+        {"$lookup": {
+            "from": "study_sessions",
+            "let": {"card_id": "$id", "user_id": {"$toString": "$user_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$card_id", "$$card_id"]},
+                    {"$eq": ["$user_id", "$$user_id"]}
+                ]}}},
+                {"$group": {
+                    "_id": None,
+                    "sessions": {"$sum": 1},
+                    # Open sessions have no end_time and count as zero minutes
+                    "minutes": {"$sum": {"$divide": [{"$subtract": ["$end_time", "$start_time"]}, 60000]}},
+                    "first": {"$min": "$start_time"},
+                    "last": {"$max": "$start_time"}
+                }}
+            ],
+            "as": "study"
+        }},
+        {"$lookup": {
+            "from": "card_movements",
+            "let": {"card_id": "$id", "board_id": {"$toString": "$board_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$card_id", "$$card_id"]},
+                    {"$eq": ["$board_id", "$$board_id"]}
+                ]}}},
+                {"$group": {"_id": None, "count": {"$sum": 1}, "last": {"$max": "$timestamp"}}}
+            ],
+            "as": "moves"
+        }},
+        {"$project": {
+            "_id": 0,
+            "user_id": {"$toString": "$user_id"},
+            "board_id": {"$toString": "$board_id"},
+            "card_id": "$id",
+            "course": 1,
+            "learning_strategy": "$strategy",
+            "list_id": 1,
+            "difficulty": 1,
+            "priority": 1,
+            "created_at": 1,
+            "pre_test_grade": "$pre_test",
+            "post_test_grade": "$post_test",
+            "study": {"$arrayElemAt": ["$study", 0]},
+            "moves": {"$arrayElemAt": ["$moves", 0]}
+        }}
+    ]
+    return pipeline
+
+def _isoformat(value):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="milliseconds") + "Z"
+    return value
+
+def export_rows(filters):
+    """
+    Yield one flat row per card, reading the aggregation cursor batch by batch
+
+    Memory use does not depend on the size of the cohort.
+    """
+    cursor = mongo.db.cards.aggregate(export_pipeline(filters), batchSize=CHUNK_ROWS)
+    for card in cursor:
+        study = card.get("study") or {}
+        moves = card.get("moves") or {}
+        minutes = study.get("minutes")
+        yield {
+            "user_id": card.get("user_id"),
+            "board_id": card.get("board_id"),
+            "card_id": card.get("card_id"),
+            "course": card.get("course"),
+            "learning_strategy": card.get("learning_strategy"),
+            "list_id": card.get("list_id"),
+            "difficulty": card.get("difficulty"),
+            "priority": card.get("priority"),
+            "created_at": _isoformat(card.get("created_at")),
+            "pre_test_grade": card.get("pre_test_grade"),
+            "post_test_grade": card.get("post_test_grade"),
+            "study_sessions": study.get("sessions", 0),
+            "study_minutes": round(minutes, 2) if minutes is not None else 0,
+            "first_study_at": _isoformat(study.get("first")),
+            "last_study_at": _isoformat(study.get("last")),
+            "movements": moves.get("count", 0),
+            "last_moved_at": _isoformat(moves.get("last"))
+        }
+
+def to_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+def to_ndjson(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row) + "\n")
+        if len(lines) >= CHUNK_ROWS:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain()"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def to_parquet(rows, row_group_size=10000):
+    """
+    Stream a Parquet file, one row group at a time (needs the optional pyarrow package)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    counts = {"study_sessions", "movements"}
+    numbers = {"pre_test_grade", "post_test_grade", "study_minutes"}
+    schema = pa.schema([
+        (field, pa.int64() if field in counts else pa.float64() if field in numbers else pa.string())
+        for field in EXPORT_FIELDS
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    columns = {field: [] for field in EXPORT_FIELDS}
+    pending = 0
+    for row in rows:
+        for field in EXPORT_FIELDS:
+            columns[field].append(row[field])
+        pending += 1
+        if pending >= row_group_size:
+            writer.write_table(pa.table(columns, schema=schema))
+            columns = {field: [] for field in EXPORT_FIELDS}
+            pending = 0
+            yield sink.drain()
+    if pending:
+        writer.write_table(pa.table(columns, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+def export_cohort(filters, export_format="csv"):
+    """
+    Generator of the export in the given format (str chunks for csv/ndjson, bytes for parquet)
+    """
+    rows = export_rows(filters)
+    if export_format == "ndjson":
+        return to_ndjson(rows)
+    if export_format == "parquet":
+        return to_parquet(rows)
+    return to_csv(rows)
@@ -0,0 +1,185 @@
+import numpy as np
+from utils.db import mongo
+from models.progress_stats_model import ProgressStats
+
+# Name and quantile of each order statistic in a summary
+QUANTILES = [("min", 0.0), ("q1", 0.25), ("median", 0.5), ("q3", 0.75), ("max", 1.0)]
+
+def load_cohort_grades():
+    """
+    Load the grades of every active card on every board into NumPy arrays
+
+    Course and grade parsing run in the aggregation (see ProgressStats.parse_stages),
+    so only four small fields per card cross the wire. Strategies and courses
+    are integer-encoded while the cursor is read, so the statistics never
+    touch Python objects.
+
+    Returns:
+        dict: {"strategies": [names], "strategy": int array,
+               "courses": [names], "course": int array,
+               "pre_test": float array, "post_test": float array}
+               with -1 for a missing strategy/course and NaN for a missing grade
+    """
+    pipeline = [ProgressStats.active_match()] + ProgressStats.parse_stages() + [
+        {"$project": {"_id": 0, "strategy": 1, "course": 1, "pre_test": 1, "post_test": 1}}
+    ]
+
+    strategies, courses = {}, {}
+    strategy_codes, course_codes, pre_tests, post_tests = [], [], [], []
+    for card in mongo.db.cards.aggregate(pipeline, batchSize=10000):
+        strategy = card.get("strategy")
+        course = card.get("course")
+        strategy_codes.append(strategies.setdefault(strategy, len(strategies)) if strategy else -1)
+        course_codes.append(courses.setdefault(course, len(courses)) if course is not None else -1)
+        pre_tests.append(card.get("pre_test"))
+        post_tests.append(card.get("post_test"))
+
+    return {
+        "strategies": list(strategies),
+        "strategy": np.array(strategy_codes, dtype=np.intp),
+        "courses": list(courses),
+        "course": np.array(course_codes, dtype=np.intp),
+        # None becomes NaN when cast to float
+        "pre_test": np.array(pre_tests, dtype=float),
+        "post_test": np.array(post_tests, dtype=float)
+    }
+
+def group_summary(codes, values, n_groups):
+    """
+    Count, mean, sample std and interpolated quartiles of values per group
+
+    All groups are computed at once: the values are sorted by (group, value)
+    so each group is a contiguous run, and every statistic is read from that
+    run with array arithmetic. Quartiles use linear interpolation between the
+    closest ranks (numpy's default "linear" method). NaN values are ignored.
+
+    Returns:
+        dict: {statistic: float array of length n_groups}, NaN for empty groups
+    """
+    keep = ~np.isnan(values)
+    codes = codes[keep]
+    values = values[keep]
+
+    # Sort by value, then stably by group (a radix sort for integer codes);
+    # faster than np.lexsort on the two keys
+    order = np.argsort(values)
+    order = order[np.argsort(codes[order], kind="stable")]
+    codes = codes[order]
+    values = values[order]
+
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    nonempty = counts > 0
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.bincount(codes, weights=values, minlength=n_groups) / counts
+        squares = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=n_groups)
+        stds = np.sqrt(squares / (counts - 1))
+
+    summary = {"count": counts.astype(float), "mean": means, "std": stds}
+    if not values.size:
+        for name, _ in QUANTILES:
+            summary[name] = np.full(n_groups, np.nan)
+        return summary
+
+    last = np.maximum(counts - 1, 0)
+    for name, quantile in QUANTILES:
+        position = quantile * last
+        lower = np.floor(position).astype(np.intp)
+        upper = np.ceil(position).astype(np.intp)
+        fraction = position - lower
+        low_values = values[np.where(nonempty, starts + lower, 0)]
+        high_values = values[np.where(nonempty, starts + upper, 0)]
+        summary[name] = np.where(nonempty, low_values + (high_values - low_values) * fraction, np.nan)
+    return summary
+
+def effect_sizes(pre, post, delta):
+    """
+    Standardized pre/post effect sizes per group
+
+    cohens_d uses the pooled standard deviation of the pre and post grades;
+    paired_d (Cohen's d_z) divides the mean delta by the standard deviation of
+    the deltas of cards that have both grades.
+    """
+    def sum_of_squares(summary):
+        # A single grade has no spread but still counts towards the pooled sample
+        return np.where(summary["count"] > 1, (summary["count"] - 1) * summary["std"] ** 2, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pooled = np.sqrt(
+            (sum_of_squares(pre) + sum_of_squares(post))
+            / (pre["count"] + post["count"] - 2)
+        )
+        return {
+            "cohens_d": (post["mean"] - pre["mean"]) / pooled,
+            "paired_d": delta["mean"] / delta["std"]
+        }
+
+def _to_json(value):
+    value = float(value)
+    if np.isnan(value) or np.isinf(value):
+        return None
+    return round(value, 4)
+
+def summarize_by(names, codes, pre_tests, post_tests):
+    """
+    Pre-test, post-test, delta and effect-size statistics for each group
+
+    Args:
+        names (list): Group names, indexed by code
+        codes (array): Group code of each card, -1 for cards outside every group
+    """
+    mask = codes >= 0
+    codes = codes[mask]
+    pre = pre_tests[mask]
+    post = post_tests[mask]
+    # NaN unless the card has both grades
+    delta = post - pre
+
+    n_groups = len(names)
+    stats = {
+        "pre_test": group_summary(codes, pre, n_groups),
+        "post_test": group_summary(codes, post, n_groups),
+        "delta": group_summary(codes, delta, n_groups)
+    }
+    stats["effect_size"] = effect_sizes(stats["pre_test"], stats["post_test"], stats["delta"])
+    cards = np.bincount(codes, minlength=n_groups)
+
+    result = {}
+    for i, name in enumerate(names):
+        if not cards[i]:
+            continue
+        result[name] = {"cards": int(cards[i])}
+        for section, values in stats.items():
+            result[name][section] = {
+                key: int(array[i]) if key == "count" else _to_json(array[i])
+                for key, array in values.items()
+            }
+    return result
+
+def compute_cohort_stats(grades=None):
+    """
+    Grade statistics of the whole cohort per learning strategy and per course
+
+    Args:
+        grades (dict): Arrays as returned by load_cohort_grades() (loaded if None)
+
+    Returns:
+        dict: {"cards", "graded_cards", "by_strategy", "by_course"}
+    """
+    if grades is None:
+        grades = load_cohort_grades()
+
+    # Only cards whose title names a course are part of the report, as in
+    # the per-user progress report
+    in_course = grades["course"] >= 0
+    pre_tests = grades["pre_test"][in_course]
+    post_tests = grades["post_test"][in_course]
+    graded = ~(np.isnan(pre_tests) & np.isnan(post_tests))
+
+    return {
+        "cards": int(in_course.sum()),
+        "graded_cards": int(graded.sum()),
+        "by_strategy": summarize_by(grades["strategies"], grades["strategy"][in_course], pre_tests, post_tests),
+        "by_course": summarize_by(grades["courses"], grades["course"][in_course], pre_tests, post_tests)
+    }
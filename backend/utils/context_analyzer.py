@@ -18,10 +18,13 @@ def analyze_movement_context(movement_info):
         to_column = movement_info["to_column"]
         
         # Analisis pola pergerakan
-        movement_pattern = analyze_movement_pattern(movement_info["movement_history"])
+        movement_pattern = analyze_movement_pattern(
+            movement_info["movement_history"],
+            movement_info.get("movement_count")
+        )
         
         # Analisis waktu belajar
-        time_analysis = analyze_study_time(movement_info["study_sessions"])
+        time_analysis = analyze_study_time(movement_info.get("study_time"))
         
         # Analisis difficulty dan priority
         difficulty_priority_analysis = analyze_difficulty_priority(card)
@@ -59,12 +62,13 @@ def analyze_movement_context(movement_info):
             }
         }
 
-def analyze_movement_pattern(movement_history):
+def analyze_movement_pattern(movement_history, total_movements=None):
     """
     Menganalisis pola pergerakan card
     
     Args:
-        movement_history (list): Riwayat pergerakan card
+        movement_history (list): Riwayat pergerakan card (jendela terbaru)
+        total_movements (int): Jumlah seluruh pergerakan, jika riwayat hanya sebagian
         
     Returns:
         dict: Hasil analisis pola pergerakan
@@ -79,7 +83,8 @@ def analyze_movement_pattern(movement_history):
                 "stuck_in_column": False
             }
         
-        total_movements = len(movement_history)
+        window_size = len(movement_history)
+        total_movements = max(total_movements or 0, window_size)
         
         # Analisis pergerakan maju dan mundur
         forward_movements = 0
@@ -105,7 +110,7 @@ def analyze_movement_pattern(movement_history):
                 continue
         
         # Deteksi pergerakan bolak-balik yang sering
-        frequent_back_and_forth = backward_movements > total_movements * 0.3
+        frequent_back_and_forth = backward_movements > window_size * 0.3
         
         # Deteksi card yang terjebak di kolom tertentu
         current_column = movement_history[-1].get("toColumn", "")
@@ -153,18 +158,19 @@ def analyze_movement_pattern(movement_history):
             "stuck_in_column": False
         }
 
-def analyze_study_time(study_sessions):
+def analyze_study_time(study_time):
     """
-    Menganalisis waktu belajar dari sesi belajar
+    Menganalisis waktu belajar dari ringkasan sesi belajar
     
     Args:
-        study_sessions (list): Daftar sesi belajar
+        study_time (dict): Ringkasan dari StudyTime.summary_for_card
+            (sessions, minutes, longest, shortest, hours per jam lokal)
         
     Returns:
         dict: Hasil analisis waktu belajar
     """
     try:
-        if not study_sessions:
+        if not study_time or not study_time.get("sessions"):
             return {
                 "total_sessions": 0,
                 "total_time_minutes": 0,
@@ -175,36 +181,15 @@ def analyze_study_time(study_sessions):
                 "shortest_session": 0
             }
         
-        total_sessions = len(study_sessions)
-        total_time_minutes = 0
-        session_times = []
-        productive_hours = [0] * 24  # Count sessions per hour
-        
-        for session in study_sessions:
-            start_time = session.get("start_time")
-            end_time = session.get("end_time")
-            
-            if start_time and end_time:
-                try:
-                    start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                    
-                    # Hitung durasi dalam menit
-                    duration = (end_dt - start_dt).total_seconds() / 60
-                    if duration > 0:
-                        total_time_minutes += duration
-                        session_times.append(duration)
-                        
-                        # Hitung jam produktif (dalam UTC+7)
-                        local_hour = (start_dt.hour + 7) % 24
-                        productive_hours[local_hour] += 1
-                except:
-                    continue
+        total_sessions = study_time["sessions"]
+        total_time_minutes = study_time.get("minutes", 0)
+        # Jumlah sesi per jam mulai (sudah dalam UTC+7)
+        productive_hours = study_time.get("hours") or [0] * 24
         
         # Hitung statistik
         average_session_time = total_time_minutes / total_sessions if total_sessions > 0 else 0
-        longest_session = max(session_times) if session_times else 0
-        shortest_session = min(session_times) if session_times else 0
+        longest_session = study_time.get("longest", 0)
+        shortest_session = study_time.get("shortest", 0)
         
         # Tentukan pola belajar
         if total_sessions == 0:
@@ -2,7 +2,7 @@ from flask_pymongo import PyMongo
 import logging
 import os
 from dotenv import load_dotenv
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, OperationFailure
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,6 +13,72 @@ load_dotenv()
 
 mongo = PyMongo()
 
+def ensure_ttl_index(collection, field, seconds):
+    """
+    Expire documents of a collection once field is older than seconds
+
+    A TTL index created earlier with another expiry is changed in place, and
+    dropped when seconds is None (the retention was turned off).
+    """
+    name = f"{field}_ttl"
+    if not seconds:
+        if name in collection.index_information():
+            collection.drop_index(name)
+        return
+    try:
+        collection.create_index([(field, 1)], name=name, expireAfterSeconds=seconds)
+    except OperationFailure:
+        mongo.db.command("collMod", collection.name, index={"name": name, "expireAfterSeconds": seconds})
+
+def ensure_indexes():
+    """Create the indexes the models rely on (no-op when they already exist)"""
+    # Cards are stored one document per card, see models/card_model.py
+    mongo.db.cards.create_index([("board_id", 1), ("list_id", 1), ("position", 1)])
+    mongo.db.cards.create_index([("user_id", 1), ("id", 1)])
+    # Card ids are minted by the server and unique across boards. Databases
+    # with legacy client-built ids keep the plain index until
+    # scripts/migrate_card_ids.py has rewritten them.
+    try:
+        mongo.db.cards.create_index([("id", 1)], unique=True)
+    except OperationFailure as e:
+        logger.warning(f"Card ids are not unique yet, run scripts/migrate_card_ids.py: {str(e)}")
+    # Archived and deleted cards, moved out of the active board
+    mongo.db.archived_cards.create_index([("user_id", 1), ("archived_at", -1)])
+    mongo.db.archived_cards.create_index([("board_id", 1), ("id", 1)])
+    # Append-only movement history
+    mongo.db.card_movements.create_index([("card_id", 1), ("timestamp", 1)])
+    # Study sessions are looked up per card, e.g. by the cohort export
+    mongo.db.study_sessions.create_index([("card_id", 1), ("user_id", 1)])
+    mongo.db.attachments.create_index([("card_id", 1)])
+    mongo.db.chatbot_logs.create_index([("card_id", 1)])
+    # Per-user history pages (keyset on created_at, _id) and stats within a date range
+    mongo.db.chatbot_logs.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+    mongo.db.logs.create_index([("created_at", -1), ("_id", -1)])
+    # Retention: raw log entries expire after their retention (plus a grace
+    # period), older months live in the archive collections, see
+    # models/log_archive_model.py
+    from models.log_archive_model import ARCHIVE_SOURCES, LogArchive
+    for name, source in ARCHIVE_SOURCES.items():
+        ensure_ttl_index(mongo.db[name], source["time_field"], LogArchive.ttl_seconds(name))
+        mongo.db[source["archive"]].create_index([("owner", 1), ("month", 1), ("part", 1)], unique=True)
+    # Daily and weekly study time, see models/study_time_model.py
+    mongo.db.study_time_rollups.create_index(
+        [("user_id", 1), ("card_id", 1), ("period", 1), ("start", 1)], unique=True
+    )
+    mongo.db.study_time_rollups.create_index([("card_id", 1), ("period", 1)])
+    mongo.db.study_time_rollups.create_index([("course", 1), ("period", 1), ("start", 1)])
+    mongo.db.study_time_rollups.create_index([("user_id", 1), ("period", 1), ("start", 1)])
+    # Cohort grade sketches, one document per strategy, course, test and shard
+    mongo.db.grade_sketches.create_index(
+        [("strategy", 1), ("course", 1), ("test", 1), ("shard", 1)], unique=True
+    )
+    mongo.db.grade_sketches.create_index([("course", 1), ("test", 1)])
+    # Progress report counters, one document per board and counter key
+    mongo.db.progress_stats.create_index(
+        [("board_id", 1), ("kind", 1), ("list_id", 1), ("strategy", 1), ("course", 1), ("test", 1), ("value", 1)],
+        unique=True
+    )
+
 def init_db(app):
     try:
         # Log the connection string (with password masked)
@@ -36,6 +102,7 @@ def init_db(app):
                 logger.info("Successfully connected to MongoDB Atlas")
                 logger.info(f"Database: {mongo.db.name}")
                 logger.info(f"Collections: {collections}")
+                ensure_indexes()
             except ConnectionFailure as e:
                 logger.error(f"Connection failure: {str(e)}")
                 logger.error("This could be due to network issues or incorrect credentials")
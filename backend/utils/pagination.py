@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+
+# Largest page a client may ask for
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(document, field="created_at"):
+    """
+    Opaque token for the position of a document in a newest-first listing
+
+    The token holds the document's sort value and _id, so the next page
+    starts right after it whatever was inserted in the meantime.
+    """
+    value = document.get(field)
+    if isinstance(value, datetime):
+        key = ["d", value.isoformat()]
+    else:
+        key = ["s", value if isinstance(value, str) else ""]
+    raw = json.dumps(key + [str(document["_id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token):
+    """
+    Returns:
+        tuple: (sort value, ObjectId) of the document the token was made from
+
+    Raises:
+        ValueError: If the token is not one made by encode_cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        kind, value, document_id = json.loads(raw)
+        if kind == "d":
+            value = datetime.fromisoformat(value)
+        elif kind != "s" or not isinstance(value, str):
+            raise ValueError
+        return value, ObjectId(document_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def before_cursor(token, field="created_at"):
+    """
+    Query for the documents after a cursor in (field, _id) descending order
+
+    Comparisons in MongoDB only match values of the same type, and dates sort
+    after strings, so past a date cursor every string value still follows.
+    """
+    value, document_id = decode_cursor(token)
+    after = [
+        {field: {"$lt": value}},
+        {field: value, "_id": {"$lt": document_id}}
+    ]
+    if isinstance(value, datetime):
+        after.append({field: {"$type": "string"}})
+    return {"$or": after}
+
+def page_size(value, default=10):
+    """
+    Validate a requested page size
+
+    Raises:
+        ValueError: If the value is not a number from 1 to MAX_PAGE_SIZE
+    """
+    try:
+        size = int(value) if value not in (None, "") else default
+    except (TypeError, ValueError):
+        raise ValueError("limit must be a number")
+    if not 1 <= size <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return size
+
+def fetch_page(collection, query, limit, before=None, field="created_at"):
+    """
+    One newest-first page of a collection, by keyset rather than skip
+
+    Every page is one index range scan from the cursor on, so a deep page
+    costs the same as the first. One extra document is read to tell whether
+    another page follows.
+
+    Returns:
+        tuple: (documents, next cursor or None)
+    """
+    if before:
+        query = {"$and": [query, before_cursor(before, field)]}
+    documents = list(
+        collection.find(query)
+        .sort([(field, -1), ("_id", -1)])
+        .limit(limit + 1)
+    )
+    if len(documents) <= limit:
+        return documents, None
+    documents = documents[:limit]
+    return documents, encode_cursor(documents[-1], field)
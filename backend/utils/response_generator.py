@@ -1,6 +1,10 @@
+import json
 import random
 from datetime import datetime
+from string import Formatter
+from types import MappingProxyType
 import pytz
+from config import Config
 
 def generate_chatbot_response(context_analysis, movement_info):
     """
@@ -57,6 +61,120 @@ def generate_chatbot_response(context_analysis, movement_info):
             "context_summary": {}
         }
 
+# Placeholder yang boleh dipakai di setiap template
+TEMPLATE_PLACEHOLDERS = frozenset([
+    "card_title", "user_name", "from_column_name", "to_column_name", "column_name",
+    "strategy_name", "strategy_description", "estimated_time", "total_time",
+    "total_movements", "notes"
+])
+
+# Urutan bagian respons; bagian yang tidak ada di template dilewati.
+# strategy_intro hanya dipakai jika ada strategi belajar, reflection_prompt
+# hanya jika card punya catatan, dan difficulty_tips dipilih per kesulitan.
+SECTION_ORDER = [
+    "greetings", "strategy_intro", "difficulty_tips", "time_estimation",
+    "time_summary", "achievement_summary", "review_guidance", "reflection_questions",
+    "reflection_prompt", "next_steps", "analysis_questions", "observation", "analysis",
+    "strategy_suggestions", "time_management", "support_suggestions", "suggestions",
+    "questions", "encouragement", "celebration", "next_challenge"
+]
+
+# Bagian yang ada di template bawaan tetapi (belum) pernah ditampilkan
+UNRENDERED_SECTIONS = frozenset(["understanding"])
+
+class CompiledTemplate:
+    """
+    Template yang sudah di-parse sekali saat dimuat
+
+    Teks dipecah menjadi potongan literal dan nama placeholder, sehingga
+    render hanya menggabungkan string tanpa mem-parse format lagi.
+    """
+
+    __slots__ = ("text", "fields", "_parts")
+
+    def __init__(self, text, location):
+        parts = []
+        fields = set()
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError as e:
+            raise ValueError(f"{location}: {e}")
+        for literal, field, format_spec, conversion in parsed:
+            if literal:
+                parts.append((literal, None))
+            if field is None:
+                continue
+            if field not in TEMPLATE_PLACEHOLDERS or format_spec or conversion:
+                raise ValueError(f"{location}: unsupported placeholder {{{field}}}")
+            parts.append((None, field))
+            fields.add(field)
+        self.text = text
+        self.fields = frozenset(fields)
+        self._parts = tuple(parts)
+
+    def render(self, values):
+        if not self.fields:
+            return self.text
+        return "".join([literal if field is None else str(values[field]) for literal, field in self._parts])
+
+def _compile_variants(variants, location):
+    if not isinstance(variants, list) or not variants or not all(isinstance(v, str) for v in variants):
+        raise ValueError(f"{location}: must be a non-empty list of strings")
+    return tuple(CompiledTemplate(text, f"{location}[{i}]") for i, text in enumerate(variants))
+
+def compile_templates(raw):
+    """
+    Validasi dan kompilasi template respons
+
+    Args:
+        raw (dict): {response_type: {section: [teks]}}; difficulty_tips
+            berisi {difficulty: [teks]}
+
+    Returns:
+        MappingProxyType: Registry read-only {response_type: {section: tuple CompiledTemplate}}
+
+    Raises:
+        ValueError: Jika struktur, bagian atau placeholder tidak valid
+    """
+    if not isinstance(raw, dict) or "general" not in raw:
+        raise ValueError("Response templates need a 'general' response type")
+
+    registry = {}
+    for response_type, sections in raw.items():
+        if not isinstance(sections, dict):
+            raise ValueError(f"{response_type}: must be an object of sections")
+        compiled = {}
+        for section, variants in sections.items():
+            location = f"{response_type}.{section}"
+            if section not in SECTION_ORDER and section not in UNRENDERED_SECTIONS:
+                # Tetap divalidasi, tetapi tidak pernah ditampilkan
+                print(f"Response template section {location} is unknown and is ignored")
+            if section == "difficulty_tips":
+                if not isinstance(variants, dict):
+                    raise ValueError(f"{location}: must be an object of difficulties")
+                compiled[section] = MappingProxyType({
+                    difficulty: _compile_variants(texts, f"{location}.{difficulty}")
+                    for difficulty, texts in variants.items()
+                })
+            else:
+                compiled[section] = _compile_variants(variants, location)
+        registry[response_type] = MappingProxyType(compiled)
+    return MappingProxyType(registry)
+
+def load_response_templates(path=None):
+    """
+    Muat dan kompilasi template dari file JSON
+
+    Args:
+        path (str): Lokasi file (default Config.RESPONSE_TEMPLATES_FILE)
+    """
+    with open(path or Config.RESPONSE_TEMPLATES_FILE, encoding="utf-8") as f:
+        return compile_templates(json.load(f))
+
+# Registry dikompilasi sekali saat import; template yang salah langsung
+# gagal di sini, bukan saat respons dibuat
+RESPONSE_TEMPLATES = load_response_templates()
+
 def get_response_template(response_type):
     """
     Mendapatkan template respons berdasarkan jenis respons
@@ -65,249 +183,16 @@ def get_response_template(response_type):
         response_type (str): Jenis respons
         
     Returns:
-        dict: Template respons
+        MappingProxyType: Template respons yang sudah dikompilasi
     """
-    templates = {
-        "start_task": {
-            "greetings": [
-                "Semangat mulai mengerjakan '{card_title}'! 🚀",
-                "Waktunya memulai '{card_title}'! Ayo kita kerjakan! 💪",
-                "Selamat memulai '{card_title}'! Saya di sini untuk membantu! 🌟"
-            ],
-            "strategy_intro": [
-                "Berdasarkan strategi belajar '{strategy_name}': {strategy_description}",
-                "Kamu memilih strategi '{strategy_name}'. {strategy_description}",
-                "Dengan strategi '{strategy_name}', kamu bisa: {strategy_description}"
-            ],
-            "difficulty_tips": {
-                "easy": [
-                    "Karena tugas ini tingkat kesulitannya mudah, fokus untuk menyelesaikannya dengan baik.",
-                    "Tugas ini tergolong mudah, pastikan kamu memahami konsep dasarnya dengan baik.",
-                    "Untuk tugas mudah seperti ini, kamu bisa menyelesaikannya dengan cepat namun tetap berkualitas."
-                ],
-                "medium": [
-                    "Tugas ini memiliki tingkat kesulitan sedang. Bagi waktu kamu dengan baik dan fokus pada setiap bagian.",
-                    "Untuk tugas sedang seperti ini, pastikan kamu memahami setiap konsep sebelum melanjutkan.",
-                    "Kerjakan setiap bagian secara bertahap dan jangan ragu untuk istirahat sejenak jika needed."
-                ],
-                "hard": [
-                    "Karena tugas ini tingkat kesulitannya tinggi, bagi menjadi beberapa sesi singkat dengan istirahat yang cukup.",
-                    "Tugas ini cukup menantang. Mulai dengan bagian yang paling mudah dulu untuk membangun kepercayaan diri.",
-                    "Untuk tugas sulit, pastikan kamu memahami konsep dasarnya terlebih dahulu sebelum melanjutkan ke bagian yang lebih kompleks."
-                ]
-            },
-            "time_estimation": [
-                "Estimasi waktu untuk menyelesaikan tugas ini: {estimated_time}.",
-                "Kamu mungkin membutuhkan sekitar {estimated_time} untuk menyelesaikan tugas ini.",
-                "Berdasarkan tingkat kesulitannya, alokasikan sekitar {estimated_time} untuk tugas ini."
-            ],
-            "encouragement": [
-                "Jangan lupa untuk menggunakan teknik Pomodoro: 25 menit fokus, 5 menit istirahat! 🍅",
-                "Fokus pada satu hal dalam satu waktu. Kamu pasti bisa! 💯",
-                "Ingat, konsistensi lebih penting dari intensitas. Ayo perlahan tapi pasti! 🌱"
-            ]
-        },
-        "review_task": {
-            "greetings": [
-                "Bagus! Kamu telah menyelesaikan '{card_title}'! 🎉",
-                "Hebat! '{card_title}' sudah selesai dikerjakan! 👏",
-                "Selamat! Kamu telah menyelesaikan fase pengerjaan '{card_title}'! ✨"
-            ],
-            "time_summary": [
-                "Waktu belajar kamu: {total_time}",
-                "Kamu telah menghabiskan {total_time} untuk tugas ini.",
-                "Total waktu belajar untuk tugas ini: {total_time}"
-            ],
-            "review_guidance": [
-                "Sekarang saatnya review:\n1. Apa yang sudah kamu pelajari dari tugas ini?\n2. Bagian mana yang paling menantang?\n3. Apa yang bisa kamu tingkatkan?",
-                "Mari kita review hasil kerja kamu:\n1. Apa poin-poin penting yang kamu pelajari?\n2. Kesulitan apa yang kamu hadapi?\n3. Bagaimana kamu mengatasinya?",
-                "Waktunya mereview:\n1. Apa yang kamu kerjakan dalam tugas ini?\n2. Apa yang sudah kamu pahami dengan baik?\n3. Apa yang masih perlu diperjelas?"
-            ],
-            "reflection_prompt": [
-                "Catatan kamu: '{notes}'",
-                "Dari catatan kamu: '{notes}', apa yang bisa kita simpulkan?",
-                "Kamu mencatat: '{notes}'. Bagaimana pengalaman kamu dengan tugas ini?"
-            ],
-            "next_steps": [
-                "Setelah review, kamu bisa memindahkan card ke Reflection (Done) jika sudah yakin dengan hasilnya.",
-                "Jika merasa ada yang perlu diperbaiki, kamu bisa kembali ke Monitoring (In Progress).",
-                "Review ini penting untuk memastikan pemahaman kamu sebelum melangkah ke tugas berikutnya."
-            ]
-        },
-        "complete_task": {
-            "greetings": [
-                "Selamat! '{card_title}' telah selesai! 🎊",
-                "Luar biasa! Kamu telah menyelesaikan '{card_title}'! 🏆",
-                "Akhirnya! '{card_title}' selesai! Kerja bagus! 🌟"
-            ],
-            "achievement_summary": [
-                "Total waktu belajar: {total_time}\nJumlah pergerakan card: {total_movements}",
-                "Statistik pencapaian:\n- Waktu belajar: {total_time}\n- Pergerakan card: {total_movements} kali",
-                "Pencapaian kamu:\n⏱️ Waktu belajar: {total_time}\n🔄 Pergerakan card: {total_movements} kali"
-            ],
-            "reflection_questions": [
-                "Refleksi akhir:\n1. Apa yang kamu pelajari dari proses ini?\n2. Bagaimana perasaan kamu setelah menyelesaikan tugas ini?\n3. Apa yang akan kamu lakukan berbeda untuk tugas berikutnya?",
-                "Mari kita refleksikan:\n1. Pengetahuan baru apa yang kamu dapatkan?\n2. Skill apa yang kamu kembangkan?\n3. Bagaimana perasaan kamu sekarang?",
-                "Waktunya refleksi:\n1. Apa nilai pembelajaran terbesar dari tugas ini?\n2. Bagaimana proses belajar kamu?\n3. Apa yang bisa kamu tingkatkan?"
-            ],
-            "celebration": [
-                "Selamat atas pencapaian ini! Setiap tugas yang selesai adalah langkah maju dalam perjalanan belajar kamu. 🎓",
-                "Kerja keras kamu membuahkan hasil! Teruskan semangat belajarnya! 🚀",
-                "Pencapaian yang luar biasa! Kamu layak mendapatkan apresiasi untuk usaha kamu! 👏"
-            ],
-            "next_challenge": [
-                "Siap untuk tantangan berikutnya? 💯",
-                "Ayo kita lanjutkan ke tugas berikutnya! Kamu pasti bisa! 💪",
-                "Tugas berikutnya sudah menanti! Dengan pengalaman ini, kamu akan lebih siap! 🌟"
-            ]
-        },
-        "step_back_to_planning": {
-            "understanding": [
-                "Tidak masalah mengembalikan '{card_title}' ke Planning (To Do). 😊",
-                "Mengembalikan '{card_title}' ke Planning (To Do) adalah keputusan yang bijak. 🤔",
-                "Saya mengerti kamu memindahkan '{card_title}' kembali ke Planning (To Do). 👍"
-            ],
-            "analysis_questions": [
-                "Mari kita pikirkan:\n1. Apa hambatan yang kamu hadapi?\n2. Apakah kamu perlu bantuan tambahan?\n3. Mungkin kita perlu menyesuaikan strategi belajar?",
-                "Ayo kita evaluasi:\n1. Apa yang membuat kamu kesulitan?\n2. Apakah ada konsep yang belum dipahami?\n3. Bagaimana kita bisa mempersiapkan lebih baik?",
-                "Mari kita rencanakan kembali:\n1. Apa kendala yang kamu temui?\n2. Apakah kamu butuh resources tambahan?\n3. Bagaimana strategi yang lebih efektif?"
-            ],
-            "encouragement": [
-                "Ingat, ini adalah bagian dari proses belajar! Mengenali kapan perlu rencana ulang adalah skill penting. 🌱",
-                "Kadang-kadang kita perlu kembali ke tahap perencanaan untuk memastikan segalanya berjalan dengan baik. 💡",
-                "Tidak ada yang salah dengan memutar balik untuk mempersiapkan lebih baik. Ini menunjukkan kesadaran diri! 🧠"
-            ],
-            "suggestions": [
-                "Mungkin coba pecah tugas menjadi bagian-bagian yang lebih kecil?",
-                "Apakah ada resources tambahan yang bisa membantu kamu memahami materi ini?",
-                "Coba diskusikan dengan teman atau guru jika ada bagian yang sulit dipahami."
-            ]
-        },
-        "step_back_to_monitoring": {
-            "understanding": [
-                "Tidak masalah mengembalikan '{card_title}' ke Monitoring (In Progress). 😊",
-                "Saya mengerti kamu memindahkan '{card_title}' kembali ke Monitoring (In Progress). 🤔",
-                "Mengembalikan '{card_title}' ke Monitoring (In Progress) adalah langkah yang tepat. 👍"
-            ],
-            "analysis_questions": [
-                "Mari kita pikirkan:\n1. Apa yang perlu diperbaiki dari hasil kerja kamu?\n2. Apakah ada bagian yang perlu dikerjakan ulang?\n3. Bagaimana kita bisa meningkatkan kualitas?",
-                "Ayo kita evaluasi:\n1. Apa yang kurang dari hasil kerja kamu?\n2. Apakah ada kesalahan yang perlu diperbaiki?\n3. Bagaimana cara meningkatkan hasil?",
-                "Mari kita lanjutkan pengerjaan:\n1. Apa yang perlu ditambahkan atau diubah?\n2. Apakah ada feedback yang perlu diterapkan?\n3. Bagaimana meningkatkan kualitas kerja?"
-            ],
-            "encouragement": [
-                "Proses belajar memang seringkali iteratif. Setiap revisi membuat hasil lebih baik! 🔄",
-                "Kembali ke tahap pengerjaan adalah bagian normal dari proses belajar yang berkualitas. 📚",
-                "Setiap perbaikan adalah langkah menuju pemahaman yang lebih mendalam. 💡"
-            ],
-            "suggestions": [
-                "Fokus pada bagian yang membutuhkan perbaikan berdasarkan hasil review.",
-                "Coba pendekatan berbeda untuk bagian yang sulit.",
-                "Jangan ragu untuk mencari referensi tambahan jika diperlukan."
-            ]
-        },
-        "struggling_pattern": {
-            "observation": [
-                "Saya perhatikan kamu sering memindahkan '{card_title}' bolak-balik. 🤔",
-                "Tampaknya '{card_title}' ini memberikan kamu beberapa tantangan. 🤔",
-                "Saya lihat kamu sedang berusaha dengan '{card_title}' tapi mengalami beberapa kesulitan. 🤔"
-            ],
-            "analysis": [
-                "Ini bisa menandakan beberapa hal:\n1. Mungkin tugas ini terlalu besar atau kompleks\n2. Mungkin ada konsep yang belum sepenuhnya dipahami\n3. Mungkin strategi belajar saat ini belum efektif",
-                "Pola bolak-balik sering menunjukkan:\n1. Kesulitan dalam memahami atau mengerjakan tugas\n2. Kebutuhan untuk pendekatan berbeda\n3. Mungkin perlu bantuan tambahan",
-                "Ketika card sering bergerak bolak-balik, biasanya:\n1. Ada hambatan dalam proses belajar\n2. Perlu penyesuaian strategi\n3. Mungkin perlu memecah tugas menjadi lebih kecil"
-            ],
-            "suggestions": [
-                "Mari kita coba beberapa pendekatan:\n1. Pecah tugas menjadi bagian-bagian yang lebih kecil\n2. Coba strategi belajar yang berbeda\n3. Carilah resources tambahan jika diperlukan",
-                "Beberapa ide yang bisa membantu:\n1. Fokus pada satu bagian kecil dulu\n2. Diskusikan dengan teman atau guru\n3. Coba metode pembelajaran yang berbeda",
-                "Solusi yang bisa kita coba:\n1. Buat checklist kecil untuk setiap bagian\n2. Tetapkan tujuan yang lebih realistis\n3. Gunakan teknik belajar yang sesuai dengan style kamu"
-            ],
-            "encouragement": [
-                "Jangan khawatir, ini adalah bagian normal dari proses belajar. Setiap orang memiliki tantangan uniknya! 🌱",
-                "Kesulitan seperti ini adalah kesempatan untuk mengembangkan strategi belajar yang lebih efektif. 💡",
-                "Saya yakin kamu bisa mengatasi tantangan ini! Mari kita cari cara yang paling cocok untuk kamu. 💪"
-            ]
-        },
-        "stuck_pattern": {
-            "observation": [
-                "Saya perhatikan '{card_title}' sudah berada di {column_name} untuk beberapa waktu. 🤔",
-                "Tampaknya '{card_title}' ini terjebak di {column_name} untuk sementara waktu. 🤔",
-                "Saya lihat '{card_title}' belum bergerak dari {column_name} untuk beberapa hari. 🤔"
-            ],
-            "analysis": [
-                "Ini bisa disebabkan oleh beberapa hal:\n1. Mungkin tugas ini terlalu menantang atau membosankan\n2. Mungkin ada prioritas lain yang lebih mendesak\n3. Mungkin kamu kehilangan motivasi atau fokus",
-                "Ketika sebuah card terjebak lama, biasanya:\n1. Ada hambatan yang tidak terlihat\n2. Mungkin perlu pendekatan baru\n3. Bisa jadi tugas ini tidak lagi relevan",
-                "Card yang tidak bergerak untuk waktu lama menunjukkan:\n1. Kemungkinan adanya blok mental\n2. Perlu evaluasi kembali pentingnya tugas\n3. Mungkin perlu bantuan eksternal"
-            ],
-            "suggestions": [
-                "Mari kita evaluasi kembali '{card_title}':\n1. Apakah tugas ini masih relevan?\n2. Apakah bisa dipecah menjadi bagian yang lebih kecil?\n3. Apakah ada cara untuk membuatnya lebih menarik?",
-                "Beberapa opsi untuk memecah kebuntuan:\n1. Tetapkan deadline yang lebih realistis\n2. Coba kerjakan di lingkungan yang berbeda\n3. Carilah akuntabilitas partner",
-                "Ide untuk mengatasi kebuntuan:\n1. Mulai dengan bagian termudah dulu\n2. Gunakan teknik Pomodoro untuk memulai\n3. Beri reward kecil setelah menyelesaikan bagian"
-            ],
-            "encouragement": [
-                "Kebuntuan seperti ini adalah hal yang umum dalam proses belajar. Yang penting adalah bagaimana kita mengatasinya! 🌱",
-                "Terkadang kita semua mengalami blok. Ini adalah kesempatan untuk belajar strategi baru! 💡",
-                "Jangan biarkan kebuntuan ini menghentikan kamu. Mari kita cari jalan keluar bersama! 💪"
-            ]
-        },
-        "high_complexity": {
-            "observation": [
-                "Saya perhatikan '{card_title}' memiliki tingkat kesulitan dan prioritas yang tinggi. 🤔",
-                "'{card_title}' ini tampaknya merupakan tugas yang kompleks dan penting. 🤔",
-                "Tugas '{card_title}' ini memiliki kombinasi kesulitan dan prioritas yang menantang. 🤔"
-            ],
-            "strategy_suggestions": [
-                "Untuk tugas kompleks seperti ini, saya sarankan:\n1. Pecah menjadi sub-tugas yang lebih kecil\n2. Buat timeline yang jelas untuk setiap bagian\n3. Fokus pada satu sub-tugas dalam satu waktu",
-                "Strategi untuk tugas kompleks:\n1. Mulai dengan perencanaan detail\n2. Identifikasi resources yang dibutuhkan\n3. Tetapkan milestone untuk setiap tahap",
-                "Menghadapi tugas kompleks:\n1. Buat peta konsep untuk memvisualisasikan struktur\n2. Prioritaskan bagian yang paling kritis\n3. Sisihkan waktu khusus untuk fokus mendalam"
-            ],
-            "time_management": [
-                "Untuk tugas dengan kompleksitas tinggi:\n1. Alokasikan waktu yang lebih banyak dari estimasi awal\n2. Sisihkan waktu buffer untuk hal-hal tak terduga\n3. Gunakan teknik time-blocking untuk fokus",
-                "Manajemen waktu untuk tugas kompleks:\n1. Bagi menjadi sesi-sesi singkat dengan istirahat cukup\n2. Hindari multitasking, fokus pada satu hal\n3. Gunakan teknik 2-minute rule untuk memulai",
-                "Tips waktu untuk tugas sulit:\n1. Kerjakan di waktu produktif kamu\n2. Hilangkan distraksi selama sesi kerja\n3. Gunakan timer untuk mengukur fokus"
-            ],
-            "support_suggestions": [
-                "Jangan ragu untuk mencari bantuan:\n1. Diskusikan dengan teman sekelas\n2. Tanyakan pada guru atau mentor\n3. Carilah resources pembelajaran tambahan",
-                "Dukungan yang bisa membantu:\n1. Study group untuk diskusi\n2. Office hours dengan dosen\n3. Online forums atau communities",
-                "Sumber daya tambahan:\n1. Video tutorial atau penjelasan alternatif\n2. Contoh kasus atau implementasi\n3. Practice exercises untuk memperkuat pemahaman"
-            ],
-            "encouragement": [
-                "Tugas kompleks seperti ini adalah kesempatan untuk mengembangkan skill berpikir kritis dan problem-solving. 🌟",
-                "Meskipun menantang, menyelesaikan tugas seperti ini akan memberikan kepuasan dan pembelajaran yang mendalam. 💪",
-                "Percayalah pada kemampuan kamu! Setiap langkah kecil dalam tugas kompleks adalah kemajuan yang berarti. 🚀"
-            ]
-        },
-        "general": {
-            "greetings": [
-                "Saya perhatikan kamu memindahkan '{card_title}' dari {from_column_name} ke {to_column_name}. 🤔",
-                "Pergerakan card '{card_title}' terdeteksi! 🔄",
-                "Ada pergerakan pada '{card_title}'! 👀"
-            ],
-            "observation": [
-                "Setiap pergerakan card adalah bagian dari perjalanan belajar kamu. 🌱",
-                "Proses belajar memang dinamis, teruskan eksplorasi kamu! 📚",
-                "Saya di sini untuk mendukung setiap langkah dalam perjalanan belajar kamu. 💪"
-            ],
-            "questions": [
-                "Bagaimana perasaan kamu dengan tugas ini sejauh ini?",
-                "Apakah ada yang bisa saya bantu untuk memperlancar proses belajar kamu?",
-                "Apa tantangan atau kesuksesan yang kamu alami dengan tugas ini?"
-            ],
-            "encouragement": [
-                "Teruskan semangat belajarnya! Setiap langkah adalah kemajuan. 🌟",
-                "Saya yakin kamu bisa menyelesaikan semua tantangan belajar kamu! 💪",
-                "Ingat, proses belajar adalah perjalanan, bukan tujuan akhir. Nikmati setiap prosesnya! 🌱"
-            ]
-        }
-    }
-    
-    return templates.get(response_type, templates["general"])
+    return RESPONSE_TEMPLATES.get(response_type, RESPONSE_TEMPLATES["general"])
 
 def personalize_response(template, context, card, user, learning_strategy):
     """
     Personalisasi respons dengan konteks
     
     Args:
-        template (dict): Template respons
+        template (MappingProxyType): Template respons dari get_response_template
         context (dict): Konteks analisis
         card (dict): Informasi card
         user (dict): Informasi user
@@ -317,22 +202,9 @@ def personalize_response(template, context, card, user, learning_strategy):
         str: Respons yang dipersonalisasi
     """
     try:
-        # Ambil informasi yang dibutuhkan
-        card_title = card.get("title", "tugas ini")
+        column_analysis = context.get("column_analysis", {})
         card_notes = card.get("notes", "")
-        card_difficulty = card.get("difficulty", "medium")
-        from_column_name = context.get("column_analysis", {}).get("from_column_name", "kolom sebelumnya")
-        to_column_name = context.get("column_analysis", {}).get("to_column_name", "kolom berikutnya")
-        
-        # Informasi dari analisis
-        time_analysis = context.get("time_analysis", {})
-        movement_pattern = context.get("movement_pattern", {})
-        difficulty_priority_analysis = context.get("difficulty_priority_analysis", {})
-        
-        # Format waktu
-        total_time = time_analysis.get("total_time_formatted", "belum ada data")
-        total_movements = movement_pattern.get("total_movements", 0)
-        estimated_time = difficulty_priority_analysis.get("estimated_time", "1-2 jam")
+        to_column_name = column_analysis.get("to_column_name", "kolom berikutnya")
         
         # Informasi strategi belajar
         strategy_name = "tidak dipilih"
@@ -341,140 +213,36 @@ def personalize_response(template, context, card, user, learning_strategy):
             strategy_name = learning_strategy.get("learning_strat_name", "tidak dipilih")
             strategy_description = learning_strategy.get("description", "tidak ada deskripsi")
         
-        # Personalisasi nama user
-        user_name = user.get("first_name", "kamu")
+        # Nilai untuk semua placeholder (lihat TEMPLATE_PLACEHOLDERS)
+        values = {
+            "card_title": card.get("title", "tugas ini"),
+            "user_name": user.get("first_name", "kamu"),
+            "from_column_name": column_analysis.get("from_column_name", "kolom sebelumnya"),
+            "to_column_name": to_column_name,
+            "column_name": to_column_name,
+            "strategy_name": strategy_name,
+            "strategy_description": strategy_description,
+            "estimated_time": context.get("difficulty_priority_analysis", {}).get("estimated_time", "1-2 jam"),
+            "total_time": context.get("time_analysis", {}).get("total_time_formatted", "belum ada data"),
+            "total_movements": context.get("movement_pattern", {}).get("total_movements", 0),
+            "notes": card_notes
+        }
         
-        # Bangun respons
+        # Bangun respons per bagian, sesuai SECTION_ORDER
         response_parts = []
-        
-        # Tambahkan greeting
-        greetings = template.get("greetings", [])
-        if greetings:
-            greeting = random.choice(greetings)
-            greeting = greeting.format(
-                card_title=card_title,
-                user_name=user_name,
-                from_column_name=from_column_name,
-                to_column_name=to_column_name
-            )
-            response_parts.append(greeting)
-        
-        # Tambahkan informasi strategi jika ada
-        if "strategy_intro" in template and learning_strategy:
-            strategy_intro = random.choice(template["strategy_intro"])
-            strategy_intro = strategy_intro.format(
-                strategy_name=strategy_name,
-                strategy_description=strategy_description
-            )
-            response_parts.append(strategy_intro)
-        
-        # Tambahkan tips difficulty
-        if "difficulty_tips" in template:
-            difficulty_tips = template["difficulty_tips"].get(card_difficulty, [])
-            if difficulty_tips:
-                tip = random.choice(difficulty_tips)
-                response_parts.append(tip)
-        
-        # Tambahkan estimasi waktu
-        if "time_estimation" in template:
-            time_estimation = random.choice(template["time_estimation"])
-            time_estimation = time_estimation.format(estimated_time=estimated_time)
-            response_parts.append(time_estimation)
-        
-        # Tambahkan ringkasan waktu
-        if "time_summary" in template:
-            time_summary = random.choice(template["time_summary"])
-            time_summary = time_summary.format(total_time=total_time)
-            response_parts.append(time_summary)
-        
-        # Tambahkan ringkasan pencapaian
-        if "achievement_summary" in template:
-            achievement_summary = random.choice(template["achievement_summary"])
-            achievement_summary = achievement_summary.format(
-                total_time=total_time,
-                total_movements=total_movements
-            )
-            response_parts.append(achievement_summary)
-        
-        # Tambahkan panduan review
-        if "review_guidance" in template:
-            review_guidance = random.choice(template["review_guidance"])
-            response_parts.append(review_guidance)
-        
-        # Tambahkan pertanyaan refleksi
-        if "reflection_questions" in template:
-            reflection_questions = random.choice(template["reflection_questions"])
-            response_parts.append(reflection_questions)
-        
-        # Tambahkan prompt refleksi dari notes
-        if "reflection_prompt" in template and card_notes:
-            reflection_prompt = random.choice(template["reflection_prompt"])
-            reflection_prompt = reflection_prompt.format(notes=card_notes)
-            response_parts.append(reflection_prompt)
-        
-        # Tambahkan saran langkah selanjutnya
-        if "next_steps" in template:
-            next_steps = random.choice(template["next_steps"])
-            response_parts.append(next_steps)
-        
-        # Tambahkan pertanyaan analisis
-        if "analysis_questions" in template:
-            analysis_questions = random.choice(template["analysis_questions"])
-            response_parts.append(analysis_questions)
-        
-        # Tambahkan observasi
-        if "observation" in template:
-            observation = random.choice(template["observation"])
-            observation = observation.format(
-                card_title=card_title,
-                column_name=to_column_name
-            )
-            response_parts.append(observation)
-        
-        # Tambahkan analisis
-        if "analysis" in template:
-            analysis = random.choice(template["analysis"])
-            response_parts.append(analysis)
-        
-        # Tambahkan saran strategi
-        if "strategy_suggestions" in template:
-            strategy_suggestions = random.choice(template["strategy_suggestions"])
-            response_parts.append(strategy_suggestions)
-        
-        # Tambahkan saran waktu
-        if "time_management" in template:
-            time_management = random.choice(template["time_management"])
-            response_parts.append(time_management)
-        
-        # Tambahkan saran dukungan
-        if "support_suggestions" in template:
-            support_suggestions = random.choice(template["support_suggestions"])
-            response_parts.append(support_suggestions)
-        
-        # Tambahkan saran umum
-        if "suggestions" in template:
-            suggestions = random.choice(template["suggestions"])
-            response_parts.append(suggestions)
-        
-        # Tambahkan pertanyaan umum
-        if "questions" in template:
-            questions = random.choice(template["questions"])
-            response_parts.append(questions)
-        
-        # Tambahkan semangat terakhir
-        if "encouragement" in template:
-            encouragement = random.choice(template["encouragement"])
-            response_parts.append(encouragement)
-        
-        # Tambahkan selebrasi
-        if "celebration" in template:
-            celebration = random.choice(template["celebration"])
-            response_parts.append(celebration)
-        
-        # Tambahkan tantangan berikutnya
-        if "next_challenge" in template:
-            next_challenge = random.choice(template["next_challenge"])
-            response_parts.append(next_challenge)
+        for section in SECTION_ORDER:
+            variants = template.get(section)
+            if not variants:
+                continue
+            if section == "strategy_intro" and not learning_strategy:
+                continue
+            if section == "reflection_prompt" and not card_notes:
+                continue
+            if section == "difficulty_tips":
+                variants = variants.get(card.get("difficulty", "medium"))
+                if not variants:
+                    continue
+            response_parts.append(random.choice(variants).render(values))
         
         # Gabungkan semua bagian dengan newline
         return "\n\n".join(response_parts)
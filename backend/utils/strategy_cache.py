@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from models.learningstrat_model import LearningStrat
+
+# Most strategies kept per process; the catalog is a handful of entries
+STRATEGY_CACHE_SIZE = 256
+# Cached entries (hits and misses) are reloaded after this many seconds
+STRATEGY_CACHE_TTL = 600
+# The catalog version in MongoDB is read at most this often, so a change made
+# through another worker is picked up within this many seconds
+STRATEGY_VERSION_CHECK_INTERVAL = 5.0
+
+class StrategyCache:
+    """
+    Process-local LRU/TTL cache of learning strategies
+
+    Cards store their strategy by ID or by name, so each strategy is cached
+    under both keys. Unknown keys are cached as None, so a card whose strategy
+    is not in the catalog does not query on every drag either. The cache is
+    cleared when the catalog version counter in MongoDB changes, which
+    LearningStrat bumps on every add, update and delete.
+    """
+
+    def __init__(self, max_size=STRATEGY_CACHE_SIZE, ttl=STRATEGY_CACHE_TTL,
+                 check_interval=STRATEGY_VERSION_CHECK_INTERVAL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        version = LearningStrat.catalog_version()
+        with self._lock:
+            self._checked_at = now
+            if version != self._version:
+                if self._version is not None:
+                    self._stats["invalidations"] += 1
+                self._entries.clear()
+                self._version = version
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        strategy, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, strategy
+
+    def _store(self, key, strategy):
+        self._entries[key] = (strategy, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys):
+        """
+        Strategies by ID or name, querying only for keys not cached yet
+
+        Returns:
+            dict: {key: strategy document or None}; documents are copies with _id as str
+        """
+        keys = {str(key) for key in keys if key}
+        if not keys:
+            return {}
+        self._check_version()
+
+        found = {}
+        with self._lock:
+            for key in keys:
+                cached, strategy = self._lookup(key)
+                if cached:
+                    found[key] = strategy
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(keys) - len(found)
+        missing = keys - set(found)
+        if missing:
+            loaded = {}
+            for strategy in LearningStrat.find_by_keys(list(missing)):
+                strategy["_id"] = str(strategy["_id"])
+                loaded[strategy["_id"]] = strategy
+                loaded[strategy.get("learning_strat_name")] = strategy
+            with self._lock:
+                for key in missing:
+                    found[key] = loaded.get(key)
+                    self._store(key, found[key])
+                # Also cache each loaded strategy under its other key
+                for key, strategy in loaded.items():
+                    if key and key not in missing:
+                        self._store(key, strategy)
+        return {key: dict(strategy) if strategy else None for key, strategy in found.items()}
+
+    def get(self, key):
+        return self.get_many([key]).get(str(key)) if key else None
+
+    def invalidate(self):
+        """Drop every cached strategy (the next lookup re-reads the version)"""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._checked_at = 0.0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"size": len(self._entries), "version": self._version})
+        return stats
+
+strategy_cache = StrategyCache()
@@ -1,8 +1,167 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from utils.db import mongo
 from bson import ObjectId
+from models.card_model import Card
+from models.card_movement_model import CardMovement
+from models.study_time_model import StudyTime
+from utils.write_behind import write_behind
+from utils.strategy_cache import strategy_cache
 
-def detect_card_movement(user_id, board_id, card_id, from_column, to_column):
+# Number of most recent movements loaded for pattern analysis
+MOVEMENT_HISTORY_WINDOW = 50
+
+# Field card yang tidak dipakai analisis maupun respons chatbot;
+# riwayat pergerakan diambil dari collection card_movements
+CARD_CONTEXT_PROJECTION = {"column_movements": 0, "description": 0}
+
+# Worker bersama untuk mengambil data konteks secara paralel
+_context_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="movement-context")
+
+class MovementContextLoader:
+    """
+    Identity map untuk satu request pergerakan card
+
+    Card, user, riwayat pergerakan, waktu belajar dan strategi belajar
+    masing-masing diambil paling banyak sekali, lalu objek yang sama dipakai
+    oleh deteksi, analisis dan pencatatan (log_card_movement).
+    """
+
+    def __init__(self, user_id, board_id, card_id):
+        self.user_id = user_id
+        self.board_id = board_id
+        self.card_id = card_id
+        self._loaded = {}
+
+    def seed(self, **values):
+        """Isi data yang sudah diambil di tempat lain (misalnya MovementBatchLoader)"""
+        self._loaded.update(values)
+        return self
+
+    def _get(self, key, fetch):
+        if key not in self._loaded:
+            self._loaded[key] = fetch()
+        return self._loaded[key]
+
+    def card(self):
+        return self._get("card", lambda: get_card_info(self.board_id, self.card_id))
+
+    def user(self):
+        return self._get("user", lambda: get_user_info(self.user_id))
+
+    def movement_history(self):
+        return self._get("movement_history", lambda: get_card_movement_history(self.board_id, self.card_id))
+
+    def study_time(self):
+        return self._get("study_time", lambda: get_study_time_for_card(self.card_id))
+
+    def movement_count(self):
+        def count():
+            # Riwayat hanya memuat jendela terbaru; jika penuh, hitung semuanya
+            history = self.movement_history()
+            if len(history) >= MOVEMENT_HISTORY_WINDOW:
+                return CardMovement.count_by_card(self.board_id, self.card_id)
+            return len(history)
+        return self._get("movement_count", count)
+
+    def learning_strategy(self):
+        return self._get("learning_strategy", lambda: get_learning_strategy(self.card().get("learning_strategy")))
+
+    def prefetch(self):
+        """
+        Ambil semua data konteks secara paralel
+
+        Card, user, riwayat pergerakan dan waktu belajar saling independen;
+        strategi belajar menunggu card (butuh ID strateginya) tetapi tetap
+        berjalan bersamaan dengan query lainnya.
+        """
+        fetchers = {
+            "card": self.card,
+            "user": self.user,
+            "movement_history": self.movement_history,
+            "study_time": self.study_time
+        }
+        futures = {
+            key: _context_executor.submit(fetch)
+            for key, fetch in fetchers.items()
+            if key not in self._loaded
+        }
+        if "card" in futures:
+            futures.pop("card").result()
+        if "learning_strategy" not in self._loaded:
+            futures["learning_strategy"] = _context_executor.submit(self.learning_strategy)
+        for future in futures.values():
+            future.result()
+        return self
+
+class MovementBatchLoader:
+    """
+    Konteks bersama untuk banyak pergerakan card milik satu user
+
+    User diambil sekali, dan card, riwayat pergerakan, waktu belajar serta
+    strategi belajar masing-masing diambil dengan satu query untuk semua card
+    di batch. loader_for() memberikan MovementContextLoader yang sudah terisi,
+    sehingga detect_card_movement tidak melakukan query lagi.
+    """
+
+    def __init__(self, user_id, card_keys):
+        self.user_id = user_id
+        self.card_keys = {(str(board_id), card_id) for board_id, card_id in card_keys}
+        self.user = None
+        self.cards = {}
+        self.histories = {}
+        self.study_times = {}
+        self.strategies = {}
+
+    def prefetch(self):
+        card_ids = list({card_id for _, card_id in self.card_keys})
+        futures = {
+            "user": _context_executor.submit(get_user_info, self.user_id),
+            "cards": _context_executor.submit(
+                Card.find_cards_by_keys, self.user_id, self.card_keys, CARD_CONTEXT_PROJECTION
+            ),
+            "histories": _context_executor.submit(
+                CardMovement.find_by_cards, self.card_keys, MOVEMENT_HISTORY_WINDOW
+            ),
+            "study_times": _context_executor.submit(StudyTime.summaries_for_cards, card_ids)
+        }
+        self.cards = {key: Card.to_card(card) for key, card in futures.pop("cards").result().items()}
+        strategy_ids = {card.get("learning_strategy") for card in self.cards.values()}
+        strategies = _context_executor.submit(get_learning_strategies, strategy_ids)
+
+        self.user = futures["user"].result()
+        self.histories = futures["histories"].result()
+        self.study_times = futures["study_times"].result()
+        self.strategies = strategies.result()
+        return self
+
+    def add_movement(self, board_id, card_id, from_column, to_column, timestamp):
+        """
+        Tambahkan pergerakan yang sudah diproses ke riwayat card-nya, sehingga
+        pergerakan berikutnya dari card yang sama di batch ini ikut melihatnya
+        """
+        key = (str(board_id), card_id)
+        history, count = self.histories.get(key, ([], 0))
+        history = history + [{"from_column": from_column, "to_column": to_column, "timestamp": timestamp}]
+        self.histories[key] = (history[-MOVEMENT_HISTORY_WINDOW:], count + 1)
+
+    def loader_for(self, board_id, card_id):
+        key = (str(board_id), card_id)
+        loader = MovementContextLoader(self.user_id, board_id, card_id)
+        card = self.cards.get(key)
+        history, count = self.histories.get(key, ([], 0))
+        loader.seed(
+            card=card,
+            user=self.user,
+            movement_history=[CardMovement.to_column_movement(m) for m in history],
+            movement_count=count,
+            study_time=self.study_times.get(card_id)
+        )
+        if card is not None:
+            loader.seed(learning_strategy=self.strategies.get(card.get("learning_strategy")))
+        return loader
+
+def detect_card_movement(user_id, board_id, card_id, from_column, to_column, loader=None):
     """
     Mendeteksi pergerakan card dan mengembalikan informasi konteks
     
@@ -12,31 +171,36 @@ def detect_card_movement(user_id, board_id, card_id, from_column, to_column):
         card_id (str): ID card yang digerakkan
         from_column (str): ID kolom asal
         to_column (str): ID kolom tujuan
+        loader (MovementContextLoader): Loader request ini, agar data yang
+            sama bisa dipakai lagi oleh log_card_movement
         
     Returns:
         dict: Informasi konteks pergerakan card
     """
     try:
-        # Dapatkan informasi card
-        card = get_card_info(board_id, card_id)
-        
-        # Dapatkan informasi user
-        user = get_user_info(user_id)
+        loader = loader or MovementContextLoader(user_id, board_id, card_id)
+        loader.prefetch()
+
+        # Dapatkan informasi card dan user
+        card = loader.card()
+        user = loader.user()
         
-        # Dapatkan riwayat pergerakan card
-        movement_history = get_card_movement_history(board_id, card_id)
+        # Dapatkan riwayat pergerakan card (hanya jendela terbaru)
+        movement_history = loader.movement_history()
+        movement_count = loader.movement_count()
         
-        # Dapatkan sesi belajar terkait card
-        study_sessions = get_study_sessions_for_card(card_id)
+        # Dapatkan ringkasan waktu belajar card (dari rollup, bukan sesi mentah)
+        study_time = loader.study_time()
         
         # Dapatkan informasi strategi belajar
-        learning_strategy = get_learning_strategy(card.get("learning_strategy"))
+        learning_strategy = loader.learning_strategy()
         
         return {
             "card": card,
             "user": user,
             "movement_history": movement_history,
-            "study_sessions": study_sessions,
+            "movement_count": movement_count,
+            "study_time": study_time,
             "learning_strategy": learning_strategy,
             "from_column": from_column,
             "to_column": to_column,
@@ -58,19 +222,8 @@ def get_card_info(board_id, card_id):
         dict: Informasi card
     """
     try:
-        boards_collection = mongo.db.boards
-        board = boards_collection.find_one({"_id": ObjectId(board_id)})
-        
-        if not board:
-            return None
-        
-        # Cari card dalam lists
-        for list_item in board.get("lists", []):
-            for card in list_item.get("cards", []):
-                if card.get("id") == card_id:
-                    return card
-        
-        return None
+        card = Card.find_card_in_board(board_id, card_id, CARD_CONTEXT_PROJECTION)
+        return Card.to_card(card) if card else None
     except Exception as e:
         print(f"Error in get_card_info: {e}")
         return None
@@ -87,100 +240,112 @@ def get_user_info(user_id):
     """
     try:
         users_collection = mongo.db.users
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
+        # Password tidak pernah ikut diambil
+        user = users_collection.find_one({"_id": ObjectId(user_id)}, {"password": 0})
         
         if user:
             # Convert ObjectId to string for JSON serialization
             user["_id"] = str(user["_id"])
-            # Remove sensitive information
-            user.pop("password", None)
             
         return user
     except Exception as e:
         print(f"Error in get_user_info: {e}")
         return None
 
-def get_card_movement_history(board_id, card_id):
+def get_card_movement_history(board_id, card_id, limit=MOVEMENT_HISTORY_WINDOW):
     """
-    Mendapatkan riwayat pergerakan card
+    Mendapatkan riwayat pergerakan card dari collection card_movements
     
     Args:
         board_id (str): ID board
         card_id (str): ID card
+        limit (int): Jumlah pergerakan terbaru yang diambil
         
     Returns:
-        list: Riwayat pergerakan card
+        list: Riwayat pergerakan card (format sama dengan column_movements)
     """
     try:
-        boards_collection = mongo.db.boards
-        board = boards_collection.find_one({"_id": ObjectId(board_id)})
-        
-        if not board:
-            return []
-        
-        # Cari card dalam lists
-        for list_item in board.get("lists", []):
-            for card in list_item.get("cards", []):
-                if card.get("id") == card_id:
-                    return card.get("column_movements", [])
-        
-        return []
+        movements = CardMovement.find_by_card(board_id, card_id, limit)
+        return [CardMovement.to_column_movement(m) for m in movements]
     except Exception as e:
         print(f"Error in get_card_movement_history: {e}")
         return []
 
-def get_study_sessions_for_card(card_id):
+def get_study_time_for_card(card_id):
     """
-    Mendapatkan sesi belajar terkait card
+    Mendapatkan ringkasan waktu belajar card dari koleksi rollup
     
     Args:
         card_id (str): ID card
         
     Returns:
-        list: Sesi belajar terkait card
+        dict: Jumlah sesi, total menit, sesi terpanjang/terpendek, dan jam mulai sesi
     """
     try:
-        study_sessions_collection = mongo.db.study_sessions
-        sessions = list(study_sessions_collection.find({"card_id": card_id}))
-        
-        # Convert ObjectId to string for JSON serialization
-        for session in sessions:
-            session["_id"] = str(session["_id"])
-            
-        return sessions
+        return StudyTime.summary_for_card(card_id)
     except Exception as e:
-        print(f"Error in get_study_sessions_for_card: {e}")
-        return []
+        print(f"Error in get_study_time_for_card: {e}")
+        return None
 
 def get_learning_strategy(strategy_id):
     """
-    Mendapatkan informasi strategi belajar
+    Mendapatkan informasi strategi belajar (dari cache strategi jika ada)
     
     Args:
-        strategy_id (str): ID strategi belajar
+        strategy_id (str): ID atau nama strategi belajar
         
     Returns:
         dict: Informasi strategi belajar
     """
     try:
-        if not strategy_id:
-            return None
-            
-        learning_strats_collection = mongo.db.learning_strats
-        strategy = learning_strats_collection.find_one({"_id": ObjectId(strategy_id)})
-        
-        if strategy:
-            # Convert ObjectId to string for JSON serialization
-            strategy["_id"] = str(strategy["_id"])
-            
-        return strategy
+        return strategy_cache.get(strategy_id)
     except Exception as e:
         print(f"Error in get_learning_strategy: {e}")
         return None
 
-def log_card_movement(user_id, board_id, card_id, from_column, to_column):
+def get_learning_strategies(strategy_ids):
+    """
+    Mendapatkan beberapa strategi belajar sekaligus (dari cache strategi jika ada)
+    
+    Args:
+        strategy_ids (iterable): ID atau nama strategi belajar (yang kosong diabaikan)
+        
+    Returns:
+        dict: {ID/nama strategi: informasi strategi belajar}
+    """
+    try:
+        strategies = strategy_cache.get_many(strategy_ids)
+        return {key: strategy for key, strategy in strategies.items() if strategy}
+    except Exception as e:
+        print(f"Error in get_learning_strategies: {e}")
+        return {}
+
+def card_movement_log_request(user_id, board_id, card_id, from_column, to_column, loader, timestamp=None):
+    """
+    Menyusun write request untuk mencatat pergerakan card ke card_movements
+    
+    Tanpa timestamp, jika board sudah mencatat pergerakan ini, record yang ada
+    hanya dilengkapi username dan judul card (lihat CardMovement.record_once_request).
+    Dengan timestamp (pergerakan dari batch), pergerakan selalu dicatat sebagai
+    record baru, sehingga pergerakan yang sama berulang kali tidak digabung.
+    """
+    user = loader.user()
+    username = user.get("username", "unknown") if user else "unknown"
+    card = loader.card()
+    card_title = card.get("title", "unknown") if card else "unknown"
+    if timestamp is not None:
+        return CardMovement.record_request(
+            user_id, board_id, card_id, from_column, to_column, timestamp,
+            username=username, card_title=card_title
+        )
+    return CardMovement.record_once_request(
+        user_id, board_id, card_id, from_column, to_column,
+        username=username, card_title=card_title
+    )
+
+def log_card_movement(user_id, board_id, card_id, from_column, to_column, loader=None):
     """
-    Mencatat pergerakan card ke logs collection
+    Mencatat pergerakan card ke card_movements collection (write-behind)
     
     Args:
         user_id (str): ID user yang menggerakkan card
@@ -188,37 +353,19 @@ def log_card_movement(user_id, board_id, card_id, from_column, to_column):
         card_id (str): ID card yang digerakkan
         from_column (str): ID kolom asal
         to_column (str): ID kolom tujuan
+        loader (MovementContextLoader): Loader dari detect_card_movement;
+            user dan card yang sudah diambil tidak di-query ulang
         
     Returns:
         bool: True jika berhasil, False jika gagal
     """
     try:
-        # Dapatkan informasi user untuk username
-        user = get_user_info(user_id)
-        username = user.get("username", "unknown") if user else "unknown"
-        
-        # Dapatkan informasi card untuk title
-        card = get_card_info(board_id, card_id)
-        card_title = card.get("title", "unknown") if card else "unknown"
-        
-        # Buat deskripsi log
-        description = f"{username} moved card '{card_title}' from {from_column} to {to_column}"
-        
-        # Simpan ke logs collection
-        logs_collection = mongo.db.logs
-        log_entry = {
-            "username": username,
-            "user_id": user_id,
-            "action_type": "card_movement",
-            "description": description,
-            "board_id": board_id,
-            "card_id": card_id,
-            "from_column": from_column,
-            "to_column": to_column,
-            "created_at": datetime.now()
-        }
-        
-        logs_collection.insert_one(log_entry)
+        loader = loader or MovementContextLoader(user_id, board_id, card_id)
+
+        # Simpan ke card_movements lewat antrean write-behind (respons tidak menunggu)
+        write_behind.enqueue("card_movements", card_movement_log_request(
+            user_id, board_id, card_id, from_column, to_column, loader
+        ))
         return True
     except Exception as e:
         print(f"Error in log_card_movement: {e}")
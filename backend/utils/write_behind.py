@@ -0,0 +1,155 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+from utils.db import mongo
+
+# Writes waiting for the flusher; beyond this the caller writes synchronously
+WRITE_BEHIND_MAX_DEPTH = 10000
+# Flush as soon as this many writes are queued...
+WRITE_BEHIND_BATCH_SIZE = 500
+# ...or when the oldest queued write has waited this many seconds
+WRITE_BEHIND_FLUSH_INTERVAL = 1.0
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue for log writes that the response does not wait for
+
+    Callers enqueue pymongo write requests (InsertOne, or UpdateOne for
+    de-duplicating upserts) per collection. A daemon thread drains the queue
+    in batches and sends each collection's share with one unordered
+    bulk_write, the same single round trip as insert_many(ordered=False).
+    Pending writes are flushed at interpreter exit. When the queue is full the
+    write is done synchronously instead of being dropped.
+    """
+
+    def __init__(self, max_depth=WRITE_BEHIND_MAX_DEPTH, batch_size=WRITE_BEHIND_BATCH_SIZE,
+                 flush_interval=WRITE_BEHIND_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_depth)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "failed": 0,
+            "overflow": 0,
+            "max_depth_seen": 0,
+            "last_flush_at": None
+        }
+
+    def _ensure_flusher(self):
+        # Started lazily so that worker processes forked after import get their own thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, collection, request):
+        """
+        Queue one write request for a collection
+
+        Returns:
+            bool: False if the queue was full and the write was done synchronously
+        """
+        if not self._closed:
+            self._ensure_flusher()
+            try:
+                self._queue.put_nowait((collection, request))
+                with self._lock:
+                    self._stats["enqueued"] += 1
+                    self._stats["max_depth_seen"] = max(self._stats["max_depth_seen"], self._queue.qsize())
+                return True
+            except queue.Full:
+                pass
+
+        with self._lock:
+            self._stats["overflow"] += 1
+        self._write([(collection, request)])
+        return False
+
+    def _write(self, items):
+        by_collection = {}
+        for collection, request in items:
+            by_collection.setdefault(collection, []).append(request)
+
+        for collection, requests in by_collection.items():
+            try:
+                mongo.db[collection].bulk_write(requests, ordered=False)
+                written, failed = len(requests), 0
+            except Exception as e:
+                # With ordered=False the other writes of the batch still go through
+                details = getattr(e, "details", None) or {}
+                failed = len(details.get("writeErrors", [])) or len(requests)
+                written = len(requests) - failed
+                print(f"Error flushing {collection} writes: {str(e)}")
+            with self._lock:
+                self._stats["written"] += written
+                self._stats["failed"] += failed
+
+    def _drain(self, limit):
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            # Wait for a full batch, but never longer than flush_interval
+            deadline = time.monotonic() + self.flush_interval
+            items = [first]
+            while len(items) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.flush_items(items)
+
+    def flush_items(self, items):
+        self._write(items)
+        with self._lock:
+            self._stats["last_flush_at"] = datetime.utcnow()
+        for _ in items:
+            self._queue.task_done()
+
+    def flush(self):
+        """Write everything queued so far from the calling thread"""
+        while True:
+            items = self._drain(self.batch_size)
+            if not items:
+                return
+            self.flush_items(items)
+
+    def close(self):
+        """Stop accepting writes (later ones are written synchronously) and flush"""
+        self._closed = True
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "flusher_alive": bool(self._thread and self._thread.is_alive())
+        })
+        return stats
+
+write_behind = WriteBehindQueue()
+atexit.register(write_behind.close)
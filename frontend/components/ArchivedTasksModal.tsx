@@ -9,9 +9,11 @@ interface ArchivedTasksModalProps {
     onClose: () => void
     onRestore: (cardId: string) => void
     onDelete: (cardId: string) => void
+    hasMore?: boolean
+    onLoadMore?: () => void
 }
 
-export default function ArchivedTasksModal({ archivedTasks, onClose, onRestore, onDelete }: ArchivedTasksModalProps) {
+export default function ArchivedTasksModal({ archivedTasks, onClose, onRestore, onDelete, hasMore, onLoadMore }: ArchivedTasksModalProps) {
     const [searchTerm, setSearchTerm] = useState("")
     const [filterOpen, setFilterOpen] = useState(false)
     const [filters, setFilters] = useState({
@@ -261,6 +263,16 @@ export default function ArchivedTasksModal({ archivedTasks, onClose, onRestore,
                             ))}
                         </ul>
                     )}
+                    {hasMore && onLoadMore && (
+                        <div className="flex justify-center mt-4">
+                            <button
+                                onClick={onLoadMore}
+                                className="px-4 py-2 border border-gray-300 text-sm font-medium rounded-md text-gray-700 bg-white hover:bg-gray-50"
+                            >
+                                Load more
+                            </button>
+                        </div>
+                    )}
                 </div>
 
                 {/* Footer */}
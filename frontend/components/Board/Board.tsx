@@ -5,9 +5,18 @@ import { useRouter } from "next/router";
 import BoardHeader from "./BoardHeader";
 import BoardContent from "./BoardContent";
 import ArchivedTasksModal from "@/components/ArchivedTasksModal";
-import { fetchBoardData, restoreCard, deleteCard } from "@/utils/boardService";
+import {
+  fetchBoardData,
+  restoreArchivedCard,
+  deleteCard,
+  flushBoardOperations,
+  onCardIdsAssigned,
+} from "@/utils/boardService";
+import { getArchivedCards } from "@/utils/api";
 import type { ListType, Card } from "@/types";
 
+const ARCHIVE_PAGE_SIZE = 20;
+
 interface BoardProps {
   onCardMove?: () => void;
 }
@@ -17,6 +26,8 @@ export default function Board({ onCardMove }: BoardProps) {
   const [boardId, setBoardId] = useState<string | null>(null);
   const [boardName, setBoardName] = useState<string>("");
   const [isArchivedModalOpen, setIsArchivedModalOpen] = useState(false);
+  const [storedArchivedCards, setStoredArchivedCards] = useState<Card[]>([]);
+  const [hasMoreArchived, setHasMoreArchived] = useState(false);
 
   const router = useRouter();
 
@@ -24,19 +35,82 @@ export default function Board({ onCardMove }: BoardProps) {
     fetchBoardData(setLists, setBoardId, setBoardName, router);
   }, []);
 
-  // Get archived tasks and include their column (list) title
-  const archivedCards: Card[] = lists.flatMap(
+  // Send edits still waiting in the batch queue before the board goes away
+  useEffect(() => {
+    const flush = () => {
+      flushBoardOperations();
+    };
+    window.addEventListener("pagehide", flush);
+    return () => {
+      window.removeEventListener("pagehide", flush);
+      flush();
+    };
+  }, []);
+
+  // Swap placeholder ids of newly added cards for the ids the server minted
+  useEffect(
+    () =>
+      onCardIdsAssigned((cardIds) => {
+        setLists((prev) =>
+          prev.map((list) => ({
+            ...list,
+            cards: list.cards.map((card) =>
+              cardIds[card.id] ? { ...card, id: cardIds[card.id] } : card
+            ),
+          }))
+        );
+      }),
+    []
+  );
+
+  // Archived cards live in a separate store on the server; load them page by page
+  const loadArchivedCards = async (offset: number) => {
+    try {
+      const response = await getArchivedCards(offset, ARCHIVE_PAGE_SIZE);
+      if (!response.ok) return;
+      const data = await response.json();
+      setStoredArchivedCards((prev) =>
+        offset === 0 ? data.cards : [...prev, ...data.cards]
+      );
+      setHasMoreArchived(data.has_more);
+    } catch (error) {
+      console.error("Error fetching archived cards:", error);
+    }
+  };
+
+  const openArchivedModal = () => {
+    setIsArchivedModalOpen(true);
+    loadArchivedCards(0);
+  };
+
+  // Cards archived during this session are still in lists until the next reload
+  const sessionArchivedCards: Card[] = lists.flatMap(
     (list) =>
       list.cards
         .filter((card) => card.archived && !card.deleted)
-        .map((card) => ({ ...card, listTitle: list.title })) // Add listTitle dynamically
+        .map((card) => ({ ...card, list_id: list.id }))
+  );
+  const removedCardIds = new Set(
+    lists.flatMap((list) =>
+      list.cards
+        .filter((card) => !card.archived || card.deleted)
+        .map((card) => card.id)
+    )
   );
+  const archivedCards: Card[] = [
+    ...sessionArchivedCards,
+    ...storedArchivedCards.filter(
+      (card) =>
+        !removedCardIds.has(card.id) &&
+        !sessionArchivedCards.some((c) => c.id === card.id)
+    ),
+  ];
 
   return (
     <div className="rounded-xl shadow-sm bg-white dark:bg-slate-800 overflow-hidden">
       <BoardHeader
         boardName={boardName}
-        onShowArchived={() => setIsArchivedModalOpen(true)}
+        onShowArchived={openArchivedModal}
       />
       <div className="p-4 md:p-6">
         <BoardContent
@@ -52,8 +126,17 @@ export default function Board({ onCardMove }: BoardProps) {
         <ArchivedTasksModal
           archivedTasks={archivedCards}
           onClose={() => setIsArchivedModalOpen(false)}
-          onRestore={(cardId) => restoreCard(lists, setLists, boardId, cardId)}
-          onDelete={(cardId) => deleteCard(lists, setLists, boardId, cardId)}
+          hasMore={hasMoreArchived}
+          onLoadMore={() => loadArchivedCards(storedArchivedCards.length)}
+          onRestore={(cardId) => {
+            const card = archivedCards.find((c) => c.id === cardId);
+            if (card) restoreArchivedCard(lists, setLists, boardId, card);
+            setStoredArchivedCards((prev) => prev.filter((c) => c.id !== cardId));
+          }}
+          onDelete={(cardId) => {
+            deleteCard(lists, setLists, boardId, cardId);
+            setStoredArchivedCards((prev) => prev.filter((c) => c.id !== cardId));
+          }}
         />
       )}
     </div>
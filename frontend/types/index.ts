@@ -39,8 +39,23 @@ export interface Card {
   post_test_grade?: string;
   created_at: string;
   column_movements: ColumnMovement[];
+  list_id?: string;
 }
 
+export type BoardOperation =
+  | { op: "set_card_field"; card_id: string; field: keyof Card; value: any }
+  | {
+      op: "move_card";
+      card_id: string;
+      from_list: string;
+      to_list: string;
+      index?: number;
+    }
+  | { op: "add_card"; list_id: string; card: Card; index?: number }
+  | { op: "remove_card"; card_id: string }
+  | { op: "reorder"; list_id: string; card_ids: string[] }
+  | { op: "rename_list"; list_id: string; title: string };
+
 export interface ListType {
   id: string;
   title: string;
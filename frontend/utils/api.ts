@@ -105,8 +105,12 @@ export async function updatePassword(
   });
 }
 
-export async function getBoard() {
-  return authorizedFetch(`${API_URL}/board`);
+export async function getBoard(view: "summary" | "full" = "full") {
+  return authorizedFetch(`${API_URL}/board?view=${view}`);
+}
+
+export async function getCardDetails(cardId: string) {
+  return authorizedFetch(`${API_URL}/card/${encodeURIComponent(cardId)}`);
 }
 
 export async function updateBoard(boardId: string, lists: any[]) {
@@ -117,6 +121,20 @@ export async function updateBoard(boardId: string, lists: any[]) {
   }).then((res) => res.json());
 }
 
+export async function patchBoard(boardId: string, operations: any[]) {
+  return authorizedFetch(`${API_URL}/patch-board`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ boardId, operations }),
+  }).then((res) => res.json());
+}
+
+export async function getArchivedCards(offset = 0, limit = 20) {
+  return authorizedFetch(
+    `${API_URL}/archived-cards?offset=${offset}&limit=${limit}`
+  );
+}
+
 export async function createBoard(name: string) {
   return authorizedFetch(`${API_URL}/create-board`, {
     method: "POST",
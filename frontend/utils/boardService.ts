@@ -1,7 +1,8 @@
-import type { ListType, Card } from "@/types";
+import type { ListType, Card, BoardOperation } from "@/types";
 import {
   getBoard,
   updateBoard,
+  patchBoard,
   triggerChatbotCardMovement,
   getCurrentUser,
 } from "@/utils/api";
@@ -21,6 +22,122 @@ export async function updateBoardState(
   }
 }
 
+// Operations issued within this window are sent to the server as one batch
+const BATCH_DELAY_MS = 300;
+
+let queuedBoardId: string | null = null;
+let queuedOperations: BoardOperation[] = [];
+let queuedCallbacks: (() => void)[] = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+let lastFlush: Promise<void> = Promise.resolve();
+
+// The server mints the ids of added cards; until a batch comes back the
+// card carries a placeholder id, which later operations are rewritten from
+const assignedCardIds: Record<string, string> = {};
+const cardIdListeners = new Set<(cardIds: Record<string, string>) => void>();
+
+export function onCardIdsAssigned(
+  listener: (cardIds: Record<string, string>) => void
+) {
+  cardIdListeners.add(listener);
+  return () => {
+    cardIdListeners.delete(listener);
+  };
+}
+
+function resolveCardId(cardId: string) {
+  return assignedCardIds[cardId] ?? cardId;
+}
+
+function resolveOperation(operation: BoardOperation): BoardOperation {
+  switch (operation.op) {
+    case "set_card_field":
+    case "move_card":
+    case "remove_card":
+      return { ...operation, card_id: resolveCardId(operation.card_id) };
+    case "reorder":
+      return { ...operation, card_ids: operation.card_ids.map(resolveCardId) };
+    default:
+      return operation;
+  }
+}
+
+function queueOperation(operation: BoardOperation) {
+  // A newer value for the same card field replaces the queued one where it
+  // stands, so it keeps its place among the other operations on the card
+  if (operation.op === "set_card_field") {
+    const index = queuedOperations.findIndex(
+      (queued) =>
+        queued.op === "set_card_field" &&
+        queued.card_id === operation.card_id &&
+        queued.field === operation.field
+    );
+    if (index !== -1) {
+      queuedOperations[index] = operation;
+      return;
+    }
+  }
+  queuedOperations.push(operation);
+}
+
+export function flushBoardOperations(): Promise<void> {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+
+  const boardId = queuedBoardId;
+  const operations = queuedOperations;
+  const callbacks = queuedCallbacks;
+  queuedBoardId = null;
+  queuedOperations = [];
+  queuedCallbacks = [];
+
+  if (!boardId || operations.length === 0) {
+    callbacks.forEach((callback) => callback());
+    return lastFlush;
+  }
+
+  // Batches are sent one after another so the server applies them in order
+  lastFlush = lastFlush.then(async () => {
+    try {
+      const data = await patchBoard(
+        boardId,
+        operations.map(resolveOperation)
+      );
+      console.log("Board patched:", data);
+      if (data?.card_ids && Object.keys(data.card_ids).length > 0) {
+        Object.assign(assignedCardIds, data.card_ids);
+        cardIdListeners.forEach((listener) => listener(data.card_ids));
+      }
+    } catch (error) {
+      console.error("Error patching board:", error);
+    } finally {
+      callbacks.forEach((callback) => callback());
+    }
+  });
+  return lastFlush;
+}
+
+export function patchBoardState(
+  boardId: string | null,
+  operations: BoardOperation[]
+): Promise<void> {
+  if (!boardId) return Promise.resolve();
+
+  if (queuedBoardId && queuedBoardId !== boardId) {
+    flushBoardOperations();
+  }
+
+  queuedBoardId = boardId;
+  operations.forEach(queueOperation);
+
+  if (flushTimer) clearTimeout(flushTimer);
+  flushTimer = setTimeout(flushBoardOperations, BATCH_DELAY_MS);
+
+  return new Promise((resolve) => queuedCallbacks.push(resolve));
+}
+
 export function addCard(
   lists: ListType[],
   setLists: React.Dispatch<React.SetStateAction<ListType[]>>,
@@ -33,7 +150,8 @@ export function addCard(
 ) {
   const now = new Date().toISOString();
   const newCard: Card = {
-    id: `${courseCode}-${courseName}-${material}`,
+    // Placeholder until the server assigns the card its id
+    id: `new-${Date.now()}-${Math.random().toString(36).slice(2, 8)}`,
     title: `${courseName} [${courseCode}]`,
     sub_title: material,
     description: "",
@@ -55,7 +173,7 @@ export function addCard(
   );
 
   setLists(updatedLists);
-  updateBoardState(boardId, updatedLists);
+  patchBoardState(boardId, [{ op: "add_card", list_id: listId, card: newCard }]);
 }
 
 export function updateCard(
@@ -74,7 +192,9 @@ export function updateCard(
   }));
 
   setLists(updatedLists);
-  updateBoardState(boardId, updatedLists);
+  patchBoardState(boardId, [
+    { op: "set_card_field", card_id: cardId, field, value: newValue },
+  ]);
 }
 
 export async function moveCard(
@@ -152,7 +272,7 @@ export async function moveCard(
 
         triggerChatbotCardMovement(
           userId,
-          movedCard.id,
+          resolveCardId(movedCard.id),
           sourceColumnName,
           destColumnName,
           movedCard.title,
@@ -208,7 +328,15 @@ export async function moveCard(
     }
   }
 
-  updateBoardState(boardId, updatedLists).catch((error) => {
+  patchBoardState(boardId, [
+    {
+      op: "move_card",
+      card_id: movedCard.id,
+      from_list: sourceList.id,
+      to_list: destList.id,
+      index: destinationIndex,
+    },
+  ]).catch((error) => {
     console.error("Failed to update board state:", error);
   });
 }
@@ -250,7 +378,9 @@ export function archiveCard(
   }));
 
   setLists(updatedLists);
-  updateBoardState(boardId, updatedLists);
+  patchBoardState(boardId, [
+    { op: "set_card_field", card_id: cardId, field: "archived", value: true },
+  ]);
 }
 
 export function restoreCard(
@@ -267,7 +397,37 @@ export function restoreCard(
   }));
 
   setLists(updatedLists);
-  updateBoardState(boardId, updatedLists);
+  patchBoardState(boardId, [
+    { op: "set_card_field", card_id: cardId, field: "archived", value: false },
+  ]);
+}
+
+export function restoreArchivedCard(
+  lists: ListType[],
+  setLists: React.Dispatch<React.SetStateAction<ListType[]>>,
+  boardId: string | null,
+  card: Card
+) {
+  // Cards archived in this session are still in lists; older ones only exist
+  // in the archive and have to be put back into the list they came from
+  const inLists = lists.some((list) => list.cards.some((c) => c.id === card.id));
+  const updatedLists = inLists
+    ? lists.map((list) => ({
+        ...list,
+        cards: list.cards.map((c) =>
+          c.id === card.id ? { ...c, archived: false } : c
+        ),
+      }))
+    : lists.map((list) =>
+        list.id === card.list_id
+          ? { ...list, cards: [...list.cards, { ...card, archived: false }] }
+          : list
+      );
+
+  setLists(updatedLists);
+  patchBoardState(boardId, [
+    { op: "set_card_field", card_id: card.id, field: "archived", value: false },
+  ]);
 }
 
 export function deleteCard(
@@ -284,5 +444,7 @@ export function deleteCard(
   }));
 
   setLists(updatedLists);
-  updateBoardState(boardId, updatedLists);
+  patchBoardState(boardId, [
+    { op: "set_card_field", card_id: cardId, field: "deleted", value: true },
+  ]);
 }
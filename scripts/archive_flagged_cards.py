@@ -0,0 +1,25 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Moves cards that are already flagged archived/deleted out of the active
+# cards collection into archived_cards. Safe to re-run.
+with app.app_context():
+    from utils.db import mongo
+    from models.card_model import Card, ARCHIVE_FLAGS
+
+    flagged = mongo.db.cards.find(
+        {"$or": [{flag: True} for flag in ARCHIVE_FLAGS]},
+        {"board_id": 1, "user_id": 1, "id": 1, **{flag: 1 for flag in ARCHIVE_FLAGS}}
+    )
+
+    moved = 0
+    for card in flagged:
+        flags = {flag: True for flag in ARCHIVE_FLAGS if card.get(flag)}
+        Card.archive_card(card["board_id"], card["user_id"], card["id"], flags)
+        moved += 1
+
+    print("Done. Cards moved to archived_cards:", moved)
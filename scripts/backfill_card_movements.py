@@ -0,0 +1,33 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Copies every card's column_movements array into the card_movements
+# collection, then trims the arrays to the display limit. Entries are
+# upserted, so the script can be interrupted and re-run.
+with app.app_context():
+    from utils.db import mongo
+    from models.card_model import MOVEMENT_DISPLAY_LIMIT
+    from models.card_movement_model import CardMovement
+
+    for collection in (mongo.db.cards, mongo.db.archived_cards):
+        copied = 0
+        trimmed = 0
+        cursor = collection.find(
+            {"column_movements.0": {"$exists": True}},
+            {"board_id": 1, "user_id": 1, "id": 1, "column_movements": 1}
+        )
+        for card in cursor:
+            movements = card["column_movements"]
+            copied += CardMovement.record_column_movements(card["user_id"], card["board_id"], [card])
+            if len(movements) > MOVEMENT_DISPLAY_LIMIT:
+                collection.update_one(
+                    {"_id": card["_id"]},
+                    {"$set": {"column_movements": movements[-MOVEMENT_DISPLAY_LIMIT:]}}
+                )
+                trimmed += 1
+
+        print(f"{collection.name}: {copied} movements copied, {trimmed} cards trimmed")
@@ -0,0 +1,95 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+import timeit
+
+from backend.utils.chatbot_generator import INTENTS, IntentMatcher
+
+# Micro-benchmark of picking the intent of one chat message:
+#   before  lowercase + one any(keyword in message) substring scan per intent,
+#           as generate_chatbot_message did before the intent table was compiled
+#   after   IntentMatcher.classify(), as classify_intent() does
+# and the messages where the two disagree (mostly substring false positives).
+#   python scripts/benchmark_intent_classifier.py [iterations] [extra intents]
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+# Synthetic intents appended to both sides, to see how each scales with the table
+EXTRA_INTENTS = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+# Student messages in the style the fallback responder receives
+CORPUS = [
+    "halo",
+    "Hai kak, selamat pagi",
+    "hi, can you help me?",
+    "hello there",
+    "ini tugas kalkulus saya, sudah selesai",
+    "tolong jelaskan integral parsial",
+    "bagaimana cara mengatur waktu belajar?",
+    "bagaimanakah cara mempelajari struktur data dengan cepat",
+    "saya lagi malas banget hari ini",
+    "kurang semangat ngerjain tugas",
+    "butuh motivasi buat ujian besok",
+    "metode belajar apa yang cocok untuk fisika?",
+    "strategi pembelajaran untuk ujian akhir",
+    "what is the best way to study for finals",
+    "how do I stop procrastinating",
+    "terima kasih",
+    "ok siap",
+    "jadwal kuliah minggu ini apa saja",
+    "nilai pre-test saya 60, post-test 85",
+    "I feel so lazy and unmotivated today",
+    "kartu ini sudah saya pindahkan ke done",
+    "gimana caranya biar fokus belajarnya?",
+    "lesu banget habis praktikum",
+    "hey, need some help with my board",
+    "which method works for memorizing vocab",
+    "aku bingung harus mulai dari mana",
+    "thanks, that helps!",
+    "chip hitam di papan sirkuit",
+    "perhitungan statistik deskriptif",
+    "saya mau tanya soal tugas besar",
+]
+
+def build_legacy(intents):
+    keyword_lists = [
+        (intent["name"], [keyword.rstrip("*") for keyword in intent["keywords"]])
+        for intent in intents
+    ]
+
+    def classify(message):
+        message = message.lower().strip()
+        for name, keywords in keyword_lists:
+            if any(keyword in message for keyword in keywords):
+                return name
+        return None
+    return classify
+
+def synthetic_intents(count):
+    return [
+        {"name": f"extra_{i}", "keywords": [f"topik{i}", f"subjek{i}", f"bab{i}x"], "response": ""}
+        for i in range(count)
+    ]
+
+intents = list(INTENTS) + synthetic_intents(EXTRA_INTENTS)
+legacy_classify = build_legacy(intents)
+matcher = IntentMatcher(intents)
+
+def compiled_classify(message):
+    intent = matcher.classify(message)
+    return intent["name"] if intent else None
+
+def run(classify):
+    for message in CORPUS:
+        classify(message)
+
+before = timeit.timeit(lambda: run(legacy_classify), number=ITERATIONS) / ITERATIONS / len(CORPUS) * 1e6
+after = timeit.timeit(lambda: run(compiled_classify), number=ITERATIONS) / ITERATIONS / len(CORPUS) * 1e6
+print(f"{len(intents)} intents, {len(CORPUS)} messages")
+print(f"before: {before:.2f} us/message  after: {after:.2f} us/message  speedup: {before / after:.1f}x")
+
+print("\nmessages classified differently (before -> after):")
+for message in CORPUS:
+    old, new = legacy_classify(message), compiled_classify(message)
+    if old != new:
+        print(f"  {message!r}: {old} -> {new}")
@@ -0,0 +1,85 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+import json
+import random
+import timeit
+
+from backend.config import Config
+from backend.utils.response_generator import (
+    SECTION_ORDER, get_response_template, personalize_response
+)
+
+# Micro-benchmark of rendering one chatbot message, per response type:
+#   before  the nested templates dict is rebuilt on every call and the chosen
+#           strings are formatted with str.format, as response_generator did
+#           before the registry was compiled at import
+#   after   get_response_template() + personalize_response() on the registry
+#   python scripts/benchmark_response_templates.py [iterations]
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+# Sections the previous implementation ran str.format on
+FORMATTED_SECTIONS = {
+    "greetings", "strategy_intro", "time_estimation", "time_summary",
+    "achievement_summary", "reflection_prompt", "observation"
+}
+
+with open(Config.RESPONSE_TEMPLATES_FILE, encoding="utf-8") as f:
+    raw_templates = json.load(f)
+
+# A function that builds the templates as a dict literal on every call,
+# exactly like the old get_response_template body
+namespace = {}
+exec("def build_templates():\n    return " + repr(raw_templates), namespace)
+build_templates = namespace["build_templates"]
+
+context = {
+    "column_analysis": {"from_column_name": "Planning (To Do)", "to_column_name": "Monitoring (In Progress)"},
+    "time_analysis": {"total_time_formatted": "1 jam 20 menit"},
+    "movement_pattern": {"total_movements": 4},
+    "difficulty_priority_analysis": {"estimated_time": "2-3 jam"}
+}
+card = {"title": "Kalkulus [Integral]", "notes": "Latihan soal bab 3", "difficulty": "medium"}
+user = {"first_name": "Ani"}
+strategy = {"learning_strat_name": "Rehearsal", "description": "Ulangi materi secara berkala"}
+
+def render_before(response_type):
+    templates = build_templates()
+    template = templates.get(response_type, templates["general"])
+    values = {
+        "card_title": card["title"], "user_name": user["first_name"],
+        "from_column_name": context["column_analysis"]["from_column_name"],
+        "to_column_name": context["column_analysis"]["to_column_name"],
+        "column_name": context["column_analysis"]["to_column_name"],
+        "strategy_name": strategy["learning_strat_name"], "strategy_description": strategy["description"],
+        "estimated_time": context["difficulty_priority_analysis"]["estimated_time"],
+        "total_time": context["time_analysis"]["total_time_formatted"],
+        "total_movements": context["movement_pattern"]["total_movements"],
+        "notes": card["notes"]
+    }
+    parts = []
+    for section in SECTION_ORDER:
+        variants = template.get(section)
+        if section == "difficulty_tips" and variants:
+            variants = variants.get(card["difficulty"])
+        if not variants:
+            continue
+        text = random.choice(variants)
+        parts.append(text.format(**values) if section in FORMATTED_SECTIONS else text)
+    return "\n\n".join(parts)
+
+def render_after(response_type):
+    return personalize_response(get_response_template(response_type), context, card, user, strategy)
+
+print(f"{'response type':<26}{'before (us)':>12}{'after (us)':>12}{'speedup':>10}")
+totals = [0.0, 0.0]
+for response_type in raw_templates:
+    before = timeit.timeit(lambda: render_before(response_type), number=ITERATIONS) / ITERATIONS * 1e6
+    after = timeit.timeit(lambda: render_after(response_type), number=ITERATIONS) / ITERATIONS * 1e6
+    totals[0] += before
+    totals[1] += after
+    print(f"{response_type:<26}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+count = len(raw_templates)
+print(f"{'mean':<26}{totals[0] / count:>12.2f}{totals[1] / count:>12.2f}{totals[0] / totals[1]:>9.1f}x")
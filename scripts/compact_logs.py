@@ -0,0 +1,28 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Moves chatbot_logs and logs entries past their retention into the
+# compressed monthly archives (see backend/models/log_archive_model.py).
+# Meant to run periodically, e.g. daily from cron:
+#   python scripts/compact_logs.py [--dry-run]
+DRY_RUN = "--dry-run" in sys.argv
+
+with app.app_context():
+    from models.log_archive_model import ARCHIVE_SOURCES, LogArchive, zstd_available
+
+    print("Codec:", "zstd" if zstd_available() else "zlib (install zstandard for zstd)")
+    for name in ARCHIVE_SOURCES:
+        stats = LogArchive.compact(name, dry_run=DRY_RUN)
+        if stats["cutoff"] is None:
+            print(f"{name}: retention disabled, nothing archived")
+            continue
+        print(f"{name}: entries before {stats['cutoff']:%Y-%m-%d}: {stats['entries']} of {stats['owners']} owners")
+        if not DRY_RUN and stats["archives"]:
+            ratio = stats["raw_bytes"] / max(stats["compressed_bytes"], 1)
+            print(f"  archives written: {stats['archives']}, "
+                  f"{stats['raw_bytes']} -> {stats['compressed_bytes']} bytes ({ratio:.1f}x)")
+    print("Done." if not DRY_RUN else "Dry run, nothing changed.")
@@ -0,0 +1,45 @@
+import sys, os
+import argparse
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Streams the research export (one row per card with grades, study time and
+# movements) to a file or stdout, e.g.
+#   python scripts/export_cohort.py --format ndjson --course "Calculus" --from 2025-01-01 -o cohort.ndjson
+parser = argparse.ArgumentParser(description="Export cohort data for research")
+parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], default="csv")
+parser.add_argument("--course")
+parser.add_argument("--strategy")
+parser.add_argument("--from", dest="date_from", help="first card creation date, YYYY-MM-DD")
+parser.add_argument("--to", dest="date_to", help="last card creation date, YYYY-MM-DD")
+parser.add_argument("-o", "--output", help="output file (default: stdout)")
+args = parser.parse_args()
+
+with app.app_context():
+    from utils.cohort_export import parse_filters, parquet_available, export_cohort
+
+    if args.format == "parquet" and not parquet_available():
+        sys.exit("Parquet export needs the pyarrow package")
+    if args.format == "parquet" and not args.output:
+        sys.exit("Parquet export needs an output file (-o)")
+
+    try:
+        filters = parse_filters(args.course, args.strategy, args.date_from, args.date_to)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    binary = args.format == "parquet"
+    if args.output:
+        out = open(args.output, "wb" if binary else "w", newline="" if not binary else None)
+    else:
+        out = sys.stdout
+
+    try:
+        for chunk in export_cohort(filters, args.format):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
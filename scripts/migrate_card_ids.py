@@ -0,0 +1,59 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Replaces legacy client-built card ids ("<code>-<course>-<material>") with
+# short server-minted ids, then rewrites the references in study_sessions,
+# study_time_rollups, attachments, chatbot_logs and card_movements.
+# Cards are processed in batches and keep their old id in legacy_id, so the
+# script can be interrupted and re-run. Finally the id index is made unique.
+BATCH_SIZE = 500
+
+with app.app_context():
+    from utils.db import mongo
+    from models.board_model import Board
+    from models.card_model import Card, CARD_ID_PATTERN
+
+    # Cards still embedded in boards have to be in the cards collection first;
+    # they are given minted ids on the way (see Card.mint_legacy_ids)
+    for board in mongo.db.boards.find({"cards_migrated": {"$ne": True}}):
+        Board.migrate_board(board)
+
+    for collection in ["cards", "archived_cards"]:
+        legacy = {"id": {"$exists": True, "$not": {"$regex": CARD_ID_PATTERN}}}
+        total = mongo.db[collection].count_documents(legacy)
+        print(f"{collection}: {total} cards with legacy ids")
+
+        renamed = 0
+        while True:
+            batch = list(mongo.db[collection].find(legacy, {"id": 1}).limit(BATCH_SIZE))
+            if not batch:
+                break
+            renamed += Card.assign_minted_ids(collection, batch)
+            print(f"  [{renamed}/{total}] ids minted")
+
+        last_id = None
+        references = 0
+        while True:
+            query = {"legacy_id": {"$exists": True}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = list(
+                mongo.db[collection].find(query, {"id": 1, "legacy_id": 1, "user_id": 1, "board_id": 1})
+                .sort("_id", 1)
+                .limit(BATCH_SIZE)
+            )
+            if not batch:
+                break
+            references += Card.repoint_references(batch)
+            last_id = batch[-1]["_id"]
+        print(f"  {references} references rewritten")
+
+    index_names = {index["name"]: index for index in mongo.db.cards.list_indexes()}
+    if "id_1" in index_names and not index_names["id_1"].get("unique"):
+        mongo.db.cards.drop_index("id_1")
+    mongo.db.cards.create_index([("id", 1)], unique=True)
+    print("Done. Card ids are unique.")
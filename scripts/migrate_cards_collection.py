@@ -0,0 +1,26 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Moves cards embedded in boards.lists[].cards into the cards collection.
+# Boards are processed one at a time and flagged with cards_migrated once done,
+# so the script can be interrupted and re-run; finished boards are skipped.
+with app.app_context():
+    from utils.db import mongo
+    from models.board_model import Board
+
+    pending = {"cards_migrated": {"$ne": True}}
+    total = mongo.db.boards.count_documents(pending)
+    print(f"Boards to migrate: {total}")
+
+    migrated = 0
+    for board in mongo.db.boards.find(pending):
+        card_count = sum(len(list_.get("cards", [])) for list_ in board.get("lists", []))
+        Board.migrate_board(board)
+        migrated += 1
+        print(f"[{migrated}/{total}] {board['_id']}: {card_count} cards")
+
+    print("Done. Boards migrated:", migrated)
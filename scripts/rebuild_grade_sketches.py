@@ -0,0 +1,15 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Rebuilds the cohort grade sketches from the progress_stats grade counters.
+# Run after scripts/rebuild_progress_stats.py when backfilling, since card
+# writes only add their changes to sketches that already exist.
+with app.app_context():
+    from models.grade_sketch_model import GradeSketch
+
+    written = GradeSketch.rebuild_all()
+    print("Done. Sketch documents written:", written)
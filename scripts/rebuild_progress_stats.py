@@ -0,0 +1,38 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Rebuilds the progress_stats counters of every board from the cards collection.
+#   python scripts/rebuild_progress_stats.py           backfill / rebuild all boards
+#   python scripts/rebuild_progress_stats.py --verify  only compare the stored counters
+#                                                      with a full recompute
+verify_only = "--verify" in sys.argv[1:]
+
+with app.app_context():
+    from utils.db import mongo
+    from models.progress_stats_model import ProgressStats
+
+    boards = mongo.db.boards.find({}, {"user_id": 1})
+
+    checked = 0
+    mismatched = 0
+    for board in boards:
+        checked += 1
+        if not verify_only:
+            ProgressStats.rebuild(board["_id"], board["user_id"])
+            continue
+
+        differences = ProgressStats.verify(board["_id"])
+        if differences:
+            mismatched += 1
+            print(f"Board {board['_id']}: {len(differences)} counters differ")
+            for key, (stored, expected) in sorted(differences.items(), key=str):
+                print(f"  {key}: stored {stored}, expected {expected}")
+
+    if verify_only:
+        print("Done. Boards checked:", checked, "Boards with stale counters:", mismatched)
+        sys.exit(1 if mismatched else 0)
+    print("Done. Boards rebuilt:", checked)
@@ -0,0 +1,36 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Rebuilds study_time_rollups from all ended study sessions. Run once after
+# deploying the rollups, or to repair them; the rollups are recreated from
+# scratch, so study sessions should not be ended while this runs.
+BATCH_SIZE = 1000
+
+with app.app_context():
+    from utils.db import mongo
+    from models.study_time_model import StudyTime
+
+    mongo.db.study_time_rollups.delete_many({})
+
+    courses = {}
+    requests = []
+    sessions = 0
+    for session in mongo.db.study_sessions.find({"end_time": {"$ne": None}}):
+        key = (str(session.get("user_id")), session.get("card_id"))
+        if key not in courses:
+            courses[key] = StudyTime.course_of_card(*key)
+        requests.extend(StudyTime.rollup_requests(session, courses[key]))
+        sessions += 1
+        if len(requests) >= BATCH_SIZE:
+            mongo.db.study_time_rollups.bulk_write(requests, ordered=False)
+            requests = []
+    if requests:
+        mongo.db.study_time_rollups.bulk_write(requests, ordered=False)
+    # Sessions whose rollup had failed are counted now, ending them again must not add them twice
+    mongo.db.study_sessions.update_many({"rolled_up": False}, {"$set": {"rolled_up": True}})
+
+    print("Done. Sessions rolled up:", sessions)
@@ -0,0 +1,423 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Replay benchmark of the card-movement pipeline, stage by stage as
+# chatbot_controller.handle_card_movement runs it:
+#   detect   MovementContextLoader + detect_card_movement
+#   analyze  analyze_movement_context
+#   respond  generate_chatbot_response
+#   log      log_card_movement + log_chatbot_interaction (enqueue only)
+# plus the write-behind flush of the logs at the end. Reports p50/p95/p99
+# latency and MongoDB round trips per movement for each stage.
+#
+# Movement events come from a file recorded from card_movements, or are
+# synthesized from the board snapshots (cards collection) of the database:
+#   python scripts/replay_movements.py record --out events.ndjson [--limit 1000]
+#   python scripts/replay_movements.py replay --events events.ndjson
+#   python scripts/replay_movements.py replay --synthesize 500
+# Replays write chatbot and movement logs, so run them against a local copy
+# of the database (MONGO_URI), or with --fake against an in-memory fake
+# (needs the mongomock package) seeded with generated boards:
+#   python scripts/replay_movements.py replay --fake --users 50 --synthesize 1000
+# The fake gives exact query counts, but its latencies are mongomock's; compare
+# latencies only between runs against the same kind of database.
+# To catch regressions, save a run and compare later runs against it:
+#   ... --save baseline.json
+#   ... --compare baseline.json [--max-regression 0.25]   (exits 1 on regression)
+
+STAGES = ["detect", "analyze", "respond", "log"]
+# Commands run by the write-behind flusher thread are reported as this stage
+FLUSH_STAGE = "write_behind"
+PERCENTILES = [50, 95, 99]
+# Queries per movement may rise this much before it counts as a regression;
+# periodic reads such as the strategy cache's version check add fractions
+QUERY_TOLERANCE = 0.1
+
+LIST_IDS = ["list1", "list2", "list3", "list4"]
+STRATEGY_NAMES = [
+    "Rehearsal Strategies - Pengulangan Materi",
+    "Elaboration Strategies - Elaborasi Materi",
+    "Organization Strategies - Pengorganisasian Materi"
+]
+COURSES = [("Kalkulus", "MAT101"), ("Fisika Dasar", "FIS101"), ("Struktur Data", "INF201"),
+           ("Statistika", "STA102"), ("Basis Data", "INF205")]
+MATERIALS = ["Bab 1", "Bab 2", "Latihan soal", "Kuis", "Ringkasan"]
+
+class QueryCounter:
+    """MongoDB round trips per stage, from whichever thread ran them"""
+
+    def __init__(self):
+        self.stage = None
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, command=None):
+        if command == "endSessions":
+            return
+        if threading.current_thread().name.startswith("write-behind"):
+            stage = FLUSH_STAGE
+        else:
+            stage = self.stage
+        if stage is None:
+            return
+        with self._lock:
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def take(self, stage):
+        with self._lock:
+            return self.counts.pop(stage, 0)
+
+def install_command_listener(counter):
+    """Count the commands of every MongoClient created afterwards"""
+    from pymongo import monitoring
+
+    class Listener(monitoring.CommandListener):
+        def started(self, event):
+            counter.count(event.command_name)
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    monitoring.register(Listener())
+
+# mongomock has no command monitoring; each of these calls is one round trip
+FAKE_COUNTED_METHODS = [
+    "find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one", "bulk_write",
+    "delete_one", "delete_many", "find_one_and_update"
+]
+
+def install_fake(counter):
+    """Point utils.db.mongo at an in-memory mongomock database"""
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("--fake needs the mongomock package (pip install mongomock)")
+
+    for name in FAKE_COUNTED_METHODS:
+        original = getattr(mongomock.collection.Collection, name)
+
+        def counted(self, *args, _original=original, _name=name, **kwargs):
+            counter.count(_name)
+            return _original(self, *args, **kwargs)
+        setattr(mongomock.collection.Collection, name, counted)
+
+    from utils.db import mongo
+    client = mongomock.MongoClient()
+    mongo.cx = client
+    mongo.db = client["replay"]
+    return mongo
+
+def seed_fake(users, cards_per_board, rng):
+    """Generate users with boards, cards, movement history and study time"""
+    from utils.db import mongo
+    from models.board_model import Board
+    from models.card_model import Card
+    from models.study_time_model import StudyTime
+
+    mongo.db.learning_strats.insert_many([
+        {"learning_strat_name": name, "description": f"Deskripsi {name}", "created_at": datetime.utcnow()}
+        for name in STRATEGY_NAMES
+    ])
+
+    now = datetime.utcnow()
+    for index in range(users):
+        user_id = mongo.db.users.insert_one({
+            "first_name": f"Mahasiswa{index}", "last_name": "Replay", "username": f"replay{index}",
+            "email": f"replay{index}@example.com", "role": "user", "created_at": now
+        }).inserted_id
+        board_id = Board.create_initial_board(user_id, f"replay{index}")
+
+        cards, movements, rollups = [], [], []
+        for position, card_id in enumerate(Card.mint_ids(cards_per_board)):
+            course, code = rng.choice(COURSES)
+            list_id = rng.choice(LIST_IDS)
+            card = {
+                "id": card_id,
+                "title": f"{course} [{code}]",
+                "sub_title": rng.choice(MATERIALS),
+                "description": "",
+                "difficulty": rng.choice(["easy", "medium", "hard", "expert"]),
+                "priority": rng.choice(["low", "medium", "high"]),
+                "learning_strategy": rng.choice(STRATEGY_NAMES),
+                "created_at": (now - timedelta(days=30)).isoformat()
+            }
+            cards.append(Card.to_document(card, board_id, user_id, list_id, position))
+
+            at = now - timedelta(days=rng.randint(1, 30))
+            column = "initial"
+            for _ in range(rng.randint(1, 8)):
+                target = rng.choice([l for l in ["initial"] + LIST_IDS if l != column and l != "initial"])
+                movements.append({
+                    "user_id": str(user_id), "board_id": board_id, "card_id": card_id,
+                    "from_column": column, "to_column": target, "timestamp": at
+                })
+                column = target
+                at += timedelta(hours=rng.randint(1, 48))
+
+            for _ in range(rng.randint(0, 4)):
+                start = now - timedelta(days=rng.randint(1, 30), minutes=rng.randint(0, 600))
+                rollups.extend(StudyTime.rollup_requests(
+                    {"user_id": str(user_id), "card_id": card_id,
+                     "start_time": start, "end_time": start + timedelta(minutes=rng.randint(10, 120))},
+                    code
+                ))
+
+        mongo.db.cards.insert_many(cards)
+        mongo.db.card_movements.insert_many(movements)
+        if rollups:
+            mongo.db.study_time_rollups.bulk_write(rollups, ordered=False)
+
+def synthesize_events(count, rng):
+    """
+    Movement events from the board snapshots: each picks a card and moves it
+    one list forward (or, now and then, one back), as students do
+    """
+    from utils.db import mongo
+
+    positions = {
+        (str(card["board_id"]), card["id"]): (str(card["user_id"]), card.get("list_id"))
+        for card in mongo.db.cards.find(
+            {"archived": {"$ne": True}, "deleted": {"$ne": True}},
+            {"board_id": 1, "user_id": 1, "id": 1, "list_id": 1}
+        )
+    }
+    if not positions:
+        sys.exit("No cards to synthesize movements from")
+
+    keys = sorted(positions)
+    events = []
+    for _ in range(count):
+        board_id, card_id = rng.choice(keys)
+        user_id, list_id = positions[(board_id, card_id)]
+        index = LIST_IDS.index(list_id) if list_id in LIST_IDS else 0
+        step = -1 if (index == len(LIST_IDS) - 1 or (index > 0 and rng.random() < 0.2)) else 1
+        target = LIST_IDS[index + step]
+        events.append({"user_id": user_id, "board_id": board_id, "card_id": card_id,
+                       "from_column": list_id, "to_column": target})
+        positions[(board_id, card_id)] = (user_id, target)
+    return events
+
+def record_events(path, limit):
+    """Write the most recent movements of card_movements to an NDJSON file"""
+    from utils.db import mongo
+
+    movements = list(
+        mongo.db.card_movements.find(
+            {"from_column": {"$ne": "initial"}},
+            {"_id": 0, "user_id": 1, "board_id": 1, "card_id": 1, "from_column": 1, "to_column": 1, "timestamp": 1}
+        ).sort("timestamp", -1).limit(limit)
+    )
+    movements.reverse()
+    with open(path, "w", encoding="utf-8") as f:
+        for movement in movements:
+            if isinstance(movement.get("timestamp"), datetime):
+                movement["timestamp"] = movement["timestamp"].isoformat()
+            f.write(json.dumps(movement) + "\n")
+    return len(movements)
+
+def load_events(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def percentile(values, p):
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(int(round(p / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+def replay(events, counter, warmup=0, cold_cache=False):
+    """
+    Run every event through the pipeline
+
+    Returns:
+        dict: {stage: {"latencies": [seconds], "queries": [count per movement]}}
+    """
+    from controllers.chatbot_controller import log_chatbot_interaction
+    from utils.trigger_detector import MovementContextLoader, detect_card_movement, log_card_movement
+    from utils.context_analyzer import analyze_movement_context
+    from utils.response_generator import generate_chatbot_response
+    from utils.strategy_cache import strategy_cache
+    from utils.write_behind import write_behind
+
+    results = {stage: {"latencies": [], "queries": []} for stage in STAGES + ["total"]}
+    failures = 0
+
+    def timed(stage, function):
+        counter.stage = stage
+        started = time.perf_counter()
+        try:
+            return function()
+        finally:
+            elapsed = time.perf_counter() - started
+            counter.stage = None
+            timings[stage] = (elapsed, counter.take(stage))
+
+    for number, event in enumerate(events):
+        if cold_cache:
+            strategy_cache.invalidate()
+        user_id, board_id, card_id = event["user_id"], event["board_id"], event["card_id"]
+        from_column, to_column = event["from_column"], event["to_column"]
+        timings = {}
+
+        loader = MovementContextLoader(user_id, board_id, card_id)
+        movement_info = timed("detect", lambda: detect_card_movement(
+            user_id, board_id, card_id, from_column, to_column, loader
+        ))
+        if not movement_info:
+            failures += 1
+            continue
+        context_analysis = timed("analyze", lambda: analyze_movement_context(movement_info))
+        chatbot_response = timed("respond", lambda: generate_chatbot_response(context_analysis, movement_info))
+
+        def log():
+            log_card_movement(user_id, board_id, card_id, from_column, to_column, loader)
+            log_chatbot_interaction(user_id, card_id, from_column, to_column, chatbot_response)
+        timed("log", log)
+
+        if number < warmup:
+            continue
+        for stage, (elapsed, queries) in timings.items():
+            results[stage]["latencies"].append(elapsed)
+            results[stage]["queries"].append(queries)
+        results["total"]["latencies"].append(sum(elapsed for elapsed, _ in timings.values()))
+        results["total"]["queries"].append(sum(queries for _, queries in timings.values()))
+
+    write_behind.flush()
+    # The flusher thread may still be writing a batch it took before flush()
+    time.sleep(write_behind.flush_interval)
+    # Logs of the warmup events are flushed too, so spread over every processed movement
+    processed = max(len(events) - failures, 1)
+    results[FLUSH_STAGE] = {"latencies": [], "queries": [counter.take(FLUSH_STAGE) / processed]}
+    results["failures"] = failures
+    return results
+
+def summarize(results):
+    summary = {"movements": len(results["total"]["latencies"]), "failures": results["failures"], "stages": {}}
+    for stage in STAGES + ["total", FLUSH_STAGE]:
+        latencies = results[stage]["latencies"]
+        queries = results[stage]["queries"]
+        summary["stages"][stage] = {
+            **{f"p{p}_ms": (percentile(latencies, p) * 1000 if latencies else None) for p in PERCENTILES},
+            "queries_per_movement": (sum(queries) / len(queries)) if queries else 0
+        }
+    # Serial throughput: one movement after another, without the flush at the end
+    busy = sum(results["total"]["latencies"])
+    summary["movements_per_second"] = summary["movements"] / busy if busy else 0
+    return summary
+
+def print_summary(summary):
+    print(f"{summary['movements']} movements replayed, {summary['failures']} failed, "
+          f"{summary['movements_per_second']:.1f} movements/s serially")
+    print(f"{'stage':<14}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'queries/movement':>18}")
+    for stage, stats in summary["stages"].items():
+        cells = "".join(
+            f"{stats[f'p{p}_ms']:>10.2f}" if stats[f"p{p}_ms"] is not None else f"{'-':>10}"
+            for p in PERCENTILES
+        )
+        print(f"{stage:<14}{cells}{stats['queries_per_movement']:>18.2f}")
+
+def compare(summary, baseline, max_regression):
+    """
+    Regressions against a saved run: p95 latency more than max_regression
+    slower, or more queries per movement (not checked for the write-behind
+    flush, whose batching depends on timing)
+
+    Returns:
+        list: Descriptions of the regressions found
+    """
+    regressions = []
+    for stage, stats in summary["stages"].items():
+        before = baseline["stages"].get(stage)
+        if not before:
+            continue
+        if stats["p95_ms"] and before.get("p95_ms") and stats["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{stage}: p95 {before['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms")
+        if stage != FLUSH_STAGE and stats["queries_per_movement"] > before.get("queries_per_movement", 0) + QUERY_TOLERANCE:
+            regressions.append(
+                f"{stage}: queries/movement {before['queries_per_movement']:.2f} -> {stats['queries_per_movement']:.2f}"
+            )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay benchmark of the card-movement pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="save recent movements of card_movements as events")
+    record.add_argument("--out", required=True)
+    record.add_argument("--limit", type=int, default=1000)
+
+    run = commands.add_parser("replay", help="replay events and report latency and queries per stage")
+    source = run.add_mutually_exclusive_group(required=True)
+    source.add_argument("--events", help="NDJSON file written by record")
+    source.add_argument("--synthesize", type=int, help="number of events to synthesize from board snapshots")
+    run.add_argument("--fake", action="store_true", help="use an in-memory mongomock database seeded with boards")
+    run.add_argument("--users", type=int, default=50, help="users to generate with --fake")
+    run.add_argument("--cards", type=int, default=20, help="cards per board to generate with --fake")
+    run.add_argument("--warmup", type=int, default=20, help="events replayed before measuring")
+    run.add_argument("--cold-cache", action="store_true", help="clear the strategy cache before every event")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--save", help="write the summary to this JSON file")
+    run.add_argument("--compare", help="summary JSON of an earlier run to check for regressions")
+    run.add_argument("--max-regression", type=float, default=0.25,
+                     help="allowed p95 slowdown against --compare, as a fraction")
+    args = parser.parse_args()
+
+    counter = QueryCounter()
+    rng = random.Random(getattr(args, "seed", 1))
+    if getattr(args, "fake", False):
+        install_fake(counter)
+        seed_fake(args.users, args.cards, rng)
+        context = None
+    else:
+        install_command_listener(counter)
+        from backend.app import app
+        context = app.app_context()
+        context.push()
+
+    try:
+        if args.command == "record":
+            print("Events recorded:", record_events(args.out, args.limit))
+            return
+
+        events = load_events(args.events) if args.events else synthesize_events(args.synthesize, rng)
+        if len(events) <= args.warmup:
+            sys.exit(f"Need more than {args.warmup} events (the warmup)")
+        results = replay(events, counter, args.warmup, args.cold_cache)
+        summary = summarize(results)
+        summary.update({"recorded_at": datetime.utcnow().isoformat(), "fake": bool(args.fake),
+                        "events": len(events), "warmup": args.warmup, "cold_cache": args.cold_cache})
+        print_summary(summary)
+
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                regressions = compare(summary, json.load(f), args.max_regression)
+            if regressions:
+                print("\nRegressions against", args.compare)
+                for regression in regressions:
+                    print(" ", regression)
+                sys.exit(1)
+            print("\nNo regressions against", args.compare)
+    finally:
+        if context is not None:
+            context.pop()
+
+if __name__ == "__main__":
+    main()
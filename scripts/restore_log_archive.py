@@ -0,0 +1,28 @@
+import sys, os
+# Add the project root and backend directory to the Python path
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.app import app
+
+# Copies archived log entries of one owner back into <source>_restored for
+# an audit (see backend/models/log_archive_model.py):
+#   python scripts/restore_log_archive.py chatbot_logs <user_id> [YYYY-MM] [YYYY-MM]
+#   python scripts/restore_log_archive.py logs <username> [YYYY-MM] [YYYY-MM]
+if len(sys.argv) < 3:
+    print("Usage: python scripts/restore_log_archive.py <chatbot_logs|logs> <owner> [from] [to]")
+    sys.exit(1)
+
+source, owner = sys.argv[1], sys.argv[2]
+month_from = sys.argv[3] if len(sys.argv) > 3 else None
+month_to = sys.argv[4] if len(sys.argv) > 4 else None
+
+with app.app_context():
+    from models.log_archive_model import LogArchive
+
+    try:
+        restored = LogArchive.restore(source, owner, month_from, month_to)
+    except ValueError as e:
+        print("Error:", e)
+        sys.exit(1)
+    print(f"Done. Entries restored into {source}_restored:", restored)